@@ -3,13 +3,17 @@
 import streamlit as st
 from pathlib import Path
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from data_sources import ArxivClient, SemanticScholarClient
-from parsers import PDFParser
-from embeddings import EmbeddingEncoder
+from data_sources import ArxivClient, SemanticScholarClient, QueryCache, normalize_query
+from embeddings import get_encoder
+from ingestion import AbstractIndexer
+from ranking import PaperRanker
+from vector_stores import FlatIndex
 
 st.set_page_config(
     page_title="Research Pilot",
@@ -33,6 +37,161 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+SOURCES = {
+    "arXiv": ["arXiv"],
+    "Semantic Scholar": ["Semantic Scholar"],
+    "Both": ["arXiv", "Semantic Scholar"],
+}
+PAGE_SIZE = 10
+EXAMPLE_QUERY = "Attention mechanisms in vision transformers"
+
+# Everything below decorated with st.cache_resource is created once per
+# server process and shared by all sessions and reruns.
+
+
+@st.cache_resource
+def get_clients() -> dict:
+    """API clients, kept alive so their HTTP sessions are reused."""
+    return {"arXiv": ArxivClient(), "Semantic Scholar": SemanticScholarClient()}
+
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """Worker threads for source searches and background indexing."""
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="research-pilot")
+
+
+@st.cache_resource
+def get_system_info() -> dict:
+    """GPU details, read once instead of importing torch on every rerun."""
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return {
+                "gpu": torch.cuda.get_device_name(0),
+                "vram_gb": torch.cuda.get_device_properties(0).total_memory / 1e9,
+            }
+        return {"gpu": None}
+    except ImportError:
+        return {"torch": False}
+
+
+@st.cache_resource
+def get_ranker() -> PaperRanker:
+    """Ranker shared across reruns so its paper embedding cache persists."""
+    return PaperRanker(get_encoder())
+
+
+@st.cache_resource
+def get_query_cache() -> QueryCache:
+    """Search result cache shared by all sessions."""
+    return QueryCache(get_encoder())
+
+
+@st.cache_resource
+def get_abstract_indexer() -> tuple:
+    """Abstract index of every paper seen, and the lock guarding it."""
+    encoder = get_encoder()
+    index = FlatIndex(dim=encoder.get_embedding_dim())
+    return AbstractIndexer(encoder, index), threading.Lock()
+
+
+def fetch_source(client, name: str, query: str, limit: int) -> list:
+    """Search one source; runs on a worker thread, so no st.* calls."""
+    if name == "arXiv":
+        return client.search(query, max_results=limit)
+    return client.search(query, limit=limit)
+
+
+def index_abstracts(papers: list):
+    """Add papers to the shared abstract index; runs on a worker thread."""
+    indexer, lock = get_abstract_indexer()
+    with lock:
+        indexer.index_papers(papers)
+
+
+def search_sources(query: str, source: str, max_results: int, placeholder) -> list:
+    """Search the selected sources concurrently, rendering each as it lands."""
+    clients = get_clients()
+    names = SOURCES[source]
+    limit = max_results // len(names)
+
+    executor = get_executor()
+    futures = {
+        executor.submit(fetch_source, clients[name], name, query, limit): name
+        for name in names
+    }
+
+    papers = []
+    with st.status("Searching for papers...", expanded=True) as status:
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                found = future.result()
+            except Exception as e:
+                st.warning(f"{name} search failed: {e}")
+                continue
+
+            papers.extend(found)
+            st.write(f"Found {len(found)} papers on {name}")
+            # Show what we have so far while slower sources are still running
+            with placeholder.container():
+                render_papers([(paper, None) for paper in papers[:max_results]])
+
+        status.update(label=f"Found {len(papers)} papers", state="complete", expanded=False)
+
+    return papers
+
+
+def render_papers(ranked: list, offset: int = 0):
+    """Render (paper, score) pairs as expanders."""
+    for i, (paper, score) in enumerate(ranked, start=offset):
+        with st.expander(f"{i+1}. {paper.title}"):
+            if score is not None:
+                st.markdown(f"**Score:** {score:.3f}")
+            st.markdown(f"**Authors:** {', '.join(paper.authors[:5])}{' et al.' if len(paper.authors) > 5 else ''}")
+            st.markdown(f"**Published:** {paper.published.strftime('%Y-%m-%d')}")
+            st.markdown(f"**Source:** {paper.source}")
+            if paper.citation_count > 0:
+                st.markdown(f"**Citations:** {paper.citation_count}")
+
+            st.markdown("**Abstract:**")
+            st.write(paper.abstract[:500] + "..." if len(paper.abstract) > 500 else paper.abstract)
+
+            col_pdf, col_cite = st.columns(2)
+            with col_pdf:
+                if paper.pdf_url:
+                    st.markdown(f"[📄 PDF]({paper.pdf_url})")
+            with col_cite:
+                st.markdown(f"[🔗 Details](https://arxiv.org/abs/{paper.id})")
+
+
+def run_search(query: str, source: str, max_results: int, rank_results: bool) -> list:
+    """Get (paper, score) results for a query, from cache when possible."""
+    query_cache = get_query_cache()
+    # Cached results depend on the source and result limit too
+    namespace = f"{source}:{max_results}"
+    papers = query_cache.get(query, namespace)
+
+    if papers is not None:
+        st.info(f"Showing {len(papers)} cached papers for a matching query")
+    else:
+        placeholder = st.empty()
+        papers = search_sources(query, source, max_results, placeholder)
+        placeholder.empty()
+        if papers:
+            query_cache.put(query, papers, namespace)
+            get_executor().submit(index_abstracts, papers)
+
+    if rank_results and papers:
+        with st.spinner("Ranking papers..."):
+            return get_ranker().rank(query, papers, top_k=max_results)
+    return [(paper, None) for paper in papers[:max_results]]
+
+
+def use_example():
+    st.session_state.query = EXAMPLE_QUERY
+
 
 def main():
     """Main application."""
@@ -64,18 +223,22 @@ def main():
             step=5
         )
 
+        rank_results = st.checkbox(
+            "Rank by relevance, citations and recency",
+            value=True
+        )
+
         st.divider()
 
         st.header("📊 System Info")
-        try:
-            import torch
-            if torch.cuda.is_available():
-                st.success(f"✅ GPU: {torch.cuda.get_device_name(0)}")
-                st.info(f"VRAM: {torch.cuda.get_device_properties(0).total_memory / 1e9:.1f} GB")
-            else:
-                st.warning("⚠️ No GPU detected (using CPU)")
-        except:
+        info = get_system_info()
+        if info.get("torch") is False:
             st.warning("⚠️ PyTorch not available")
+        elif info["gpu"]:
+            st.success(f"✅ GPU: {info['gpu']}")
+            st.info(f"VRAM: {info['vram_gb']:.1f} GB")
+        else:
+            st.warning("⚠️ No GPU detected (using CPU)")
 
     # Main content
     tab1, tab2, tab3 = st.tabs(["🔍 Search", "📚 Library", "ℹ️ About"])
@@ -86,7 +249,8 @@ def main():
         query = st.text_area(
             "What would you like to research?",
             placeholder="Example: Recent advances in transformer architectures for computer vision",
-            height=100
+            height=100,
+            key="query"
         )
 
         col1, col2, col3 = st.columns([1, 1, 2])
@@ -95,61 +259,47 @@ def main():
             search_button = st.button("🔍 Search Papers", type="primary")
 
         with col2:
-            example_button = st.button("Try Example")
-
-        if example_button:
-            query = "Attention mechanisms in vision transformers"
-            st.rerun()
+            st.button("Try Example", on_click=use_example)
 
+        # Results are kept per session under their search key, so other
+        # widget interactions (e.g. paging) rerun without searching again
+        search_key = (normalize_query(query), source, max_results, rank_results)
         if search_button and query:
-            with st.spinner("Searching for papers..."):
+            if st.session_state.get("search_key") != search_key:
                 try:
-                    papers = []
-
-                    if source in ["arXiv", "Both"]:
-                        arxiv_client = ArxivClient()
-                        arxiv_papers = arxiv_client.search(query, max_results=max_results//2 if source == "Both" else max_results)
-                        papers.extend(arxiv_papers)
-                        st.success(f"Found {len(arxiv_papers)} papers on arXiv")
-
-                    if source in ["Semantic Scholar", "Both"]:
-                        try:
-                            s2_client = SemanticScholarClient()
-                            s2_papers = s2_client.search(query, limit=max_results//2 if source == "Both" else max_results)
-                            papers.extend(s2_papers)
-                            st.success(f"Found {len(s2_papers)} papers on Semantic Scholar")
-                        except Exception as e:
-                            st.warning(f"Semantic Scholar search failed: {e}")
-
-                    if papers:
-                        st.subheader(f"📝 Found {len(papers)} Papers")
-
-                        for i, paper in enumerate(papers[:max_results]):
-                            with st.expander(f"{i+1}. {paper.title}"):
-                                st.markdown(f"**Authors:** {', '.join(paper.authors[:5])}{' et al.' if len(paper.authors) > 5 else ''}")
-                                st.markdown(f"**Published:** {paper.published.strftime('%Y-%m-%d')}")
-                                st.markdown(f"**Source:** {paper.source}")
-                                if paper.citation_count > 0:
-                                    st.markdown(f"**Citations:** {paper.citation_count}")
-
-                                st.markdown("**Abstract:**")
-                                st.write(paper.abstract[:500] + "..." if len(paper.abstract) > 500 else paper.abstract)
-
-                                col_pdf, col_cite = st.columns(2)
-                                with col_pdf:
-                                    if paper.pdf_url:
-                                        st.markdown(f"[📄 PDF]({paper.pdf_url})")
-                                with col_cite:
-                                    st.markdown(f"[🔗 Details](https://arxiv.org/abs/{paper.id})")
-
-                    else:
-                        st.warning("No papers found. Try a different query.")
-
+                    st.session_state.results = run_search(query, source, max_results, rank_results)
+                    st.session_state.search_key = search_key
+                    st.session_state.page = 1
                 except Exception as e:
                     st.error(f"Error searching papers: {e}")
 
+        results = st.session_state.get("results")
+        if results is not None:
+            if results:
+                st.subheader(f"📝 Found {len(results)} Papers")
+
+                num_pages = (len(results) + PAGE_SIZE - 1) // PAGE_SIZE
+                page = 1
+                if num_pages > 1:
+                    page = st.number_input("Page", min_value=1, max_value=num_pages, key="page")
+                offset = (page - 1) * PAGE_SIZE
+                render_papers(results[offset:offset + PAGE_SIZE], offset)
+
+            else:
+                st.warning("No papers found. Try a different query.")
+
     with tab2:
         st.header("📚 Paper Library")
+
+        indexer, index_lock = get_abstract_indexer()
+        st.caption(f"{len(indexer.indexed_ids)} papers indexed from your searches")
+        library_query = st.text_input("Search papers you have already found", key="library_query")
+        if library_query and indexer.indexed_ids:
+            vector = get_encoder().encode(library_query, show_progress=False)
+            with index_lock:
+                matches = indexer.shortlist(vector, top_k=PAGE_SIZE)[0]
+            render_papers([(paper, None) for paper in matches])
+
         st.info("Coming soon: Manage your saved papers and collections")
 
         st.markdown("""
@@ -0,0 +1,74 @@
+"""Benchmark: HNSW recall vs latency against the exact flat index.
+
+Builds both indexes over the same vectors and sweeps ef_search. Pass a .npy
+file of real embeddings, or omit it to use clustered random vectors.
+
+Usage:
+    python benchmarks/hnsw_recall.py [--vectors embeddings.npy] [--n 20000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from vector_stores import FlatIndex, HNSWIndex, recall_latency_curve
+
+
+def clustered_vectors(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Random vectors around a few hundred centers, similar to real embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, n // 100), dim))
+    points = centers[rng.integers(0, len(centers), n)] + 0.5 * rng.standard_normal((n, dim))
+    return points.astype(np.float32)
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=Path, help="Embeddings .npy file (n, dim)")
+    parser.add_argument("--n", type=int, default=20000, help="Random vectors if no file given")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.vectors:
+        vectors = np.load(args.vectors, mmap_mode="r")
+    else:
+        vectors = clustered_vectors(args.n, args.dim)
+
+    rng = np.random.default_rng(1)
+    ids = [str(i) for i in range(len(vectors))]
+    picks = rng.choice(len(vectors), args.queries, replace=False)
+    queries = vectors[picks] + 0.1 * rng.standard_normal((args.queries, vectors.shape[1]))
+
+    exact = FlatIndex(vectors.shape[1])
+    exact.add(vectors, ids)
+
+    hnsw = HNSWIndex(vectors.shape[1], M=args.m, ef_construction=args.ef_construction)
+    start = time.perf_counter()
+    hnsw.add(vectors, ids)
+    build_seconds = time.perf_counter() - start
+    print(f"Built HNSW over {len(vectors)} vectors in {build_seconds:.1f}s "
+          f"({len(vectors) / build_seconds:.0f} vectors/sec)")
+
+    curve = recall_latency_curve(
+        hnsw, exact, queries, "ef_search", [16, 32, 64, 128, 256], top_k=args.top_k
+    )
+
+    print(f"\n{'ef_search':>10}{'recall':>10}{'mean ms':>10}{'p99 ms':>10}")
+    for row in curve:
+        print(f"{row['ef_search']:>10}{row[f'recall@{args.top_k}']:>10.3f}"
+              f"{row['mean_ms']:>10.3f}{row['p99_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
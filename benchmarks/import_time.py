@@ -0,0 +1,64 @@
+"""Benchmark: cold import time of each Research Pilot package.
+
+Every package is imported in a fresh interpreter, so timings include all
+transitive imports. The script also reports whether any heavy dependency was
+pulled in at import time, which should only happen on first use.
+
+Usage:
+    python benchmarks/import_time.py [--budget 1.0]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+PACKAGES = ["data_sources", "parsers", "embeddings", "vector_stores", "ranking", "ingestion"]
+HEAVY_MODULES = ["torch", "sentence_transformers", "fitz", "arxiv", "transformers"]
+
+CHILD_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import {package}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure(package: str) -> dict:
+    """Import a package in a fresh interpreter and time it."""
+    script = CHILD_SCRIPT.format(src=str(SRC_DIR), package=package, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=1.0, help="Seconds allowed per package")
+    args = parser.parse_args()
+
+    print(f"{'package':<16}{'seconds':>10}  heavy modules loaded")
+    over_budget = False
+
+    for package in PACKAGES:
+        result = measure(package)
+        heavy = ", ".join(result["heavy"]) or "-"
+        print(f"{package:<16}{result['seconds']:>10.3f}  {heavy}")
+        over_budget |= result["seconds"] > args.budget or bool(result["heavy"])
+
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
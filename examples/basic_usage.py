@@ -9,6 +9,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from data_sources import ArxivClient, SemanticScholarClient
 from parsers import PDFParser, SemanticChunker
 from embeddings import EmbeddingEncoder
+from ingestion import AbstractIndexer
+from vector_stores import FlatIndex
 
 
 def example_search_arxiv():
@@ -119,6 +121,26 @@ def example_embeddings():
         print(f"  Reserved: {memory['reserved_gb']:.2f} GB")
 
 
+def example_abstract_indexing():
+    """Example: Index abstracts without downloading PDFs."""
+    print("\n=== Example 6: Abstract Indexing ===")
+
+    encoder = EmbeddingEncoder()
+    index = FlatIndex(dim=encoder.get_embedding_dim())
+    indexer = AbstractIndexer(encoder, index)
+
+    added = indexer.index_query(
+        "attention mechanisms in vision transformers",
+        arxiv_client=ArxivClient(),
+        max_results=50
+    )
+    print(f"\nIndexed {added} abstracts")
+
+    query = encoder.encode("efficient attention for high-resolution images", show_progress=False)
+    for paper in indexer.shortlist(query, top_k=3)[0]:
+        print(f"  {paper.id}: {paper.title}")
+
+
 def main():
     """Run all examples."""
     print("=" * 60)
@@ -131,6 +153,7 @@ def main():
     example_pdf_parsing()
     example_text_chunking()
     example_embeddings()
+    example_abstract_indexing()
 
     print("\n" + "=" * 60)
     print("Examples complete!")
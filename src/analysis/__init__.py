@@ -0,0 +1,5 @@
+"""Analytics over collected paper metadata."""
+
+from .citation_graph import CitationGraph, citation_edges, reference_edges
+
+__all__ = ["CitationGraph", "citation_edges", "reference_edges"]
@@ -0,0 +1,11 @@
+"""Async HTTP API for federated search, retrieval and ingestion."""
+
+from .schemas import IngestRequest, JobStatus, RetrieveRequest
+from .service import ResearchService
+
+__all__ = [
+    "ResearchService",
+    "RetrieveRequest",
+    "IngestRequest",
+    "JobStatus",
+]
@@ -0,0 +1,36 @@
+"""Request and response models for the HTTP API."""
+
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+Source = Literal["arxiv", "semantic_scholar", "both"]
+
+
+class RetrieveRequest(BaseModel):
+    """Semantic retrieval over the indexed abstracts or chunks."""
+
+    query: str = Field(..., min_length=1)
+    top_k: int = Field(10, ge=1, le=100)
+    level: Literal["abstracts", "chunks"] = "abstracts"
+
+
+class IngestRequest(BaseModel):
+    """Papers to index, given by search query or by ID."""
+
+    query: Optional[str] = None
+    paper_ids: List[str] = Field(default_factory=list)
+    source: Source = "both"
+    max_results: int = Field(50, ge=1, le=500)
+    full_text: bool = False
+
+
+class JobStatus(BaseModel):
+    """State of a submitted ingest job."""
+
+    job_id: str
+    status: Literal["queued", "running", "done", "failed"]
+    submitted: float
+    finished: Optional[float] = None
+    result: Dict[str, Any] = Field(default_factory=dict)
+    error: Optional[str] = None
@@ -0,0 +1,156 @@
+"""FastAPI application exposing search, retrieval and ingestion.
+
+Run with ``python -m api.server`` from ``src``, or
+``uvicorn api.server:app --app-dir src``.
+"""
+
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from config import load_config
+
+from .schemas import IngestRequest, JobStatus, RetrieveRequest, Source
+from .service import ResearchService
+
+logger = logging.getLogger(__name__)
+
+
+def _ndjson(events):
+    async def lines():
+        async for event in events:
+            yield json.dumps(event, default=str) + "\n"
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def _sse(events):
+    async def messages():
+        async for event in events:
+            yield f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+    return StreamingResponse(
+        messages(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def create_app(config: Optional[Dict[str, Any]] = None) -> FastAPI:
+    """Build the API application.
+
+    One ResearchService is created per worker process at startup, so the
+    encoder, caches and indexes are loaded once and shared by all requests.
+
+    Args:
+        config: Parsed configuration; loaded from disk if None
+
+    Returns:
+        FastAPI application
+    """
+    config = load_config() if config is None else config
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        service = ResearchService(config)
+        await service.start()
+        app.state.service = service
+        try:
+            yield
+        finally:
+            await service.close()
+
+    app = FastAPI(title="Research Pilot API", lifespan=lifespan)
+
+    def service(request: Request) -> ResearchService:
+        return request.app.state.service
+
+    @app.get("/health")
+    async def health(request: Request):
+        svc = service(request)
+        return {
+            "status": "ok",
+            "indexed_papers": len(svc.indexer.indexed_ids),
+            "indexed_chunks": len(svc.chunks),
+            "cached_queries": len(svc.query_cache),
+        }
+
+    @app.get("/search")
+    async def search(
+        request: Request,
+        q: str = Query(..., min_length=1),
+        source: Source = "both",
+        limit: int = Query(20, ge=1, le=200),
+        rank: bool = True,
+    ):
+        errors = []
+        async for event in service(request).stream_search(q, source, limit, rank):
+            if event["event"] == "error":
+                errors.append(event)
+            elif event["event"] == "results":
+                return {**event, "errors": errors}
+
+    @app.get("/search/stream")
+    async def search_stream(
+        request: Request,
+        q: str = Query(..., min_length=1),
+        source: Source = "both",
+        limit: int = Query(20, ge=1, le=200),
+        rank: bool = True,
+        format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    ):
+        events = service(request).stream_search(q, source, limit, rank)
+        return _sse(events) if format == "sse" else _ndjson(events)
+
+    @app.get("/papers/{paper_id:path}")
+    async def get_paper(request: Request, paper_id: str, source: Source = "arxiv"):
+        if source == "both":
+            source = "arxiv"
+        paper = await service(request).get_paper(paper_id, source)
+        if paper is None:
+            raise HTTPException(status_code=404, detail=f"Paper {paper_id} not found")
+        return paper
+
+    @app.post("/retrieve")
+    async def retrieve(request: Request, body: RetrieveRequest):
+        hits = await service(request).retrieve(body.query, body.top_k, body.level)
+        return {"query": body.query, "level": body.level, "hits": hits}
+
+    @app.post("/ingest", status_code=202, response_model=JobStatus)
+    async def ingest(request: Request, body: IngestRequest):
+        if not body.query and not body.paper_ids:
+            raise HTTPException(status_code=422, detail="Provide a query or paper_ids")
+        return service(request).submit_ingest(body)
+
+    @app.get("/jobs/{job_id}", response_model=JobStatus)
+    async def get_job(request: Request, job_id: str):
+        job = service(request).jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        return job
+
+    return app
+
+
+app = create_app()
+
+
+def main():
+    """Serve the API with uvicorn using the ``api`` config section."""
+    import uvicorn
+
+    api = load_config().get("api", {})
+    uvicorn.run(
+        "api.server:app",
+        host=api.get("host", "0.0.0.0"),
+        port=api.get("port", 8000),
+        workers=api.get("workers", 1),
+        # Beyond this many open requests a worker answers 503 instead of queueing
+        limit_concurrency=api.get("max_concurrency"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""Shared, warm resources behind the HTTP API."""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from data_sources import ArxivClient, QueryCache, SemanticScholarClient, shared_flight
+from embeddings import MicroBatcher, get_encoder
+from ingestion import AbstractIndexer, chunk_metadata
+from parsers import PDFParser, SemanticChunker
+from ranking import PaperRanker
+from vector_stores import FlatIndex, chunk_uid
+
+from .schemas import IngestRequest, JobStatus
+
+logger = logging.getLogger(__name__)
+
+SOURCES = {
+    "arxiv": ["arxiv"],
+    "semantic_scholar": ["semantic_scholar"],
+    "both": ["arxiv", "semantic_scholar"],
+}
+
+
+def _extract_text(pdf_path: str) -> str:
+    """Parse a PDF in a worker process."""
+    return PDFParser().extract_text(Path(pdf_path))
+
+
+def paper_dict(paper, score: Optional[float] = None) -> Dict[str, Any]:
+    """JSON-ready paper, with its ranking score when there is one."""
+    data = paper.to_dict()
+    if score is not None:
+        data["score"] = score
+    return data
+
+
+class ResearchService:
+    """Process-wide state for the API: clients, models, indexes and pools.
+
+    Everything is created once at startup and shared by all requests. Work
+    that blocks is kept off the event loop:
+
+    - API client calls run on ``io_executor`` (threads), with at most
+      ``max_upstream_requests`` concurrent calls per source
+    - encoding and ranking run on ``cpu_executor``; single query embeddings
+      go through a MicroBatcher so concurrent requests share model calls
+    - PDF parsing runs on ``parse_executor`` (processes)
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize service.
+
+        Args:
+            config: Parsed configs/agent_config.yaml
+        """
+        self.config = config
+        api = config.get("api", {})
+        self.max_upstream_requests = api.get("max_upstream_requests", 8)
+        self.pdf_dir = Path(config.get("storage", {}).get("papers_dir", "./data/papers"))
+
+        self.io_executor = ThreadPoolExecutor(
+            max_workers=api.get("io_workers", 32), thread_name_prefix="api-io"
+        )
+        self.cpu_executor = ThreadPoolExecutor(
+            max_workers=api.get("cpu_workers", 2), thread_name_prefix="api-cpu"
+        )
+        self.parse_executor = ProcessPoolExecutor(
+            max_workers=api.get("parse_workers", 2),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+        self.clients = {"arxiv": ArxivClient(), "semantic_scholar": SemanticScholarClient()}
+        retrieval = config.get("retrieval", {})
+        self.chunker = SemanticChunker(
+            chunk_size=retrieval.get("chunk_size", 512),
+            chunk_overlap=retrieval.get("chunk_overlap", 50),
+        )
+
+        self.encoder = None
+        self.batcher: Optional[MicroBatcher] = None
+        self.ranker: Optional[PaperRanker] = None
+        self.query_cache: Optional[QueryCache] = None
+        self.indexer: Optional[AbstractIndexer] = None
+        self.chunk_index: Optional[FlatIndex] = None
+        self.chunks: Dict[str, Dict[str, Any]] = {}
+        # Guards the in-memory indexes, which are written from executor threads
+        self.index_lock = threading.Lock()
+
+        self.jobs: Dict[str, JobStatus] = {}
+        self._tasks: set = set()
+        self._upstream: Dict[str, asyncio.Semaphore] = {}
+
+    async def start(self):
+        """Load the encoder and build the indexes before serving."""
+        embeddings = self.config.get("embeddings", {})
+        # Device is auto-detected, so the same config serves on CPU-only hosts
+        self.encoder = await self.run_cpu(
+            get_encoder,
+            embeddings.get("model", "sentence-transformers/all-mpnet-base-v2"),
+            use_fp16=embeddings.get("use_fp16", True),
+            batch_size=embeddings.get("batch_size", 128),
+        )
+        dim = self.encoder.get_embedding_dim()
+
+        self.batcher = MicroBatcher(self.encoder)
+        await self.batcher.start()
+        self.ranker = PaperRanker.from_config(self.config, self.encoder)
+        self.query_cache = QueryCache(self.encoder)
+        self.indexer = AbstractIndexer(self.encoder, FlatIndex.from_config(self.config, dim))
+        self.chunk_index = FlatIndex.from_config(self.config, dim)
+        self._upstream = {
+            name: asyncio.Semaphore(self.max_upstream_requests) for name in self.clients
+        }
+        logger.info(f"Research service ready (embedding dim {dim})")
+
+    async def close(self):
+        """Cancel running jobs and shut down the pools."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self.batcher is not None:
+            await self.batcher.close()
+        self.io_executor.shutdown(wait=False, cancel_futures=True)
+        self.cpu_executor.shutdown(wait=False, cancel_futures=True)
+        self.parse_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, executor: Executor, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+    async def run_io(self, fn, *args, **kwargs):
+        """Run a blocking network call on the I/O pool."""
+        return await self._run(self.io_executor, fn, *args, **kwargs)
+
+    async def run_cpu(self, fn, *args, **kwargs):
+        """Run encoding, ranking or index work on the CPU pool."""
+        return await self._run(self.cpu_executor, fn, *args, **kwargs)
+
+    async def search_source(self, source: str, query: str, limit: int) -> List:
+        """Search one source with bounded upstream concurrency.
+
+        Identical searches already in flight are awaited instead of
+        repeated, so they take neither an upstream slot nor an I/O thread.
+        """
+        return await shared_flight.do_async(
+            ("search", source, query, limit), self._search_source, source, query, limit
+        )
+
+    async def _search_source(self, source: str, query: str, limit: int) -> List:
+        client = self.clients[source]
+        async with self._upstream[source]:
+            if source == "arxiv":
+                return await self.run_io(client.search, query, max_results=limit)
+            return await self.run_io(client.search, query, limit=limit)
+
+    async def _search_named(self, source: str, query: str, limit: int):
+        """Search one source, returning (source, papers, error) instead of raising."""
+        try:
+            return source, await self.search_source(source, query, limit), None
+        except Exception as e:
+            return source, [], e
+
+    async def stream_search(
+        self,
+        query: str,
+        source: str = "both",
+        limit: int = 20,
+        rank: bool = True,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Federated search, yielding events as results become available.
+
+        Yields:
+            ``{"event": "source", ...}`` per source as it completes (or
+            ``{"event": "cached", ...}`` on a cache hit), ``{"event":
+            "error", ...}`` for a failed source, then one ``{"event":
+            "results", ...}`` with the final, optionally ranked, papers
+        """
+        sources = SOURCES[source]
+        namespace = f"{source}:{limit}"
+        papers = await self.run_cpu(self.query_cache.get, query, namespace)
+
+        if papers is not None:
+            yield {"event": "cached", "count": len(papers)}
+        else:
+            papers = []
+            per_source = max(limit // len(sources), 1)
+            searches = [self._search_named(name, query, per_source) for name in sources]
+            for done in asyncio.as_completed(searches):
+                name, found, error = await done
+                if error is not None:
+                    logger.error(f"Error searching {name}: {error}")
+                    yield {"event": "error", "source": name, "detail": str(error)}
+                    continue
+                papers.extend(found)
+                yield {
+                    "event": "source",
+                    "source": name,
+                    "papers": [paper_dict(paper) for paper in found],
+                }
+
+            if papers:
+                await self.run_cpu(self.query_cache.put, query, papers, namespace)
+                self._spawn(self.run_cpu(self._index_abstracts, papers))
+
+        if rank and papers:
+            ranked = await self.run_cpu(self.ranker.rank, query, papers, limit)
+        else:
+            ranked = [(paper, None) for paper in papers[:limit]]
+        yield {
+            "event": "results",
+            "query": query,
+            "papers": [paper_dict(paper, score) for paper, score in ranked],
+        }
+
+    async def get_paper(self, paper_id: str, source: str = "arxiv") -> Optional[Dict[str, Any]]:
+        """Look up a paper, from the index when it has been seen before."""
+        paper = self.indexer.papers.get(paper_id)
+        if paper is None:
+            paper = await self.fetch_paper(paper_id, source)
+        return None if paper is None else paper_dict(paper)
+
+    async def fetch_paper(self, paper_id: str, source: str):
+        """Fetch a paper upstream, sharing lookups of the same paper in flight."""
+        return await shared_flight.do_async(
+            ("paper", source, paper_id), self._fetch_paper, paper_id, source
+        )
+
+    async def _fetch_paper(self, paper_id: str, source: str):
+        async with self._upstream[source]:
+            return await self.run_io(self.clients[source].get_paper_by_id, paper_id)
+
+    async def retrieve(self, query: str, top_k: int, level: str) -> List[Dict[str, Any]]:
+        """Nearest indexed abstracts or chunks for a query."""
+        vector = (await self.batcher.encode([query]))[0]
+
+        if level == "chunks":
+            hits = (await self.run_cpu(self._search, self.chunk_index, vector, top_k))[0]
+            return [
+                {"id": hit.id, "score": hit.score, **self.chunks.get(hit.id, {})}
+                for hit in hits
+            ]
+
+        hits = (await self.run_cpu(self._search, self.indexer.index, vector, top_k))[0]
+        return [
+            {"id": hit.id, "score": hit.score, "paper": paper_dict(self.indexer.papers[hit.id])}
+            for hit in hits
+        ]
+
+    def _search(self, index, vector, top_k: int):
+        with self.index_lock:
+            return index.search(vector, top_k=top_k)
+
+    def _index_abstracts(self, papers: List) -> int:
+        with self.index_lock:
+            return self.indexer.index_papers(papers)
+
+    def submit_ingest(self, request: IngestRequest) -> JobStatus:
+        """Queue an ingest job and return immediately."""
+        job = JobStatus(job_id=uuid.uuid4().hex, status="queued", submitted=time.time())
+        self.jobs[job.job_id] = job
+        self._spawn(self._run_ingest(job, request))
+        return job
+
+    def _spawn(self, coroutine):
+        """Run a background task, keeping a reference until it finishes."""
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run_ingest(self, job: JobStatus, request: IngestRequest):
+        job.status = "running"
+        try:
+            papers = []
+            for paper_id in request.paper_ids:
+                source = "arxiv" if request.source == "both" else request.source
+                paper = await self.fetch_paper(paper_id, source)
+                if paper is not None:
+                    papers.append(paper)
+            if request.query:
+                per_source = max(request.max_results // len(SOURCES[request.source]), 1)
+                results = await asyncio.gather(*(
+                    self.search_source(name, request.query, per_source)
+                    for name in SOURCES[request.source]
+                ))
+                papers.extend(paper for found in results for paper in found)
+
+            job.result["papers"] = len(papers)
+            job.result["abstracts_indexed"] = await self.run_cpu(self._index_abstracts, papers)
+            if request.full_text:
+                job.result["chunks_indexed"] = await self._ingest_full_text(papers)
+
+            job.status = "done"
+        except Exception as e:
+            logger.error(f"Ingest job {job.job_id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished = time.time()
+
+    async def _ingest_full_text(self, papers: List) -> int:
+        """Download, parse (in processes), chunk and embed arXiv papers."""
+        arxiv_client = self.clients["arxiv"]
+
+        async def chunk_paper(paper) -> List[Dict[str, Any]]:
+            try:
+                async with self._upstream["arxiv"]:
+                    pdf_path = await self.run_io(arxiv_client.download_pdf, paper, self.pdf_dir)
+                text = await self._run(self.parse_executor, _extract_text, str(pdf_path))
+            except Exception as e:
+                logger.warning(f"Skipping full text of {paper.id}: {e}")
+                return []
+            return await self.run_cpu(self.chunker.chunk_text, text, metadata=chunk_metadata(paper))
+
+        chunk_lists = await asyncio.gather(*(
+            chunk_paper(paper) for paper in papers if paper.source == "arxiv"
+        ))
+        chunks = [chunk for chunk_list in chunk_lists for chunk in chunk_list]
+        if not chunks:
+            return 0
+
+        vectors = await self.run_cpu(
+            self.encoder.encode, [chunk["text"] for chunk in chunks], show_progress=False
+        )
+        ids = [chunk_uid(chunk) for chunk in chunks]
+
+        def add():
+            with self.index_lock:
+                self.chunk_index.add(vectors, ids)
+                self.chunks.update(zip(ids, chunks))
+
+        await self.run_cpu(add)
+        return len(chunks)
+
@@ -0,0 +1,741 @@
+"""Command-line interface for Research Pilot.
+
+Usage:
+    python src/cli.py ingest "graph neural networks" --max-results 10000
+    python src/cli.py status
+    python src/cli.py queue enqueue "graph neural networks" --max-results 10000
+    python src/cli.py queue work --processes 4
+    python src/cli.py queue status
+    python src/cli.py load-snapshot arxiv-metadata-oai-snapshot.json
+    python src/cli.py harvest cs.LG cs.CL && python src/cli.py ingest
+    python src/cli.py shard build --papers papers.jsonl --shard 0 --num-shards 4
+    python src/cli.py shard merge --num-shards 4
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import click
+
+from config import load_config
+
+logger = logging.getLogger(__name__)
+
+
+def _ingestion_settings(config: Dict[str, Any], work_dir: Optional[Path]) -> Dict[str, Any]:
+    settings = dict(config.get("ingestion", {}))
+    settings["work_dir"] = Path(work_dir or settings.get("work_dir", "./data/ingest"))
+    return settings
+
+
+def _open_checkpoint(settings: Dict[str, Any]):
+    from data_sources.arxiv_client import Paper
+    from ingestion import IngestionCheckpoint
+
+    return IngestionCheckpoint(
+        settings["work_dir"] / "checkpoint.jsonl",
+        Paper,
+        max_attempts=settings.get("max_attempts", 3),
+    )
+
+
+def _load_encoder(config: Dict[str, Any]):
+    from embeddings import get_encoder
+
+    embeddings = config.get("embeddings", {})
+    # Device is auto-detected, so the same config works on CPU-only hosts
+    return get_encoder(
+        embeddings.get("model", "sentence-transformers/all-mpnet-base-v2"),
+        use_fp16=embeddings.get("use_fp16", True),
+        batch_size=embeddings.get("batch_size", 128),
+    )
+
+
+def _chunker(config: Dict[str, Any]):
+    from parsers import SemanticChunker
+
+    retrieval = config.get("retrieval", {})
+    return SemanticChunker(
+        chunk_size=retrieval.get("chunk_size", 512),
+        chunk_overlap=retrieval.get("chunk_overlap", 50),
+    )
+
+
+@click.group()
+@click.option("--config", "config_path", type=click.Path(path_type=Path), default=None,
+              help="Config file (default: configs/agent_config.yaml)")
+@click.option("-v", "--verbose", is_flag=True, help="Log every step")
+@click.pass_context
+def main(ctx: click.Context, config_path: Optional[Path], verbose: bool):
+    """Research Pilot command-line tools."""
+    logging.basicConfig(
+        level=logging.INFO if verbose else logging.WARNING,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    ctx.obj = load_config(config_path)
+
+
+@main.command()
+@click.argument("query", required=False)
+@click.option("--max-results", default=100, show_default=True, help="Papers to fetch from arXiv")
+@click.option("--work-dir", type=click.Path(path_type=Path), default=None,
+              help="Checkpoint, PDF, text and index directory (default: ingestion.work_dir)")
+@click.option("--download-workers", type=int, default=None, help="Concurrent PDF downloads")
+@click.option("--parse-workers", type=int, default=None, help="PDF parsing processes")
+@click.option("--chunk-workers", type=int, default=None, help="Chunking threads")
+@click.option("--batch-size", type=int, default=None, help="Chunks per embedding call")
+@click.option("--refresh", is_flag=True, help="Search again even if the work dir has papers queued")
+@click.pass_obj
+def ingest(
+    config: Dict[str, Any],
+    query: Optional[str],
+    max_results: int,
+    work_dir: Optional[Path],
+    download_workers: Optional[int],
+    parse_workers: Optional[int],
+    chunk_workers: Optional[int],
+    batch_size: Optional[int],
+    refresh: bool,
+):
+    """Search arXiv for QUERY and index the full text of the results.
+
+    Runs search -> download -> parse -> chunk -> embed -> index. Progress is
+    checkpointed per paper in the work directory; run the command again
+    (QUERY may be omitted) to resume an interrupted ingest.
+    """
+    from data_sources import ArxivClient
+
+    settings = _ingestion_settings(config, work_dir)
+    checkpoint = _open_checkpoint(settings)
+    arxiv_client = ArxivClient()
+
+    if query and (refresh or len(checkpoint) == 0):
+        click.echo(f"Searching arXiv for {query!r} (up to {max_results} papers)...")
+        papers = arxiv_client.search(query, max_results=max_results)
+        added = checkpoint.add_papers(papers)
+        click.echo(f"Found {len(papers)} papers, {added} new")
+    elif len(checkpoint) == 0:
+        raise click.UsageError("Nothing to resume in the work directory; give a QUERY")
+
+    papers = checkpoint.pending()
+    if not papers:
+        click.echo("All papers are already ingested")
+        checkpoint.close()
+        return
+
+    workers = {"download": download_workers, "parse": parse_workers, "chunk": chunk_workers}
+    _run_pipeline(config, settings, checkpoint, arxiv_client, papers, workers, batch_size)
+
+
+def _run_pipeline(
+    config: Dict[str, Any],
+    settings: Dict[str, Any],
+    checkpoint,
+    arxiv_client,
+    papers: List,
+    worker_overrides: Dict[str, Optional[int]],
+    batch_size: Optional[int],
+):
+    """Run the ingestion pipeline over papers with a progress bar.
+
+    Returns:
+        The pipeline's stats
+    """
+    from tqdm import tqdm
+
+    from ingestion import IngestionPipeline, ManifestStore
+    from parsers import PDFParser
+    from vector_stores import SegmentedIndex
+
+    encoder = _load_encoder(config)
+
+    workers = dict(settings.get("workers", {}))
+    workers.update({stage: value for stage, value in worker_overrides.items() if value is not None})
+
+    index = SegmentedIndex.from_config(
+        config, settings["work_dir"] / "index", encoder.get_embedding_dim()
+    )
+    pipeline = IngestionPipeline(
+        arxiv_client,
+        PDFParser(),
+        _chunker(config),
+        encoder,
+        index,
+        checkpoint,
+        settings["work_dir"],
+        workers=workers,
+        embed_batch_size=batch_size or settings.get("embed_batch_size", 256),
+        queue_size=settings.get("queue_size", 64),
+        manifests=ManifestStore(settings["work_dir"] / "manifests"),
+    )
+
+    click.echo(f"Ingesting {len(papers)} papers into {settings['work_dir']}")
+    with tqdm(total=len(papers), unit="paper", dynamic_ncols=True) as bar:
+
+        def progress(stats: Dict[str, Any]):
+            bar.update(stats["indexed"] + stats["failed"] + stats["unchanged"] - bar.n)
+            queued = stats["queued"]
+            bar.set_postfix_str(
+                f"chunks={stats['chunks']} failed={stats['failed']} "
+                f"queues dl={queued['download']} parse={queued['parse']} "
+                f"chunk={queued['chunk']} embed={queued['embed']}",
+                refresh=False,
+            )
+
+        try:
+            stats = pipeline.run(papers, progress=progress)
+        finally:
+            index.close()
+            checkpoint.close()
+
+    click.echo(
+        f"Indexed {stats['indexed']} papers ({stats['chunks']} chunks embedded, "
+        f"{stats['reused']} reused, {stats['deleted']} deleted), "
+        f"{stats['unchanged']} unchanged, {stats['failed']} failed, in {stats['elapsed']:.0f}s"
+    )
+    if stats["indexed"] + stats["failed"] + stats["unchanged"] < len(papers):
+        click.echo("Stopped early; run the command again to resume")
+    return stats
+
+
+@main.command()
+@click.option("--work-dir", type=click.Path(path_type=Path), default=None,
+              help="Ingestion work directory (default: ingestion.work_dir)")
+@click.option("--errors", is_flag=True, help="List the papers that failed and why")
+@click.pass_obj
+def status(config: Dict[str, Any], work_dir: Optional[Path], errors: bool):
+    """Show how many papers are in each ingestion state."""
+    settings = _ingestion_settings(config, work_dir)
+    checkpoint = _open_checkpoint(settings)
+    try:
+        counts = checkpoint.counts()
+        if not counts:
+            click.echo(f"No ingestion state in {settings['work_dir']}")
+            return
+        for state, count in sorted(counts.items()):
+            click.echo(f"{state:>12}: {count}")
+        click.echo(f"{'pending':>12}: {len(checkpoint.pending())}")
+        if errors:
+            for paper_id, error in checkpoint.failures().items():
+                click.echo(f"{paper_id}: {error}")
+    finally:
+        checkpoint.close()
+
+
+@main.command("load-snapshot")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True, path_type=Path))
+@click.option("--format", "fmt", type=click.Choice(["arxiv", "s2"]), default=None,
+              help="Snapshot format (default: detected per file)")
+@click.option("--output-dir", type=click.Path(path_type=Path), default=None,
+              help="Parquet directory (default: storage.metadata_dir/papers)")
+@click.option("--workers", type=int, default=None, help="Parsing processes")
+@click.option("--batch-size", type=int, default=None, help="Records per block")
+@click.pass_obj
+def load_snapshot(
+    config: Dict[str, Any],
+    paths: List[Path],
+    fmt: Optional[str],
+    output_dir: Optional[Path],
+    workers: Optional[int],
+    batch_size: Optional[int],
+):
+    """Load offline metadata dumps (arXiv snapshot, Semantic Scholar shards).
+
+    Each file in PATHS, plain or gzipped JSON Lines, becomes one Parquet
+    file of papers in the metadata store.
+    """
+    from tqdm import tqdm
+
+    from data_sources import SnapshotLoader
+
+    loader = SnapshotLoader.from_config(
+        config, output_dir=output_dir, workers=workers, batch_size=batch_size
+    )
+    for path in paths:
+        with tqdm(total=path.stat().st_size, unit="B", unit_scale=True, desc=path.name) as bar:
+            result = loader.load(path, fmt, progress=bar.update)
+        rate = result["papers"] / max(result["elapsed"], 1e-9)
+        click.echo(
+            f"{result['papers']} papers -> {result['output']} "
+            f"({result['skipped']} skipped, {rate:,.0f} records/s)"
+        )
+
+
+def _open_queue(config: Dict[str, Any], settings: Dict[str, Any]):
+    from ingestion import JobQueue
+
+    return JobQueue.from_config(config, settings["work_dir"] / "queue.db")
+
+
+@main.group()
+def queue():
+    """Ingest through a durable job queue shared by worker processes."""
+
+
+@queue.command("enqueue")
+@click.argument("query")
+@click.option("--max-results", default=100, show_default=True, help="Papers to fetch from arXiv")
+@click.option("--priority", default=0, show_default=True, help="Higher runs first")
+@click.option("--work-dir", type=click.Path(path_type=Path), default=None,
+              help="Queue and data directory (default: ingestion.work_dir)")
+@click.pass_obj
+def queue_enqueue(
+    config: Dict[str, Any],
+    query: str,
+    max_results: int,
+    priority: int,
+    work_dir: Optional[Path],
+):
+    """Search arXiv for QUERY and queue the results for ingestion."""
+    from data_sources import ArxivClient
+    from ingestion import QueueStages
+
+    settings = _ingestion_settings(config, work_dir)
+    job_queue = _open_queue(config, settings)
+    papers = ArxivClient().search(query, max_results=max_results)
+    added = QueueStages(job_queue, settings["work_dir"]).enqueue_papers(papers, priority)
+    click.echo(f"Queued {added} of {len(papers)} papers ({len(papers) - added} already queued)")
+
+
+def _work(
+    config: Dict[str, Any],
+    settings: Dict[str, Any],
+    stages: List[str],
+    exit_when_idle: bool,
+):
+    """Body of one worker process: build what its stages need and run."""
+    from data_sources import ArxivClient
+    from data_sources.arxiv_client import Paper
+    from ingestion import ManifestStore, QueueStages, QueueWorker
+    from parsers import PDFParser
+    from vector_stores import SegmentedIndex
+
+    job_queue = _open_queue(config, settings)
+    components: Dict[str, Any] = {}
+    if "download" in stages:
+        components["arxiv_client"] = ArxivClient()
+    if "parse" in stages:
+        components["parser"] = PDFParser()
+    if "embed" in stages or "index" in stages:
+        encoder = _load_encoder(config)
+        if "embed" in stages:
+            components["encoder"] = encoder
+            components["chunker"] = _chunker(config)
+        if "index" in stages:
+            components["index"] = SegmentedIndex.from_config(
+                config, settings["work_dir"] / "index", encoder.get_embedding_dim()
+            )
+
+    handlers = QueueStages(
+        job_queue,
+        settings["work_dir"],
+        Paper,
+        manifests=ManifestStore(settings["work_dir"] / "manifests"),
+        **components,
+    ).handlers()
+    worker = QueueWorker(job_queue, {stage: handlers[stage] for stage in stages})
+    try:
+        stats = worker.run(exit_when_idle=exit_when_idle)
+    except KeyboardInterrupt:
+        stats = worker.stats
+    finally:
+        if "index" in components:
+            components["index"].close()
+    logger.info(f"Worker {worker.worker_id} finished: {stats}")
+
+
+@queue.command("work")
+@click.option("--stages", default=",".join(("download", "parse", "embed", "index")),
+              show_default=True, help="Comma-separated stages to run")
+@click.option("--processes", default=1, show_default=True, help="Worker processes")
+@click.option("--exit-when-idle", is_flag=True, help="Stop once the queue is drained")
+@click.option("--work-dir", type=click.Path(path_type=Path), default=None,
+              help="Queue and data directory (default: ingestion.work_dir)")
+@click.pass_obj
+def queue_work(
+    config: Dict[str, Any],
+    stages: str,
+    processes: int,
+    exit_when_idle: bool,
+    work_dir: Optional[Path],
+):
+    """Run worker processes that pull jobs from the queue.
+
+    The index stage has a single writer, so only the first process runs it.
+    Start more workers on other terminals or hosts sharing the work
+    directory with --stages download,parse,embed.
+    """
+    import multiprocessing
+
+    from ingestion import QUEUE_STAGES
+
+    stage_list = [stage.strip() for stage in stages.split(",") if stage.strip()]
+    unknown = set(stage_list) - set(QUEUE_STAGES)
+    if unknown:
+        raise click.BadParameter(f"unknown stages {sorted(unknown)}, expected {QUEUE_STAGES}")
+
+    settings = _ingestion_settings(config, work_dir)
+    if processes == 1:
+        _work(config, settings, stage_list, exit_when_idle)
+        return
+
+    others = [stage for stage in stage_list if stage != "index"]
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(
+            target=_work,
+            args=(config, settings, stage_list if i == 0 else others, exit_when_idle),
+            name=f"queue-worker-{i}",
+        )
+        for i in range(processes)
+        if i == 0 or others
+    ]
+    for process in workers:
+        process.start()
+    click.echo(f"Started {len(workers)} worker processes; Ctrl-C to stop")
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        for process in workers:
+            process.join()
+
+
+@queue.command("status")
+@click.option("--work-dir", type=click.Path(path_type=Path), default=None,
+              help="Queue and data directory (default: ingestion.work_dir)")
+@click.option("--json", "as_json", is_flag=True, help="Print the raw status as JSON")
+@click.pass_obj
+def queue_status(config: Dict[str, Any], work_dir: Optional[Path], as_json: bool):
+    """Show queue depth and per-stage latency."""
+    import json
+
+    from ingestion import QUEUE_STAGES
+
+    report = _open_queue(config, _ingestion_settings(config, work_dir)).status()
+    if as_json:
+        click.echo(json.dumps(report, indent=2))
+        return
+
+    click.echo(f"{'stage':<10}{'ready':>8}{'delayed':>9}{'leased':>8}{'done':>8}{'failed':>8}"
+               f"{'run p50':>10}{'run p95':>10}{'wait p50':>10}")
+    order = [stage for stage in QUEUE_STAGES if stage in report["stages"]]
+    order += sorted(set(report["stages"]) - set(order))
+    for name in order:
+        stage = report["stages"][name]
+        run, wait = stage["run_seconds"], stage["wait_seconds"]
+        click.echo(
+            f"{name:<10}{stage['ready']:>8}{stage['delayed']:>9}{stage['leased']:>8}"
+            f"{stage['done']:>8}{stage['failed']:>8}"
+            f"{run.get('p50', 0):>9.2f}s{run.get('p95', 0):>9.2f}s{wait.get('p50', 0):>9.1f}s"
+        )
+
+
+@queue.command("retry")
+@click.option("--stage", default=None, help="Only retry this stage")
+@click.option("--work-dir", type=click.Path(path_type=Path), default=None,
+              help="Queue and data directory (default: ingestion.work_dir)")
+@click.pass_obj
+def queue_retry(config: Dict[str, Any], stage: Optional[str], work_dir: Optional[Path]):
+    """Requeue jobs that failed permanently."""
+    count = _open_queue(config, _ingestion_settings(config, work_dir)).retry_failed(stage)
+    click.echo(f"Requeued {count} jobs")
+
+
+def _shard_settings(settings: Dict[str, Any], shard: int, num_shards: int) -> Dict[str, Any]:
+    from ingestion import shard_name
+
+    return {**settings, "work_dir": settings["work_dir"] / "shards" / shard_name(shard, num_shards)}
+
+
+def _num_shards(settings: Dict[str, Any], num_shards: Optional[int]) -> int:
+    return num_shards or settings.get("shards", 4)
+
+
+def _load_papers(path: Path) -> List:
+    """Papers from a JSON Lines file of ``Paper.to_dict()`` or a snapshot Parquet file."""
+    import json
+
+    from data_sources import read_papers
+    from data_sources.arxiv_client import Paper
+    from ingestion import paper_from_dict
+
+    if path.suffix == ".parquet":
+        return list(read_papers(path))
+    with open(path, encoding="utf-8") as f:
+        return [paper_from_dict(json.loads(line), Paper) for line in f if line.strip()]
+
+
+def _build_shard(
+    config: Dict[str, Any],
+    settings: Dict[str, Any],
+    shard: int,
+    num_shards: int,
+    papers: List,
+    batch_size: Optional[int] = None,
+):
+    """Ingest one shard's papers and build its lexical index (one node's work)."""
+    from data_sources import ArxivClient
+    from ingestion import ManifestStore, build_lexical_index, partition, read_chunks
+    from vector_stores import BM25Index
+
+    settings = _shard_settings(settings, shard, num_shards)
+    checkpoint = _open_checkpoint(settings)
+    checkpoint.add_papers(partition(papers, num_shards)[shard])
+    pending = checkpoint.pending()
+    if pending:
+        _run_pipeline(config, settings, checkpoint, ArxivClient(), pending, {}, batch_size)
+    else:
+        checkpoint.close()
+
+    work_dir = settings["work_dir"]
+    live = ManifestStore(work_dir / "manifests").chunk_ids()
+    chunks = read_chunks(work_dir / "chunks.jsonl", live)
+    build_lexical_index(chunks, BM25Index()).save(work_dir / "bm25")
+    click.echo(f"Shard {shard}/{num_shards}: {len(chunks)} chunks in {work_dir}")
+
+
+@main.group()
+def shard():
+    """Build the corpus as hash-partitioned shards on several nodes."""
+
+
+@shard.command("build")
+@click.argument("query", required=False)
+@click.option("--shard", "shard_id", type=int, required=True, help="Shard this node builds")
+@click.option("--num-shards", type=int, default=None, help="Total shards (default: ingestion.shards)")
+@click.option("--papers", "papers_path", type=click.Path(exists=True, path_type=Path), default=None,
+              help="Papers to partition: JSON Lines of Paper dicts or a snapshot Parquet file")
+@click.option("--max-results", default=100, show_default=True, help="Papers to fetch from arXiv")
+@click.option("--batch-size", type=int, default=None, help="Chunks per embedding call")
+@click.option("--work-dir", type=click.Path(path_type=Path), default=None,
+              help="Directory holding shards/ (default: ingestion.work_dir)")
+@click.pass_obj
+def shard_build(
+    config: Dict[str, Any],
+    query: Optional[str],
+    shard_id: int,
+    num_shards: Optional[int],
+    papers_path: Optional[Path],
+    max_results: int,
+    batch_size: Optional[int],
+    work_dir: Optional[Path],
+):
+    """Ingest this node's shard of the papers from --papers or an arXiv QUERY.
+
+    Every node reads the same paper list and keeps the papers whose ID
+    hashes to its shard. Rerun to resume.
+    """
+    from data_sources import ArxivClient
+
+    settings = _ingestion_settings(config, work_dir)
+    num_shards = _num_shards(settings, num_shards)
+    if papers_path is not None:
+        papers = _load_papers(papers_path)
+    elif query:
+        papers = ArxivClient().search(query, max_results=max_results)
+    else:
+        papers = []
+    _build_shard(config, settings, shard_id, num_shards, papers, batch_size)
+
+
+@shard.command("run")
+@click.argument("query", required=False)
+@click.option("--num-shards", type=int, default=None, help="Total shards (default: ingestion.shards)")
+@click.option("--papers", "papers_path", type=click.Path(exists=True, path_type=Path), default=None,
+              help="Papers to partition: JSON Lines of Paper dicts or a snapshot Parquet file")
+@click.option("--max-results", default=100, show_default=True, help="Papers to fetch from arXiv")
+@click.option("--work-dir", type=click.Path(path_type=Path), default=None,
+              help="Directory holding shards/ (default: ingestion.work_dir)")
+@click.pass_obj
+def shard_run(
+    config: Dict[str, Any],
+    query: Optional[str],
+    num_shards: Optional[int],
+    papers_path: Optional[Path],
+    max_results: int,
+    work_dir: Optional[Path],
+):
+    """Build every shard at once, one local process per shard standing in for a node."""
+    import multiprocessing
+
+    from data_sources import ArxivClient
+
+    settings = _ingestion_settings(config, work_dir)
+    num_shards = _num_shards(settings, num_shards)
+    if papers_path is not None:
+        papers = _load_papers(papers_path)
+    elif query:
+        papers = ArxivClient().search(query, max_results=max_results)
+    else:
+        raise click.UsageError("Give a QUERY or --papers")
+
+    context = multiprocessing.get_context("spawn")
+    nodes = [
+        context.Process(
+            target=_build_shard,
+            args=(config, settings, i, num_shards, papers),
+            name=f"shard-{i}",
+        )
+        for i in range(num_shards)
+    ]
+    for process in nodes:
+        process.start()
+    click.echo(f"Started {num_shards} shard processes")
+    try:
+        for process in nodes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in nodes:
+            process.join()
+    failed = [process.name for process in nodes if process.exitcode != 0]
+    if failed:
+        raise click.ClickException(f"Shards failed: {', '.join(failed)}; rerun to resume")
+
+
+@shard.command("merge")
+@click.option("--num-shards", type=int, default=None, help="Total shards (default: ingestion.shards)")
+@click.option("--output", type=click.Path(path_type=Path), default=None,
+              help="Merged work directory (default: <work dir>/merged)")
+@click.option("--work-dir", type=click.Path(path_type=Path), default=None,
+              help="Directory holding shards/ (default: ingestion.work_dir)")
+@click.pass_obj
+def shard_merge(
+    config: Dict[str, Any],
+    num_shards: Optional[int],
+    output: Optional[Path],
+    work_dir: Optional[Path],
+):
+    """Combine the shards' vector and BM25 indexes into one work directory.
+
+    Copy the shard directories from the nodes into shards/ first.
+    """
+    from ingestion import merge_work_dirs
+    from vector_stores import BM25Index, SegmentedIndex, merge_indexes
+
+    settings = _ingestion_settings(config, work_dir)
+    num_shards = _num_shards(settings, num_shards)
+    output = output or settings["work_dir"] / "merged"
+    if (output / "index").exists():
+        raise click.UsageError(f"{output} already has an index; choose another --output")
+
+    shard_dirs = [_shard_settings(settings, i, num_shards)["work_dir"] for i in range(num_shards)]
+    missing = [str(d) for d in shard_dirs if not (d / "bm25").exists()]
+    if missing:
+        raise click.UsageError(f"Shards not built: {', '.join(missing)}")
+
+    dim = _load_encoder(config).get_embedding_dim()
+    sources = [SegmentedIndex.from_config(config, d / "index", dim) for d in shard_dirs]
+    try:
+        merged = merge_indexes(sources, output / "index")
+        try:
+            chunks = merge_work_dirs(shard_dirs, output, merged)
+            count = len(merged)
+        finally:
+            merged.close()
+    finally:
+        for source in sources:
+            source.close()
+
+    BM25Index.merge([BM25Index.load(d / "bm25") for d in shard_dirs]).save(output / "bm25")
+    click.echo(f"Merged {num_shards} shards into {output}: {count} vectors, {chunks} chunks")
+
+
+@shard.command("search")
+@click.argument("query")
+@click.option("--num-shards", type=int, default=None, help="Total shards (default: ingestion.shards)")
+@click.option("--top-k", default=10, show_default=True, help="Results")
+@click.option("--work-dir", type=click.Path(path_type=Path), default=None,
+              help="Directory holding shards/ (default: ingestion.work_dir)")
+@click.pass_obj
+def shard_search(
+    config: Dict[str, Any],
+    query: str,
+    num_shards: Optional[int],
+    top_k: int,
+    work_dir: Optional[Path],
+):
+    """Hybrid search over all shards without merging them."""
+    from vector_stores import BM25Index, SegmentedIndex, ShardRouter, reciprocal_rank_fusion
+
+    settings = _ingestion_settings(config, work_dir)
+    num_shards = _num_shards(settings, num_shards)
+    shard_dirs = [_shard_settings(settings, i, num_shards)["work_dir"] for i in range(num_shards)]
+
+    encoder = _load_encoder(config)
+    indexes = [
+        SegmentedIndex.from_config(config, d / "index", encoder.get_embedding_dim())
+        for d in shard_dirs
+    ]
+    dense = ShardRouter(indexes)
+    lexical = ShardRouter([BM25Index.load(d / "bm25") for d in shard_dirs])
+    try:
+        vector = encoder.encode(query, show_progress=False)
+        hits = reciprocal_rank_fusion([
+            dense.search(vector, top_k=top_k)[0],
+            lexical.search(query, top_k=top_k)[0],
+        ])[:top_k]
+    finally:
+        dense.close()
+        lexical.close()
+        for index in indexes:
+            index.close()
+    for rank, hit in enumerate(hits, start=1):
+        click.echo(f"{rank:>3}. {hit.score:.4f}  {hit.id}")
+
+
+@main.command()
+@click.argument("categories", nargs=-1)
+@click.option("--queue", "to_queue", is_flag=True,
+              help="Enqueue papers on the job queue instead of the ingest checkpoint")
+@click.option("--max-results", type=int, default=None,
+              help="Cap on results per category (default: until the last harvest)")
+@click.option("--reset", is_flag=True, help="Forget the watermarks and start over")
+@click.option("--work-dir", type=click.Path(path_type=Path), default=None,
+              help="Ingestion work directory (default: ingestion.work_dir)")
+@click.pass_obj
+def harvest(
+    config: Dict[str, Any],
+    categories: List[str],
+    to_queue: bool,
+    max_results: Optional[int],
+    reset: bool,
+    work_dir: Optional[Path],
+):
+    """Fetch papers of arXiv CATEGORIES that are new or updated since the last run.
+
+    Categories default to harvest.categories. The papers are added to the
+    ingest checkpoint (process them with `ingest`) or, with --queue, to the
+    job queue.
+    """
+    from data_sources import ArxivHarvester
+    from ingestion import QueueStages
+
+    categories = list(categories) or config.get("harvest", {}).get("categories", [])
+    if not categories:
+        raise click.UsageError("Give CATEGORIES or set harvest.categories in the config")
+
+    settings = _ingestion_settings(config, work_dir)
+    if to_queue:
+        stages = QueueStages(_open_queue(config, settings), settings["work_dir"])
+        sink, emit = None, stages.enqueue_papers
+    else:
+        sink = _open_checkpoint(settings)
+        emit = sink.add_papers
+
+    harvester = ArxivHarvester.from_config(config)
+    try:
+        for category in categories:
+            if reset:
+                harvester.reset(category)
+            papers = harvester.harvest(category, emit=emit, max_results=max_results)
+            click.echo(f"{category}: {len(papers)} new or updated papers "
+                       f"(watermark {harvester.watermark(category)})")
+    finally:
+        if sink is not None:
+            sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Loading of configs/agent_config.yaml."""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = Path(__file__).resolve().parents[1] / "configs" / "agent_config.yaml"
+
+
+def load_config(path: Optional[Path] = None) -> Dict[str, Any]:
+    """Load the agent configuration.
+
+    Args:
+        path: YAML config file; defaults to configs/agent_config.yaml
+
+    Returns:
+        Parsed configuration, empty if the file does not exist
+    """
+    path = Path(path or CONFIG_PATH)
+    if not path.exists():
+        logger.warning(f"Config {path} not found, using defaults")
+        return {}
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
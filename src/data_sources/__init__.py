@@ -2,5 +2,20 @@
 
 from .arxiv_client import ArxivClient
 from .semantic_scholar_client import SemanticScholarClient
+from .query_cache import QueryCache, normalize_query
+from .bulk_loader import SnapshotLoader, read_papers
+from .harvester import ArxivHarvester
+from .single_flight import KeyedLock, SingleFlight, shared_flight
 
-__all__ = ["ArxivClient", "SemanticScholarClient"]
+__all__ = [
+    "ArxivClient",
+    "SemanticScholarClient",
+    "QueryCache",
+    "normalize_query",
+    "SnapshotLoader",
+    "read_papers",
+    "ArxivHarvester",
+    "SingleFlight",
+    "KeyedLock",
+    "shared_flight",
+]
@@ -1,14 +1,23 @@
 """arXiv API client for searching and downloading papers."""
 
 import logging
-from typing import List, Optional, Dict, Any
+import os
+from typing import Iterator, List, Optional, Dict, Any, TYPE_CHECKING
 from dataclasses import dataclass
 from datetime import datetime
-import arxiv
 from pathlib import Path
 
+from .single_flight import KeyedLock, shared_flight
+
+if TYPE_CHECKING:
+    # Imported on first use; the arxiv package pulls in feedparser and requests
+    import arxiv
+
 logger = logging.getLogger(__name__)
 
+# Serializes writes to the same PDF path across threads and client instances
+_file_locks = KeyedLock()
+
 
 @dataclass
 class Paper:
@@ -59,42 +68,55 @@ class ArxivClient:
             max_results: Maximum number of results per query
         """
         self.max_results = max_results
-        self.client = arxiv.Client()
+        self._client = None
+
+    @property
+    def client(self) -> "arxiv.Client":
+        """Underlying arxiv.Client, created on first use."""
+        if self._client is None:
+            import arxiv
+
+            self._client = arxiv.Client()
+        return self._client
 
     def search(
         self,
         query: str,
         max_results: Optional[int] = None,
-        sort_by: arxiv.SortCriterion = arxiv.SortCriterion.Relevance,
-        sort_order: arxiv.SortOrder = arxiv.SortOrder.Descending,
+        sort_by: Optional["arxiv.SortCriterion"] = None,
+        sort_order: Optional["arxiv.SortOrder"] = None,
     ) -> List[Paper]:
         """Search arXiv for papers.
 
         Args:
             query: Search query
             max_results: Override default max results
-            sort_by: Sort criterion
-            sort_order: Sort order
+            sort_by: Sort criterion. Defaults to relevance
+            sort_order: Sort order. Defaults to descending
 
         Returns:
             List of Paper objects
         """
-        logger.info(f"Searching arXiv for: {query}")
-
         max_results = max_results or self.max_results
-
-        search = arxiv.Search(
-            query=query,
-            max_results=max_results,
-            sort_by=sort_by,
-            sort_order=sort_order,
+        return shared_flight.do(
+            ("arxiv.search", query, max_results, sort_by, sort_order),
+            self._search,
+            query,
+            max_results,
+            sort_by,
+            sort_order,
         )
 
-        papers = []
+    def _search(
+        self,
+        query: str,
+        max_results: int,
+        sort_by: Optional["arxiv.SortCriterion"],
+        sort_order: Optional["arxiv.SortOrder"],
+    ) -> List[Paper]:
+        logger.info(f"Searching arXiv for: {query}")
         try:
-            for result in self.client.results(search):
-                paper = self._convert_result(result)
-                papers.append(paper)
+            papers = list(self.iter_results(query, max_results, sort_by, sort_order))
         except Exception as e:
             logger.error(f"Error searching arXiv: {e}")
             raise
@@ -102,7 +124,40 @@ class ArxivClient:
         logger.info(f"Found {len(papers)} papers on arXiv")
         return papers
 
-    def _convert_result(self, result: arxiv.Result) -> Paper:
+    def iter_results(
+        self,
+        query: str,
+        max_results: Optional[int] = None,
+        sort_by: Optional["arxiv.SortCriterion"] = None,
+        sort_order: Optional["arxiv.SortOrder"] = None,
+    ) -> Iterator[Paper]:
+        """Lazily page through search results.
+
+        A page is only requested once the previous one is consumed, so
+        stopping early saves the remaining requests.
+
+        Args:
+            query: Search query
+            max_results: Maximum number of results; None pages until arXiv
+                has no more
+            sort_by: Sort criterion. Defaults to relevance
+            sort_order: Sort order. Defaults to descending
+
+        Yields:
+            Paper objects
+        """
+        import arxiv
+
+        search = arxiv.Search(
+            query=query,
+            max_results=max_results,
+            sort_by=sort_by or arxiv.SortCriterion.Relevance,
+            sort_order=sort_order or arxiv.SortOrder.Descending,
+        )
+        for result in self.client.results(search):
+            yield self._convert_result(result)
+
+    def _convert_result(self, result: "arxiv.Result") -> Paper:
         """Convert arxiv.Result to Paper object."""
         return Paper(
             id=result.entry_id.split("/")[-1],
@@ -122,6 +177,10 @@ class ArxivClient:
     def download_pdf(self, paper: Paper, output_dir: Path) -> Path:
         """Download PDF for a paper.
 
+        Concurrent downloads of the same file share one request, and the
+        file is written under a per-path lock and renamed into place, so it
+        is never written twice or seen half-written.
+
         Args:
             paper: Paper object
             output_dir: Directory to save PDF
@@ -134,24 +193,34 @@ class ArxivClient:
         # Sanitize filename
         filename = f"{paper.id.replace('/', '_')}.pdf"
         output_path = output_dir / filename
-
-        if output_path.exists():
-            logger.info(f"PDF already exists: {output_path}")
-            return output_path
-
-        logger.info(f"Downloading PDF: {paper.title}")
-
-        try:
-            # Find the paper and download
-            search = arxiv.Search(id_list=[paper.id])
-            result = next(self.client.results(search))
-            result.download_pdf(dirpath=str(output_dir), filename=filename)
-            logger.info(f"Downloaded PDF to: {output_path}")
-            return output_path
-        except Exception as e:
-            logger.error(f"Error downloading PDF for {paper.id}: {e}")
-            raise
-
+        key = str(output_path.resolve())
+        return shared_flight.do(("arxiv.pdf", key), self._download_pdf, paper, output_path, key)
+
+    def _download_pdf(self, paper: Paper, output_path: Path, key: str) -> Path:
+        with _file_locks.lock(key):
+            if output_path.exists():
+                logger.info(f"PDF already exists: {output_path}")
+                return output_path
+
+            logger.info(f"Downloading PDF: {paper.title}")
+
+            import arxiv
+
+            partial = output_path.with_name(f"{output_path.name}.{os.getpid()}.part")
+            try:
+                # Find the paper and download
+                search = arxiv.Search(id_list=[paper.id])
+                result = next(self.client.results(search))
+                result.download_pdf(dirpath=str(output_path.parent), filename=partial.name)
+                partial.replace(output_path)
+                logger.info(f"Downloaded PDF to: {output_path}")
+                return output_path
+            except Exception as e:
+                partial.unlink(missing_ok=True)
+                logger.error(f"Error downloading PDF for {paper.id}: {e}")
+                raise
+
+    @shared_flight.coalesce
     def get_paper_by_id(self, arxiv_id: str) -> Optional[Paper]:
         """Get a single paper by arXiv ID.
 
@@ -163,6 +232,8 @@ class ArxivClient:
         """
         logger.info(f"Fetching paper: {arxiv_id}")
 
+        import arxiv
+
         try:
             search = arxiv.Search(id_list=[arxiv_id])
             result = next(self.client.results(search))
@@ -0,0 +1,367 @@
+"""Stream offline metadata snapshots into Parquet.
+
+Supported inputs (plain or gzipped JSON Lines):
+
+- ``arxiv``: the arXiv metadata snapshot (``arxiv-metadata-oai-snapshot.json``)
+- ``s2``: Semantic Scholar datasets ``papers`` shards (``*.jsonl.gz``)
+"""
+
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .arxiv_client import Paper
+from .semantic_scholar_client import SemanticScholarClient
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMATS = ("arxiv", "s2")
+
+# Semantic Scholar datasets use lower-case names for the API's fields
+_S2_FIELDS = {
+    "corpusid": "corpusId",
+    "externalids": "externalIds",
+    "publicationdate": "publicationDate",
+    "citationcount": "citationCount",
+    "referencecount": "referenceCount",
+    "influentialcitationcount": "influentialCitationCount",
+    "openaccesspdf": "openAccessPdf",
+}
+
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.string()),
+        ("title", pa.string()),
+        ("authors", pa.list_(pa.string())),
+        ("abstract", pa.string()),
+        ("published", pa.timestamp("us", tz="UTC")),
+        ("updated", pa.timestamp("us", tz="UTC")),
+        ("pdf_url", pa.string()),
+        ("categories", pa.list_(pa.string())),
+        ("primary_category", pa.string()),
+        ("comment", pa.string()),
+        ("journal_ref", pa.string()),
+        ("doi", pa.string()),
+        ("citation_count", pa.int64()),
+        ("source", pa.string()),
+    ])
+
+
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1
+    )
+}
+
+
+def _snapshot_date(value: str) -> datetime:
+    """Parse an arXiv version date such as "Mon, 2 Apr 2007 19:18:42 GMT".
+
+    The fixed layout is split directly, which is several times faster than
+    ``email.utils`` on the millions of dates in a snapshot.
+    """
+    try:
+        _, day, month, year, clock, _ = value.split()
+        hour, minute, second = clock.split(":")
+        return datetime(
+            int(year), _MONTHS[month], int(day), int(hour), int(minute), int(second),
+            tzinfo=timezone.utc,
+        )
+    except (KeyError, ValueError):
+        return parsedate_to_datetime(value)
+
+
+def paper_from_arxiv_snapshot(record: Dict[str, Any]) -> Paper:
+    """Convert an arXiv metadata snapshot record to a Paper.
+
+    The ID carries the latest version ("2401.01234v2"), as with
+    ``ArxivClient.search``.
+    """
+    versions = record.get("versions") or []
+    version = versions[-1]["version"] if versions else ""
+    paper_id = f"{record['id']}{version}"
+
+    if versions:
+        published = _snapshot_date(versions[0]["created"])
+        updated = _snapshot_date(versions[-1]["created"])
+    else:
+        published = updated = datetime.fromisoformat(record["update_date"]).replace(
+            tzinfo=timezone.utc
+        )
+
+    if record.get("authors_parsed"):
+        authors = [
+            " ".join(part for part in (first, last, *rest) if part)
+            for last, first, *rest in record["authors_parsed"]
+        ]
+    else:
+        authors = [name.strip() for name in record.get("authors", "").split(",") if name.strip()]
+
+    categories = (record.get("categories") or "").split()
+    return Paper(
+        id=paper_id,
+        title=" ".join(record.get("title", "").split()),
+        authors=authors,
+        abstract=record.get("abstract", "").strip(),
+        published=published,
+        updated=updated,
+        pdf_url=f"https://arxiv.org/pdf/{paper_id}",
+        categories=categories,
+        primary_category=categories[0] if categories else "",
+        comment=record.get("comments"),
+        journal_ref=record.get("journal-ref"),
+        doi=record.get("doi"),
+    )
+
+
+def paper_from_s2_dataset(record: Dict[str, Any]) -> Optional[Paper]:
+    """Convert a Semantic Scholar datasets ``papers`` record to a Paper.
+
+    Fields are renamed to their API names and converted like search results.
+    Papers without an arXiv ID get ``CorpusId:<id>`` as their ID, which the
+    Semantic Scholar API accepts.
+    """
+    result = {_S2_FIELDS.get(key, key): value for key, value in record.items()}
+    result["externalIds"] = result.get("externalIds") or {}
+    if "paperId" not in result and "corpusId" in result:
+        result["paperId"] = f"CorpusId:{result['corpusId']}"
+    result["authors"] = result.get("authors") or []
+    result["citationCount"] = result.get("citationCount") or 0
+    return SemanticScholarClient._convert_result(result)
+
+
+_CONVERTERS: Dict[str, Callable[[Dict[str, Any]], Optional[Paper]]] = {
+    "arxiv": paper_from_arxiv_snapshot,
+    "s2": paper_from_s2_dataset,
+}
+
+
+def detect_format(path: Path) -> str:
+    """Guess the snapshot format from the first record of a file.
+
+    Raises:
+        ValueError: If the file is empty or not a known format
+    """
+    with _open(path) as f:
+        line = f.readline()
+    if not line.strip():
+        raise ValueError(f"{path} is empty")
+    record = _loads(line)
+    if "versions" in record or "authors_parsed" in record:
+        return "arxiv"
+    if "corpusid" in record or "externalids" in record:
+        return "s2"
+    raise ValueError(f"Unknown snapshot format in {path}")
+
+
+def _open(path: Path):
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _parse_batch(data: bytes, fmt: str) -> Tuple[Any, int]:
+    """Parse a block of JSON lines into a Paper table (worker processes).
+
+    Returns:
+        The table and the number of lines that were skipped
+    """
+    import pyarrow as pa
+
+    convert = _CONVERTERS[fmt]
+    papers: List[Paper] = []
+    skipped = 0
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            paper = convert(_loads(line))
+        except Exception as e:
+            logger.debug(f"Skipping {fmt} record: {e}")
+            paper = None
+        if paper is None:
+            skipped += 1
+        else:
+            papers.append(paper)
+
+    columns: Dict[str, List] = {name: [] for name in _schema().names}
+    for paper in papers:
+        for name, values in columns.items():
+            values.append(getattr(paper, name))
+    return pa.Table.from_pydict(columns, schema=_schema()), skipped
+
+
+class SnapshotLoader:
+    """Load bulk metadata dumps into Parquet files in the metadata store.
+
+    The input is read in blocks of ``batch_size`` lines that worker
+    processes turn into Papers and Arrow tables, while the main process
+    appends them to one Parquet file per input as row groups. At most two
+    blocks per worker are in flight, so memory stays constant regardless of
+    the snapshot size. Output is written to a ``.part`` file and renamed
+    when complete.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        workers: Optional[int] = None,
+        batch_size: int = 10000,
+        compression: str = "zstd",
+    ):
+        """Initialize loader.
+
+        Args:
+            output_dir: Directory for the Parquet files
+            workers: Parsing processes (default: CPU count)
+            batch_size: Lines per block (and Parquet row group)
+            compression: Parquet compression codec
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.output_dir = Path(output_dir)
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.compression = compression
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **overrides) -> "SnapshotLoader":
+        """Create a loader writing to ``storage.metadata_dir``/papers.
+
+        Args:
+            config: Full config dict (see configs/agent_config.yaml)
+            **overrides: Constructor arguments that take precedence
+        """
+        storage = config.get("storage", {})
+        bulk = config.get("bulk_load", {})
+        kwargs = {
+            "output_dir": Path(storage.get("metadata_dir", "./data/metadata")) / "papers",
+            "workers": bulk.get("workers"),
+            "batch_size": bulk.get("batch_size", 10000),
+            "compression": bulk.get("compression", "zstd"),
+        }
+        kwargs.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(**kwargs)
+
+    def _blocks(self, path: Path) -> Iterator[Tuple[bytes, int]]:
+        """Yield blocks of lines and the bytes of the file read so far."""
+        with open(path, "rb") as raw:
+            stream = gzip.open(raw, "rb") if Path(path).suffix == ".gz" else raw
+            lines: List[bytes] = []
+            for line in stream:
+                lines.append(line)
+                if len(lines) >= self.batch_size:
+                    yield b"".join(lines), raw.tell()
+                    lines = []
+            if lines:
+                yield b"".join(lines), raw.tell()
+
+    def load(
+        self,
+        path: Path,
+        fmt: Optional[str] = None,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> Dict[str, Any]:
+        """Load one snapshot file.
+
+        Args:
+            path: Snapshot file (``.gz`` files are decompressed on the fly)
+            fmt: One of SNAPSHOT_FORMATS; detected from the file if None
+            progress: Called with the number of input bytes consumed
+                after each block
+
+        Returns:
+            Output path and counts of papers and skipped records, with the
+            elapsed time
+        """
+        import pyarrow.parquet as pq
+
+        path = Path(path)
+        fmt = fmt or detect_format(path)
+        if fmt not in _CONVERTERS:
+            raise ValueError(f"Unknown snapshot format: {fmt}")
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        name = path.name.split(".")[0]
+        output = self.output_dir / f"{fmt}-{name}.parquet"
+        partial = output.with_name(output.name + ".part")
+
+        stats = {"papers": 0, "skipped": 0}
+        start = time.time()
+        consumed = 0
+        pending: deque = deque()
+
+        def drain(limit: int):
+            nonlocal consumed
+            while len(pending) > limit:
+                future, position = pending.popleft()
+                table, skipped = future.result()
+                writer.write_table(table)
+                stats["papers"] += table.num_rows
+                stats["skipped"] += skipped
+                if progress is not None:
+                    progress(position - consumed)
+                consumed = position
+
+        logger.info(f"Loading {fmt} snapshot {path} with {self.workers} workers")
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            with pq.ParquetWriter(partial, _schema(), compression=self.compression) as writer:
+                for block, position in self._blocks(path):
+                    pending.append((pool.submit(_parse_batch, block, fmt), position))
+                    drain(2 * self.workers)
+                drain(0)
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            partial.unlink(missing_ok=True)
+            raise
+        pool.shutdown()
+        partial.replace(output)
+
+        elapsed = time.time() - start
+        logger.info(
+            f"Loaded {stats['papers']} papers from {path} in {elapsed:.1f}s "
+            f"({stats['skipped']} records skipped)"
+        )
+        return {"output": str(output), **stats, "elapsed": elapsed}
+
+
+def read_papers(path: Path, batch_size: int = 10000) -> Iterator[Paper]:
+    """Stream Papers back out of a Parquet file written by SnapshotLoader.
+
+    Args:
+        path: Parquet file
+        batch_size: Rows read at a time
+
+    Yields:
+        Paper objects
+    """
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    for batch in parquet.iter_batches(batch_size=batch_size):
+        for row in batch.to_pylist():
+            yield Paper(**row)
@@ -0,0 +1,195 @@
+"""Incremental arXiv category harvesting with per-category watermarks."""
+
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .arxiv_client import ArxivClient, Paper
+
+logger = logging.getLogger(__name__)
+
+
+class ArxivHarvester:
+    """Fetch only the papers of a category that are new or updated since the last run.
+
+    Results are requested newest-first by last-updated date, and paging
+    stops at the first paper older than the category's high-water mark, so
+    a daily refresh costs about one request per page of changes. Papers
+    updated within ``overlap`` before the mark are re-scanned, since arXiv
+    can list a paper some time after its timestamp; the IDs and timestamps
+    already emitted in that window are kept to skip them. Papers older than
+    the first harvest of a category are never fetched.
+
+    The mark is stored in a JSON state file and only advanced after the
+    new papers were handed downstream, so a failed run is repeated.
+    """
+
+    def __init__(
+        self,
+        arxiv_client: ArxivClient,
+        state_path: Path,
+        overlap: float = 3600.0,
+        initial_max_results: int = 1000,
+    ):
+        """Initialize harvester.
+
+        Args:
+            arxiv_client: ArxivClient to query
+            state_path: JSON file with each category's watermark
+            overlap: Seconds before the watermark to re-scan
+            initial_max_results: Papers to fetch for a category that has no
+                watermark yet
+        """
+        self.arxiv_client = arxiv_client
+        self.state_path = Path(state_path)
+        self.overlap = overlap
+        self.initial_max_results = initial_max_results
+
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict[str, Any]] = {}
+        if self.state_path.exists():
+            with open(self.state_path, encoding="utf-8") as f:
+                self._state = json.load(f)
+
+    @classmethod
+    def from_config(
+        cls, config: Dict[str, Any], arxiv_client: Optional[ArxivClient] = None
+    ) -> "ArxivHarvester":
+        """Create a harvester from the ``harvest`` config section.
+
+        Args:
+            config: Full config dict (see configs/agent_config.yaml)
+            arxiv_client: Client to use (default: a new ArxivClient)
+        """
+        harvest = config.get("harvest", {})
+        metadata_dir = Path(config.get("storage", {}).get("metadata_dir", "./data/metadata"))
+        return cls(
+            arxiv_client or ArxivClient(),
+            harvest.get("state_path") or metadata_dir / "harvest_state.json",
+            overlap=harvest.get("overlap_minutes", 60) * 60,
+            initial_max_results=harvest.get("initial_max_results", 1000),
+        )
+
+    def watermark(self, category: str) -> Optional[datetime]:
+        """Last-updated time of the newest paper harvested for a category."""
+        state = self._state.get(category)
+        return datetime.fromisoformat(state["watermark"]) if state else None
+
+    def _scan(
+        self, category: str, max_results: Optional[int]
+    ) -> Tuple[List[Paper], Dict[str, Any]]:
+        """Page through a category until the watermark is reached.
+
+        Returns:
+            New or updated papers, and the category state to store once
+            they are processed
+        """
+        import arxiv
+
+        state = self._state.get(category, {})
+        mark = self.watermark(category)
+        floor = mark - timedelta(seconds=self.overlap) if mark else None
+        # Papers older than the first harvest were never meant to be fetched
+        if floor is not None and state.get("since"):
+            floor = max(floor, datetime.fromisoformat(state["since"]))
+        seen: Dict[str, str] = dict(state.get("seen", {}))
+        if mark is None and max_results is None:
+            max_results = self.initial_max_results
+
+        papers: List[Paper] = []
+        scanned: Dict[str, str] = {}
+        newest = mark
+        oldest = None
+        reached = False
+        for paper in self.arxiv_client.iter_results(
+            f"cat:{category}",
+            max_results=max_results,
+            sort_by=arxiv.SortCriterion.LastUpdatedDate,
+            sort_order=arxiv.SortOrder.Descending,
+        ):
+            if floor is not None and paper.updated < floor:
+                reached = True
+                break
+            updated = paper.updated.isoformat()
+            # Pages can shift while new papers are listed, repeating results
+            if scanned.get(paper.id) == updated:
+                continue
+            scanned[paper.id] = updated
+            if newest is None or paper.updated > newest:
+                newest = paper.updated
+            if oldest is None or paper.updated < oldest:
+                oldest = paper.updated
+            if seen.get(paper.id) != updated:
+                papers.append(paper)
+        if floor is not None and not reached and max_results is not None:
+            logger.warning(
+                f"Stopped {category} at {max_results} results before reaching the "
+                f"watermark; older updates may have been skipped"
+            )
+
+        if newest is None:
+            return papers, state
+
+        # Only IDs inside the next run's overlap window are needed to skip repeats
+        cutoff = newest - timedelta(seconds=self.overlap)
+        seen.update(scanned)
+        seen = {
+            paper_id: updated
+            for paper_id, updated in seen.items()
+            if datetime.fromisoformat(updated) >= cutoff
+        }
+        return papers, {
+            "watermark": newest.isoformat(),
+            "since": state.get("since") or (oldest or newest).isoformat(),
+            "seen": seen,
+            "last_run": datetime.now().astimezone().isoformat(),
+        }
+
+    def harvest(
+        self,
+        category: str,
+        emit: Optional[Callable[[List[Paper]], Any]] = None,
+        max_results: Optional[int] = None,
+    ) -> List[Paper]:
+        """Fetch the new and updated papers of a category.
+
+        Args:
+            category: arXiv category, e.g. "cs.LG"
+            emit: Called with the papers before the watermark advances,
+                e.g. to enqueue them for ingestion; if it raises, the next
+                run fetches the same papers again
+            max_results: Cap on results to scan (default: until the
+                watermark, or ``initial_max_results`` on the first run)
+
+        Returns:
+            New or updated Paper objects, newest first
+        """
+        logger.info(f"Harvesting {category} since {self.watermark(category)}")
+        papers, state = self._scan(category, max_results)
+        if emit is not None and papers:
+            emit(papers)
+        if state:
+            self._commit(category, state)
+        logger.info(f"Harvested {len(papers)} new or updated papers from {category}")
+        return papers
+
+    def reset(self, category: str):
+        """Forget a category's watermark, so the next run starts over."""
+        with self._lock:
+            self._state.pop(category, None)
+            self._save()
+
+    def _commit(self, category: str, state: Dict[str, Any]):
+        with self._lock:
+            self._state[category] = state
+            self._save()
+
+    def _save(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        partial = self.state_path.with_name(self.state_path.name + ".part")
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, indent=2)
+        partial.replace(self.state_path)
@@ -0,0 +1,227 @@
+"""Semantic cache of search results keyed by query meaning."""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a query for exact matching.
+
+    Args:
+        query: Query text
+
+    Returns:
+        Lowercased query without punctuation or repeated whitespace
+    """
+    return _WHITESPACE.sub(" ", _NON_WORD.sub(" ", query.lower())).strip()
+
+
+@dataclass
+class _Entry:
+    """A cached result set and where its query embedding is stored."""
+
+    query: str
+    slot: int
+    papers: List
+    created: float
+
+
+class QueryCache:
+    """LRU cache of merged search results with near-duplicate query matching.
+
+    A lookup first tries the normalized query string, then the most similar
+    cached query in the same namespace (e.g. the same source and result
+    limit). Query embeddings live in one preallocated matrix, so the
+    nearest-neighbour check is a single matrix-vector product over at most
+    ``max_entries`` rows. Entries expire after ``ttl_seconds`` and the least
+    recently used entry is evicted when the cache is full.
+    """
+
+    def __init__(
+        self,
+        encoder,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600.0,
+        similarity_threshold: float = 0.9,
+    ):
+        """Initialize query cache.
+
+        Args:
+            encoder: EmbeddingEncoder (or anything with ``encode(texts)``)
+            max_entries: Maximum cached queries
+            ttl_seconds: Lifetime of a cached result set
+            similarity_threshold: Minimum cosine similarity for a
+                near-duplicate query to count as a hit
+        """
+        self.encoder = encoder
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._vectors: Optional[np.ndarray] = None
+        # Key of the entry in each embedding slot; None for a free slot
+        self._slot_keys: List[Optional[Tuple[str, str]]] = [None] * max_entries
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        # Embeddings computed by missed lookups, reused by put()
+        self._recent_vectors: Dict[Tuple[str, str], np.ndarray] = {}
+        self._lock = threading.Lock()
+
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _embed(self, query: str) -> np.ndarray:
+        vector = self.encoder.encode([query], show_progress=False, normalize=True)[0]
+        return np.asarray(vector, dtype=np.float32)
+
+    def _expired(self, entry: _Entry, now: float) -> bool:
+        return now - entry.created > self.ttl_seconds
+
+    def _remove(self, key: Tuple[str, str]):
+        entry = self._entries.pop(key)
+        self._slot_keys[entry.slot] = None
+        self._free_slots.append(entry.slot)
+
+    def get(self, query: str, namespace: str = "") -> Optional[List]:
+        """Look up cached results for a query or a near-duplicate of it.
+
+        Args:
+            query: Query text
+            namespace: Search settings the results depend on
+
+        Returns:
+            Cached papers, or None on a miss
+        """
+        key = (namespace, normalize_query(query))
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["exact_hits"] += 1
+                return list(entry.papers)
+            if not self._entries:
+                self.stats["misses"] += 1
+                return None
+
+        vector = self._embed(query)
+
+        with self._lock:
+            match = self._nearest(vector, namespace, now)
+            if match is not None:
+                self._entries.move_to_end(match)
+                self.stats["semantic_hits"] += 1
+                entry = self._entries[match]
+                logger.info(f"Query {query!r} matched cached query {entry.query!r}")
+                return list(entry.papers)
+
+            self.stats["misses"] += 1
+            self._recent_vectors[key] = vector
+            # Only the embeddings of lookups about to be stored are useful
+            while len(self._recent_vectors) > 64:
+                self._recent_vectors.pop(next(iter(self._recent_vectors)))
+            return None
+
+    def _nearest(self, vector: np.ndarray, namespace: str, now: float) -> Optional[Tuple[str, str]]:
+        """Key of the most similar live entry above the threshold."""
+        if self._vectors is None:
+            return None
+
+        allowed = np.fromiter(
+            (key is not None and key[0] == namespace for key in self._slot_keys),
+            dtype=bool,
+            count=self.max_entries,
+        )
+        if not allowed.any():
+            return None
+
+        similarities = self._vectors @ vector
+        similarities[~allowed] = -np.inf
+        # Try slots best first; usually the first one decides
+        for slot in np.argsort(-similarities).tolist():
+            if similarities[slot] < self.similarity_threshold:
+                return None
+            key = self._slot_keys[slot]
+            if self._expired(self._entries[key], now):
+                self._remove(key)
+                continue
+            return key
+        return None
+
+    def put(self, query: str, papers: List, namespace: str = ""):
+        """Cache the results of a query.
+
+        Args:
+            query: Query text
+            papers: Merged Paper results
+            namespace: Search settings the results depend on
+        """
+        normalized = normalize_query(query)
+        key = (namespace, normalized)
+
+        with self._lock:
+            vector = self._recent_vectors.pop(key, None)
+        if vector is None:
+            vector = self._embed(query)
+
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+
+            if key in self._entries:
+                self._remove(key)
+            while not self._free_slots:
+                # Evict the least recently used entry
+                self._remove(next(iter(self._entries)))
+
+            slot = self._free_slots.pop()
+            self._vectors[slot] = vector
+            self._slot_keys[slot] = key
+            self._entries[key] = _Entry(query, slot, list(papers), time.time())
+
+    def get_or_search(
+        self,
+        query: str,
+        search: Callable[[str], List],
+        namespace: str = "",
+    ) -> List:
+        """Return cached results, or run the search and cache them.
+
+        Args:
+            query: Query text
+            search: Function from query to papers, called on a miss
+            namespace: Search settings the results depend on
+
+        Returns:
+            Papers
+        """
+        papers = self.get(query, namespace)
+        if papers is None:
+            papers = search(query)
+            self.put(query, papers, namespace)
+        return papers
+
+    def clear(self):
+        """Drop all cached results."""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+            self._recent_vectors.clear()
@@ -8,6 +8,7 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 import os
 
 from .arxiv_client import Paper
+from .single_flight import shared_flight
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -30,6 +31,7 @@ class SemanticScholarClient:
         if self.api_key:
             self.session.headers.update({"x-api-key": self.api_key})
 
+    @shared_flight.coalesce
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -106,7 +108,8 @@ class SemanticScholarClient:
             logger.error(f"Error searching Semantic Scholar: {e}")
             raise
 
-    def _convert_result(self, result: Dict[str, Any]) -> Optional[Paper]:
+    @staticmethod
+    def _convert_result(result: Dict[str, Any]) -> Optional[Paper]:
         """Convert Semantic Scholar result to Paper object."""
         try:
             # Extract PDF URL if available
@@ -151,6 +154,7 @@ class SemanticScholarClient:
             logger.warning(f"Error converting Semantic Scholar result: {e}")
             return None
 
+    @shared_flight.coalesce
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -195,6 +199,7 @@ class SemanticScholarClient:
             logger.error(f"Error fetching paper {paper_id}: {e}")
             return None
 
+    @shared_flight.coalesce
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -227,6 +232,7 @@ class SemanticScholarClient:
             logger.error(f"Error fetching citations for {paper_id}: {e}")
             return []
 
+    @shared_flight.coalesce
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -0,0 +1,192 @@
+"""Coalescing of identical in-flight requests, for threads and asyncio."""
+
+import asyncio
+import copy
+import functools
+import inspect
+import logging
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """An in-flight call that followers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def _freeze(value: Any) -> Hashable:
+    """Hashable form of an argument, for building keys."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its result.
+
+    The first caller for a key (the leader) runs the function. Callers with
+    the same key that arrive before it finishes wait and receive the same
+    result or exception instead of repeating the work. Once the call
+    finishes the key is released, so this is not a cache: later callers
+    run the function again.
+
+    ``do`` coalesces across threads and ``do_async`` across tasks of an
+    event loop.
+    """
+
+    def __init__(self, copy_result: Optional[Callable[[Any], Any]] = None):
+        """Initialize single-flight group.
+
+        Args:
+            copy_result: Applied to the result handed to each follower,
+                e.g. ``copy.copy`` so callers may modify returned lists
+        """
+        self.copy_result = copy_result
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        # Event loop -> {key: task}
+        self._tasks = weakref.WeakKeyDictionary()
+        self.stats = {"calls": 0, "shared": 0}
+
+    def _share(self, result: Any) -> Any:
+        return result if self.copy_result is None else self.copy_result(result)
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """Call ``fn(*args, **kwargs)``, or wait for the in-flight call with this key.
+
+        Args:
+            key: Identifies identical requests
+            fn: Function to run
+
+        Returns:
+            The function's result
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats["calls"] += 1
+            else:
+                self.stats["shared"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return self._share(call.result)
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """Await ``fn(*args, **kwargs)``, or the in-flight call with this key.
+
+        The call runs as a task of the running loop. A caller that is
+        cancelled stops waiting without cancelling the call for the others.
+
+        Args:
+            key: Identifies identical requests
+            fn: Coroutine function to run
+
+        Returns:
+            The coroutine's result
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            tasks = self._tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            leader = task is None
+            if leader:
+                self.stats["calls"] += 1
+            else:
+                self.stats["shared"] += 1
+
+        if leader:
+            task = loop.create_task(fn(*args, **kwargs))
+            tasks[key] = task
+
+            def release(finished: asyncio.Task):
+                if tasks.get(key) is finished:
+                    del tasks[key]
+                # Mark the exception retrieved when every waiter was cancelled
+                if not finished.cancelled():
+                    finished.exception()
+
+            task.add_done_callback(release)
+
+        result = await asyncio.shield(task)
+        return result if leader else self._share(result)
+
+    def coalesce(self, method: Callable) -> Callable:
+        """Decorator coalescing calls of a method with equal arguments.
+
+        The key is the method's qualified name and its bound arguments
+        (lists and dicts are frozen); the instance is left out, so calls on
+        different instances of a client are shared too.
+        """
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments: List = list(bound.arguments.items())[1:]
+            key = (method.__qualname__,) + tuple((name, _freeze(value)) for name, value in arguments)
+            return self.do(key, method, *args, **kwargs)
+
+        return wrapper
+
+
+class KeyedLock:
+    """One lock per key, created on demand and dropped once unused.
+
+    Serializes work on the same resource (e.g. writes to one file path)
+    while work on different keys runs in parallel.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> [lock, holders and waiters]
+        self._locks: Dict[Hashable, List] = {}
+
+    @contextmanager
+    def lock(self, key: Hashable) -> Iterator[None]:
+        """Hold the lock of a key for the duration of a ``with`` block."""
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+
+# Shared by the data-source clients, so identical requests from different
+# client instances (app, API service, pipelines) coalesce as well. Results
+# are shallow-copied for followers so returned lists can be modified.
+shared_flight = SingleFlight(copy_result=copy.copy)
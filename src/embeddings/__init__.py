@@ -1,5 +1,17 @@
 """Embedding generation with GPU support."""
 
-from .encoder import EmbeddingEncoder
+from .encoder import EmbeddingEncoder, compare_embeddings
+from .pool import EncoderPool
+from .batcher import MicroBatcher
+from .compression import EmbeddingCompressor
+from .registry import get_encoder, clear_encoders
 
-__all__ = ["EmbeddingEncoder"]
+__all__ = [
+    "EmbeddingEncoder",
+    "EncoderPool",
+    "MicroBatcher",
+    "EmbeddingCompressor",
+    "compare_embeddings",
+    "get_encoder",
+    "clear_encoders",
+]
@@ -0,0 +1,192 @@
+"""Micro-batching front end for concurrent embedding requests."""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Coalesce concurrent encode requests into batches.
+
+    Callers await ``encode()`` with a few texts each. A scheduler task collects
+    pending requests until ``max_batch_size`` texts are queued or the oldest
+    request has waited ``max_wait_ms``, then encodes them in one model call on
+    a dedicated thread so the model is never used by two batches at once.
+    """
+
+    def __init__(
+        self,
+        encoder,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        normalize: bool = True,
+    ):
+        """Initialize micro-batcher.
+
+        Args:
+            encoder: EmbeddingEncoder used for the batched model calls
+            max_batch_size: Maximum number of texts per model call
+            max_wait_ms: Maximum time a request waits for a batch to fill
+            normalize: Normalize embeddings to unit length
+        """
+        self.encoder = encoder
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.normalize = normalize
+
+        self.stats = {"requests": 0, "texts": 0, "batches": 0}
+        self._queue: Optional[asyncio.Queue] = None
+        self._scheduler: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Requests taken off the queue by the scheduler and not yet resolved
+        self._batch: List[Tuple[str, asyncio.Future]] = []
+
+    async def start(self):
+        """Start the scheduler on the running event loop."""
+        if self._scheduler is not None:
+            return
+
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="micro-batcher")
+        self._scheduler = asyncio.create_task(self._run())
+        logger.info(
+            f"Micro-batcher started (max batch {self.max_batch_size}, "
+            f"max wait {self.max_wait * 1000:.1f} ms)"
+        )
+
+    async def close(self):
+        """Stop the scheduler and fail any requests still pending."""
+        if self._scheduler is None:
+            return
+
+        self._scheduler.cancel()
+        try:
+            await self._scheduler
+        except asyncio.CancelledError:
+            pass
+        self._scheduler = None
+
+        pending, self._batch = self._batch, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher closed"))
+
+        self._executor.shutdown(wait=False)
+        self._executor = None
+
+    async def encode(self, texts) -> np.ndarray:
+        """Encode texts as part of the next micro-batch.
+
+        Args:
+            texts: Single text or list of texts
+
+        Returns:
+            Embedding vector for a single text, or a matrix for a list
+        """
+        if self._scheduler is None:
+            await self.start()
+
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        elif not texts:
+            return np.empty((0, self.encoder.get_embedding_dim()), dtype=np.float32)
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._queue.put_nowait((text, future))
+            futures.append(future)
+
+        self.stats["requests"] += 1
+        embeddings = await asyncio.gather(*futures)
+        return embeddings[0] if single else np.stack(embeddings)
+
+    async def _next_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Wait for a request, then gather more into ``batch`` until it is full or due."""
+        loop = asyncio.get_running_loop()
+        batch.append(await self._queue.get())
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # Take everything already queued without yielding to the loop
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            remaining = deadline - loop.time()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                break
+
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self):
+        """Scheduler loop."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            # Kept on the instance so close() can fail a batch in progress
+            self._batch = []
+            await self._next_batch(self._batch)
+            self._batch = batch = [
+                (text, future) for text, future in self._batch if not future.cancelled()
+            ]
+            if not batch:
+                continue
+
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = await loop.run_in_executor(
+                    self._executor, self._encode_batch, texts
+                )
+            except Exception as e:
+                logger.error(f"Error encoding micro-batch: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+
+            self.stats["batches"] += 1
+            self.stats["texts"] += len(batch)
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Run one model call for a micro-batch."""
+        return self.encoder.encode(
+            texts,
+            batch_size=len(texts),
+            show_progress=False,
+            normalize=self.normalize,
+        )
+
+    def get_stats(self) -> dict:
+        """Get batching statistics.
+
+        Returns:
+            Dictionary with request, text and batch counts and mean batch size
+        """
+        stats = dict(self.stats)
+        stats["mean_batch_size"] = (
+            stats["texts"] / stats["batches"] if stats["batches"] else 0.0
+        )
+        return stats
+
+    async def __aenter__(self) -> "MicroBatcher":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
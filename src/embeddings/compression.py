@@ -0,0 +1,325 @@
+"""Dimension reduction and quantization for stored embeddings."""
+
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+REDUCTIONS = ("none", "pca", "truncate")
+QUANTIZATIONS = ("float32", "float16", "int8", "binary")
+
+# Number of set bits for every byte value, used for Hamming distances
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class EmbeddingCompressor:
+    """Compress embeddings for storage and coarse search.
+
+    Compression has two steps. Reduction keeps fewer dimensions, either by
+    projecting on the top PCA components or, for Matryoshka-trained models,
+    by keeping the leading dimensions. Quantization then stores each vector as
+    float16, int8 with per-dimension scales, or packed sign bits.
+    """
+
+    def __init__(
+        self,
+        reduction: str = "none",
+        dim: Optional[int] = None,
+        quantization: str = "int8",
+        normalize: bool = True,
+    ):
+        """Initialize compressor.
+
+        Args:
+            reduction: "none", "pca" or "truncate" (Matryoshka prefix)
+            dim: Output dimension for pca/truncate. Keeps all dims if None;
+                must be None with reduction "none"
+            quantization: "float32", "float16", "int8" or "binary"
+            normalize: Re-normalize reduced vectors so dot product is cosine
+        """
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"Unknown reduction {reduction!r}, expected one of {REDUCTIONS}")
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(
+                f"Unknown quantization {quantization!r}, expected one of {QUANTIZATIONS}"
+            )
+        if reduction == "none" and dim is not None:
+            raise ValueError(f"dim={dim} needs reduction 'pca' or 'truncate', got 'none'")
+
+        self.reduction = reduction
+        self.dim = dim
+        self.quantization = quantization
+        self.normalize = normalize
+
+        self.input_dim: Optional[int] = None
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        self.offset: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+        self.fitted = False
+
+    @property
+    def output_dim(self) -> int:
+        """Dimension after reduction."""
+        return self.dim or self.input_dim
+
+    @property
+    def bytes_per_vector(self) -> int:
+        """Storage size of one compressed vector."""
+        if self.quantization == "binary":
+            return (self.output_dim + 7) // 8
+        return self.output_dim * np.dtype(self.quantization).itemsize
+
+    def fit(self, sample: np.ndarray) -> "EmbeddingCompressor":
+        """Fit reduction and quantization parameters on a sample.
+
+        Args:
+            sample: Representative embeddings (n, input_dim)
+
+        Returns:
+            The fitted compressor
+        """
+        sample = np.asarray(sample, dtype=np.float32)
+        self.input_dim = sample.shape[1]
+
+        if self.dim is not None and self.dim > self.input_dim:
+            raise ValueError(f"dim {self.dim} exceeds input dimension {self.input_dim}")
+
+        if self.reduction == "pca":
+            self.mean = sample.mean(axis=0)
+            # Right singular vectors of the centered sample are the PCA axes
+            _, _, vt = np.linalg.svd(sample - self.mean, full_matrices=False)
+            self.components = np.ascontiguousarray(vt[:self.output_dim].T)
+
+        reduced = self.reduce(sample)
+
+        if self.quantization == "int8":
+            low = np.percentile(reduced, 0.5, axis=0)
+            high = np.percentile(reduced, 99.5, axis=0)
+            self.offset = ((high + low) / 2).astype(np.float32)
+            self.scale = np.maximum((high - low) / 254, 1e-8).astype(np.float32)
+        elif self.quantization == "binary":
+            # Threshold at the per-dimension mean so bits are balanced
+            self.offset = reduced.mean(axis=0).astype(np.float32)
+
+        self.fitted = True
+        logger.info(
+            f"Fitted {self.reduction}/{self.quantization} compressor: "
+            f"{self.input_dim} dims -> {self.bytes_per_vector} bytes per vector"
+        )
+        return self
+
+    def reduce(self, vectors: np.ndarray) -> np.ndarray:
+        """Apply dimension reduction only (used for queries).
+
+        Args:
+            vectors: Embeddings (n, input_dim)
+
+        Returns:
+            Reduced float32 vectors (n, output_dim)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        if self.reduction == "pca":
+            reduced = (vectors - self.mean) @ self.components
+        elif self.reduction == "truncate":
+            reduced = vectors[:, :self.output_dim]
+        else:
+            reduced = vectors
+
+        if self.normalize and self.reduction != "none":
+            norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+            reduced = reduced / np.maximum(norms, 1e-12)
+
+        return np.ascontiguousarray(reduced, dtype=np.float32)
+
+    def transform(self, vectors: np.ndarray, batch_size: int = 65536) -> np.ndarray:
+        """Compress embeddings in batches.
+
+        Args:
+            vectors: Embeddings (n, input_dim)
+            batch_size: Rows processed at a time
+
+        Returns:
+            Compressed codes (n, output_dim) or packed bits (n, output_dim / 8)
+        """
+        self._check_fitted()
+
+        n = len(vectors)
+        if self.quantization == "binary":
+            codes = np.empty((n, self.bytes_per_vector), dtype=np.uint8)
+        else:
+            codes = np.empty((n, self.output_dim), dtype=self.quantization)
+
+        for start in range(0, n, batch_size):
+            reduced = self.reduce(vectors[start:start + batch_size])
+            codes[start:start + len(reduced)] = self._quantize(reduced)
+
+        return codes
+
+    def _quantize(self, reduced: np.ndarray) -> np.ndarray:
+        """Quantize reduced vectors."""
+        if self.quantization == "int8":
+            scaled = np.rint((reduced - self.offset) / self.scale)
+            return np.clip(scaled, -127, 127).astype(np.int8)
+        if self.quantization == "binary":
+            return np.packbits(reduced > self.offset, axis=1)
+        return reduced.astype(self.quantization)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Approximately reconstruct reduced vectors from codes.
+
+        Args:
+            codes: Output of ``transform``
+
+        Returns:
+            Float32 vectors in the reduced space (n, output_dim)
+        """
+        self._check_fitted()
+
+        if self.quantization == "binary":
+            raise ValueError("Binary codes cannot be decoded, use hamming search")
+        if self.quantization == "int8":
+            return codes.astype(np.float32) * self.scale + self.offset
+        return codes.astype(np.float32)
+
+    def score(
+        self,
+        queries: np.ndarray,
+        codes: np.ndarray,
+        block_size: int = 65536,
+    ) -> np.ndarray:
+        """Score queries against compressed vectors.
+
+        Float and int8 codes give approximate dot products. Binary codes give
+        negated Hamming distances, so higher is still more similar.
+
+        Args:
+            queries: Uncompressed query embeddings (q, input_dim)
+            codes: Compressed database vectors
+            block_size: Database rows scored at a time
+
+        Returns:
+            Score matrix (q, n)
+        """
+        self._check_fitted()
+        queries = np.atleast_2d(queries)
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+
+        if self.quantization == "binary":
+            query_bits = self.transform(queries)
+            for start in range(0, len(codes), block_size):
+                block = codes[start:start + block_size]
+                xor = np.bitwise_xor(query_bits[:, None, :], block[None, :, :])
+                scores[:, start:start + len(block)] = -_POPCOUNT[xor].sum(axis=2, dtype=np.int32)
+            return scores
+
+        reduced = self.reduce(queries)
+        if self.quantization == "int8":
+            # q . (c * scale + offset) = (q * scale) . c + q . offset
+            weighted = reduced * self.scale
+            bias = reduced @ self.offset
+            for start in range(0, len(codes), block_size):
+                block = codes[start:start + block_size].astype(np.float32)
+                scores[:, start:start + len(block)] = weighted @ block.T + bias[:, None]
+            return scores
+
+        for start in range(0, len(codes), block_size):
+            block = codes[start:start + block_size].astype(np.float32)
+            scores[:, start:start + len(block)] = reduced @ block.T
+        return scores
+
+    def recall_at_k(
+        self,
+        vectors: np.ndarray,
+        queries: np.ndarray,
+        k: int = 10,
+        codes: Optional[np.ndarray] = None,
+    ) -> Dict[str, float]:
+        """Measure top-k overlap with search over uncompressed vectors.
+
+        Args:
+            vectors: Uncompressed database embeddings (n, input_dim)
+            queries: Query embeddings (q, input_dim)
+            k: Number of neighbours compared
+            codes: Precomputed ``transform(vectors)``. Computed if None
+
+        Returns:
+            Dictionary with recall@k and the compression ratio
+        """
+        if codes is None:
+            codes = self.transform(vectors)
+
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, len(vectors))
+
+        exact = queries @ np.asarray(vectors, dtype=np.float32).T
+        expected = np.argpartition(-exact, k - 1, axis=1)[:, :k]
+        approx = self.score(queries, codes)
+        actual = np.argpartition(-approx, k - 1, axis=1)[:, :k]
+
+        hits = sum(
+            len(np.intersect1d(e, a, assume_unique=True))
+            for e, a in zip(expected, actual)
+        )
+        original_bytes = vectors.shape[1] * np.dtype(np.float32).itemsize
+
+        return {
+            f"recall@{k}": hits / (len(queries) * k),
+            "bytes_per_vector": self.bytes_per_vector,
+            "compression_ratio": original_bytes / self.bytes_per_vector,
+        }
+
+    def save(self, path: Path):
+        """Save fitted parameters to an .npz file.
+
+        Args:
+            path: Output file path
+        """
+        self._check_fitted()
+        arrays = {
+            name: getattr(self, name)
+            for name in ("mean", "components", "offset", "scale")
+            if getattr(self, name) is not None
+        }
+        np.savez(
+            path,
+            reduction=self.reduction,
+            quantization=self.quantization,
+            dim=self.output_dim,
+            input_dim=self.input_dim,
+            normalize=self.normalize,
+            **arrays,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "EmbeddingCompressor":
+        """Load a compressor saved with ``save``.
+
+        Args:
+            path: Path to the .npz file
+
+        Returns:
+            Fitted compressor
+        """
+        data = np.load(path)
+        reduction = str(data["reduction"])
+        compressor = cls(
+            reduction=reduction,
+            dim=None if reduction == "none" else int(data["dim"]),
+            quantization=str(data["quantization"]),
+            normalize=bool(data["normalize"]),
+        )
+        compressor.input_dim = int(data["input_dim"])
+        for name in ("mean", "components", "offset", "scale"):
+            if name in data:
+                setattr(compressor, name, data[name])
+        compressor.fitted = True
+        return compressor
+
+    def _check_fitted(self):
+        if not self.fitted:
+            raise RuntimeError("Compressor is not fitted, call fit() first")
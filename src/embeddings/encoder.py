@@ -1,14 +1,82 @@
 """GPU-accelerated embedding generation."""
 
 import logging
-from typing import List, Union, Optional
-import torch
-from sentence_transformers import SentenceTransformer
+import threading
+import time
+from typing import List, Union, Optional, Dict
 import numpy as np
 from pathlib import Path
 
+# torch and sentence-transformers take seconds to import, so they are
+# imported on first use rather than when the package is loaded
+
 logger = logging.getLogger(__name__)
 
+# Inference backends selectable through ``EmbeddingEncoder(backend=...)``
+BACKENDS = ("torch", "onnx", "int8", "bf16")
+
+
+def compare_embeddings(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """Measure how closely candidate embeddings agree with a reference.
+
+    Args:
+        reference: Reference embeddings (n, dim), typically fp32 PyTorch
+        candidate: Embeddings of the same texts from another backend
+
+    Returns:
+        Dictionary with mean, min and 5th percentile cosine similarity
+    """
+    if reference.shape != candidate.shape:
+        raise ValueError(
+            f"Shape mismatch: {reference.shape} vs {candidate.shape}"
+        )
+
+    reference = reference.astype(np.float32, copy=False)
+    candidate = candidate.astype(np.float32, copy=False)
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    cosine = np.sum(reference * candidate, axis=1) / np.maximum(norms, 1e-12)
+
+    return {
+        "mean_cosine": float(cosine.mean()),
+        "min_cosine": float(cosine.min()),
+        "p5_cosine": float(np.percentile(cosine, 5)),
+    }
+
+
+def default_device() -> str:
+    """Get the device used when none is requested.
+
+    Returns:
+        "cuda" if a GPU is available, otherwise "cpu"
+    """
+    import torch
+
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _bf16_supported(device: str) -> bool:
+    """Check whether bfloat16 autocast is worthwhile on a device."""
+    import torch
+
+    if device.startswith("cuda"):
+        return torch.cuda.is_available() and torch.cuda.is_bf16_supported()
+
+    # CPU bf16 is only faster than fp32 with native bf16 instructions
+    # (AVX512-BF16 or AMX); plain AVX512 emulates it
+    return bool(_cpu_flags() & {"avx512_bf16", "amx_bf16"})
+
+
+def _cpu_flags() -> set:
+    """CPU feature flags from /proc/cpuinfo (empty where unavailable)."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
 
 class EmbeddingEncoder:
     """Generate embeddings with GPU acceleration."""
@@ -19,6 +87,7 @@ class EmbeddingEncoder:
         device: Optional[str] = None,
         batch_size: int = 128,
         use_fp16: bool = True,
+        backend: str = "torch",
     ):
         """Initialize embedding encoder.
 
@@ -27,21 +96,52 @@ class EmbeddingEncoder:
             device: Device to use (cuda/cpu). Auto-detect if None
             batch_size: Batch size for encoding
             use_fp16: Use FP16 precision for faster encoding on GPU
+            backend: Inference backend. "torch" (default), "onnx" (ONNX
+                Runtime graph), "int8" (dynamic int8 quantization, CPU only)
+                or "bf16" (bfloat16 autocast where the hardware supports it)
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+
+        import torch
+        from sentence_transformers import SentenceTransformer
+
         self.model_name = model_name
         self.batch_size = batch_size
         self.use_fp16 = use_fp16
 
         # Auto-detect device
         if device is None:
-            device = "cuda" if torch.cuda.is_available() else "cpu"
+            device = default_device()
         self.device = device
 
-        logger.info(f"Loading model {model_name} on {device}")
-        self.model = SentenceTransformer(model_name, device=device)
+        if backend == "int8" and device != "cpu":
+            raise ValueError("The int8 backend only runs on CPU")
+
+        if backend == "bf16" and not _bf16_supported(device):
+            logger.warning(f"bf16 not supported on {device}, falling back to torch")
+            backend = "torch"
+        self.backend = backend
+
+        # Serializes model calls so one encoder can be shared across threads
+        self._lock = threading.Lock()
+
+        logger.info(f"Loading model {model_name} on {device} (backend: {backend})")
+        if backend == "onnx":
+            # Exports the model to ONNX on first load (needs optimum + onnxruntime)
+            self.model = SentenceTransformer(model_name, device=device, backend="onnx")
+        else:
+            self.model = SentenceTransformer(model_name, device=device)
+
+        if backend == "int8":
+            # Quantize Linear layer weights to int8, activations stay fp32
+            torch.ao.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+            logger.info("Enabled dynamic int8 quantization")
 
         # Enable FP16 on GPU for 2x speedup
-        if self.device == "cuda" and use_fp16:
+        if self.device == "cuda" and use_fp16 and backend == "torch":
             self.model.half()
             logger.info("Enabled FP16 precision")
 
@@ -78,13 +178,29 @@ class EmbeddingEncoder:
         logger.info(f"Encoding {len(texts)} texts with batch size {batch_size}")
 
         try:
-            embeddings = self.model.encode(
-                texts,
-                batch_size=batch_size,
-                show_progress_bar=show_progress,
-                convert_to_numpy=True,
-                normalize_embeddings=normalize,
-            )
+            if self.backend == "bf16":
+                import torch
+
+                device_type = self.device.split(":")[0]
+                with self._lock, torch.autocast(device_type=device_type, dtype=torch.bfloat16):
+                    embeddings = self.model.encode(
+                        texts,
+                        batch_size=batch_size,
+                        show_progress_bar=show_progress,
+                        convert_to_tensor=True,
+                        normalize_embeddings=normalize,
+                    )
+                # NumPy has no bfloat16, so upcast before converting
+                embeddings = embeddings.float().cpu().numpy()
+            else:
+                with self._lock:
+                    embeddings = self.model.encode(
+                        texts,
+                        batch_size=batch_size,
+                        show_progress_bar=show_progress,
+                        convert_to_numpy=True,
+                        normalize_embeddings=normalize,
+                    )
 
             logger.info(f"Generated embeddings with shape {embeddings.shape}")
             return embeddings
@@ -117,6 +233,48 @@ class EmbeddingEncoder:
 
         return chunks
 
+    def validate_backend(
+        self,
+        texts: List[str],
+        reference: Optional["EmbeddingEncoder"] = None,
+    ) -> Dict[str, float]:
+        """Compare this backend against the fp32 PyTorch reference.
+
+        Args:
+            texts: Sample texts to encode with both encoders
+            reference: Reference encoder. A fp32 torch encoder for the same
+                model and device is loaded if None
+
+        Returns:
+            Cosine agreement stats plus throughput of both encoders
+        """
+        if reference is None:
+            reference = EmbeddingEncoder(
+                self.model_name,
+                device=self.device,
+                batch_size=self.batch_size,
+                use_fp16=False,
+            )
+
+        start = time.perf_counter()
+        expected = reference.encode(texts, show_progress=False)
+        reference_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = self.encode(texts, show_progress=False)
+        backend_seconds = time.perf_counter() - start
+
+        report = compare_embeddings(expected, actual)
+        report["reference_texts_per_sec"] = len(texts) / reference_seconds
+        report["backend_texts_per_sec"] = len(texts) / backend_seconds
+        report["speedup"] = reference_seconds / backend_seconds
+
+        logger.info(
+            f"Backend {self.backend}: mean cosine {report['mean_cosine']:.4f}, "
+            f"speedup {report['speedup']:.2f}x"
+        )
+        return report
+
     def get_embedding_dim(self) -> int:
         """Get embedding dimension.
 
@@ -128,6 +286,8 @@ class EmbeddingEncoder:
     def clear_cache(self):
         """Clear GPU memory cache."""
         if self.device == "cuda":
+            import torch
+
             torch.cuda.empty_cache()
             logger.info("Cleared GPU cache")
 
@@ -140,6 +300,8 @@ class EmbeddingEncoder:
         if self.device != "cuda":
             return {}
 
+        import torch
+
         return {
             "allocated_gb": torch.cuda.memory_allocated() / 1e9,
             "reserved_gb": torch.cuda.memory_reserved() / 1e9,
@@ -0,0 +1,277 @@
+"""Multi-process embedding generation for many-core CPU hosts."""
+
+import logging
+import math
+import multiprocessing as mp
+import os
+import queue
+import threading
+from multiprocessing import shared_memory
+from typing import List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing block without letting this process own it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: spawned workers share the parent's resource tracker,
+        # so attaching re-registers the same name and the parent's unlink
+        # still cleans it up
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(
+    worker_id: int,
+    task_queue,
+    result_queue,
+    model_name: str,
+    batch_size: int,
+    backend: str,
+    num_threads: int,
+):
+    """Worker loop: load the model once, then encode shards until told to stop."""
+    import torch
+
+    torch.set_num_threads(num_threads)
+
+    from .encoder import EmbeddingEncoder
+
+    try:
+        encoder = EmbeddingEncoder(
+            model_name,
+            device="cpu",
+            batch_size=batch_size,
+            use_fp16=False,
+            backend=backend,
+        )
+    except Exception as e:
+        result_queue.put(("error", worker_id, f"Failed to load model: {e}"))
+        return
+
+    result_queue.put(("ready", worker_id, encoder.get_embedding_dim()))
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+
+        job_id, shm_name, shape, start, texts, normalize = task
+        try:
+            embeddings = encoder.encode(texts, show_progress=False, normalize=normalize)
+            shm = _attach_shared_memory(shm_name)
+            try:
+                output = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+                output[start:start + len(texts)] = embeddings
+                del output
+            finally:
+                shm.close()
+            result_queue.put(("done", job_id, len(texts)))
+        except Exception as e:
+            result_queue.put(("error", job_id, str(e)))
+
+
+class EncoderPool:
+    """Encode with several single-model worker processes in parallel.
+
+    Each worker loads its own model replica with a pinned number of intra-op
+    threads. Input batches are sharded across workers, and workers write their
+    embeddings straight into a shared memory matrix so no large arrays are
+    pickled between processes.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-mpnet-base-v2",
+        num_workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        batch_size: int = 128,
+        backend: str = "torch",
+        startup_timeout: float = 300.0,
+    ):
+        """Initialize encoder pool.
+
+        Args:
+            model_name: Sentence transformer model name
+            num_workers: Number of worker processes. Defaults to one per 4 cores
+            threads_per_worker: Torch threads per worker. Defaults to an even
+                split of the available cores
+            batch_size: Batch size used inside each worker
+            backend: Inference backend passed to each worker's encoder
+            startup_timeout: Seconds to wait for workers to load the model
+        """
+        cpu_count = os.cpu_count() or 1
+        self.model_name = model_name
+        self.num_workers = num_workers or max(1, cpu_count // 4)
+        self.threads_per_worker = threads_per_worker or max(1, cpu_count // self.num_workers)
+        self.batch_size = batch_size
+        self.backend = backend
+        self.startup_timeout = startup_timeout
+
+        self.embedding_dim: Optional[int] = None
+        self._ctx = mp.get_context("spawn")
+        self._processes: List[mp.Process] = []
+        self._task_queue = None
+        self._result_queue = None
+        self._job_counter = 0
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether the worker processes are started."""
+        return bool(self._processes)
+
+    def start(self):
+        """Start workers and wait until every model replica is loaded."""
+        if self.running:
+            return
+
+        logger.info(
+            f"Starting {self.num_workers} encoder workers "
+            f"with {self.threads_per_worker} threads each"
+        )
+
+        self._task_queue = self._ctx.Queue()
+        self._result_queue = self._ctx.Queue()
+
+        for worker_id in range(self.num_workers):
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(
+                    worker_id,
+                    self._task_queue,
+                    self._result_queue,
+                    self.model_name,
+                    self.batch_size,
+                    self.backend,
+                    self.threads_per_worker,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+        for _ in range(self.num_workers):
+            try:
+                status, worker_id, payload = self._result_queue.get(
+                    timeout=self.startup_timeout
+                )
+            except queue.Empty:
+                self.close()
+                raise RuntimeError("Timed out waiting for encoder workers to start")
+
+            if status == "error":
+                self.close()
+                raise RuntimeError(f"Worker {worker_id}: {payload}")
+            self.embedding_dim = payload
+
+        logger.info(f"Encoder pool ready. Embedding dimension: {self.embedding_dim}")
+
+    def encode(
+        self,
+        texts: Union[str, List[str]],
+        normalize: bool = True,
+        shard_size: Optional[int] = None,
+    ) -> np.ndarray:
+        """Encode texts across all workers.
+
+        Args:
+            texts: Single text or list of texts
+            normalize: Normalize embeddings to unit length
+            shard_size: Texts per task. Defaults to about 4 shards per worker,
+                which keeps workers balanced when text lengths vary
+
+        Returns:
+            Numpy array of embeddings
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+
+        if not self.running:
+            self.start()
+
+        if not texts:
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+
+        if shard_size is None:
+            shard_size = max(1, math.ceil(len(texts) / (self.num_workers * 4)))
+
+        shape = (len(texts), self.embedding_dim)
+        nbytes = len(texts) * self.embedding_dim * np.dtype(np.float32).itemsize
+
+        with self._lock:
+            shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            try:
+                job_ids = set()
+                for start in range(0, len(texts), shard_size):
+                    self._job_counter += 1
+                    job_ids.add(self._job_counter)
+                    self._task_queue.put((
+                        self._job_counter,
+                        shm.name,
+                        shape,
+                        start,
+                        texts[start:start + shard_size],
+                        normalize,
+                    ))
+
+                self._collect(job_ids)
+
+                output = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+                embeddings = output.copy()
+                del output
+            finally:
+                shm.close()
+                shm.unlink()
+
+        logger.info(f"Generated embeddings with shape {embeddings.shape}")
+        return embeddings
+
+    def _collect(self, job_ids: set):
+        """Wait for every shard of a job to be written."""
+        errors = []
+        pending = set(job_ids)
+
+        while pending:
+            try:
+                status, job_id, payload = self._result_queue.get(timeout=1.0)
+            except queue.Empty:
+                dead = [p.pid for p in self._processes if not p.is_alive()]
+                if dead:
+                    self.close()
+                    raise RuntimeError(f"Encoder workers died: {dead}")
+                continue
+
+            pending.discard(job_id)
+            if status == "error":
+                errors.append(payload)
+
+        if errors:
+            raise RuntimeError(f"Error encoding texts: {errors[0]}")
+
+    def close(self):
+        """Stop all workers."""
+        if not self._processes:
+            return
+
+        for _ in self._processes:
+            self._task_queue.put(None)
+
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+        self._processes = []
+        logger.info("Encoder pool stopped")
+
+    def __enter__(self) -> "EncoderPool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
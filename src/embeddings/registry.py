@@ -0,0 +1,73 @@
+"""Process-wide registry of shared embedding encoders."""
+
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from .encoder import EmbeddingEncoder, default_device
+
+logger = logging.getLogger(__name__)
+
+_encoders: Dict[Tuple[str, str, str, bool], EmbeddingEncoder] = {}
+_key_locks: Dict[Tuple[str, str, str, bool], threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def get_encoder(
+    model_name: str = "sentence-transformers/all-mpnet-base-v2",
+    device: Optional[str] = None,
+    use_fp16: bool = True,
+    backend: str = "torch",
+    batch_size: int = 128,
+) -> EmbeddingEncoder:
+    """Get the shared encoder for a model, device and precision.
+
+    The model is loaded once per process on the first call. Later calls with
+    the same settings return the same thread-safe instance.
+
+    Args:
+        model_name: Sentence transformer model name
+        device: Device to use (cuda/cpu). Auto-detect if None
+        use_fp16: Use FP16 precision on GPU
+        backend: Inference backend (see EmbeddingEncoder)
+        batch_size: Default batch size, used only when the model is first loaded
+
+    Returns:
+        Shared EmbeddingEncoder
+    """
+    device = device or default_device()
+    # FP16 only applies to the torch backend on GPU
+    use_fp16 = use_fp16 and backend == "torch" and device.startswith("cuda")
+    key = (model_name, device, backend, use_fp16)
+
+    encoder = _encoders.get(key)
+    if encoder is not None:
+        return encoder
+
+    with _registry_lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    # Per-key lock: concurrent callers wait for one load, other models load in parallel
+    with key_lock:
+        encoder = _encoders.get(key)
+        if encoder is None:
+            logger.info(f"Registering shared encoder for {key}")
+            encoder = EmbeddingEncoder(
+                model_name,
+                device=device,
+                batch_size=batch_size,
+                use_fp16=use_fp16,
+                backend=backend,
+            )
+            _encoders[key] = encoder
+
+    return encoder
+
+
+def clear_encoders():
+    """Drop all shared encoders so their models can be freed."""
+    with _registry_lock:
+        for encoder in _encoders.values():
+            encoder.clear_cache()
+        _encoders.clear()
+        _key_locks.clear()
@@ -0,0 +1,51 @@
+"""Ingestion pipelines that turn search results into indexed vectors."""
+
+from .abstract_indexer import AbstractIndexer, abstract_payload
+from .full_text import FullTextIngestor
+from .checkpoint import IngestionCheckpoint, paper_from_dict
+from .pipeline import IngestionPipeline
+from .manifest import (
+    ChunkDiff,
+    ManifestStore,
+    PaperManifest,
+    chunk_metadata,
+    safe_name,
+    split_version,
+)
+from .job_queue import Job, JobQueue, PermanentError
+from .queue_worker import QUEUE_STAGES, QueueStages, QueueWorker
+from .sharding import (
+    build_lexical_index,
+    merge_work_dirs,
+    partition,
+    read_chunks,
+    shard_name,
+    shard_of,
+)
+
+__all__ = [
+    "AbstractIndexer",
+    "FullTextIngestor",
+    "IngestionPipeline",
+    "IngestionCheckpoint",
+    "ManifestStore",
+    "PaperManifest",
+    "ChunkDiff",
+    "JobQueue",
+    "Job",
+    "PermanentError",
+    "QueueStages",
+    "QueueWorker",
+    "QUEUE_STAGES",
+    "abstract_payload",
+    "paper_from_dict",
+    "chunk_metadata",
+    "split_version",
+    "safe_name",
+    "shard_of",
+    "shard_name",
+    "partition",
+    "read_chunks",
+    "build_lexical_index",
+    "merge_work_dirs",
+]
@@ -0,0 +1,172 @@
+"""Index papers by title and abstract, without downloading PDFs."""
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+import numpy as np
+
+# The same text PaperRanker embeds, so the two produce the same vectors
+from ranking import paper_text
+
+logger = logging.getLogger(__name__)
+
+
+def abstract_payload(paper) -> Dict[str, Any]:
+    """Payload stored with an abstract vector in stores that keep payloads.
+
+    Args:
+        paper: Paper object
+
+    Returns:
+        Dictionary with the paper's filterable fields and title
+    """
+    return {
+        "paper_id": paper.id,
+        "chunk_uid": paper.id,
+        "title": paper.title,
+        "year": paper.published.year,
+        "source": paper.source,
+        "primary_category": paper.primary_category,
+        "categories": list(paper.categories),
+        "citation_count": paper.citation_count,
+    }
+
+
+class AbstractIndexer:
+    """Embed title + abstract of search results straight into a vector index.
+
+    Papers come from ``ArxivClient.search`` or ``SemanticScholarClient.search``
+    and are indexed under their paper ID, one vector per paper. Batches of
+    ``batch_size`` papers are encoded together, and each batch is written by
+    a background thread while the next one is encoded. Nothing is
+    downloaded or parsed, so indexing costs one forward pass per batch
+    instead of seconds per paper; full text can be added later for a
+    shortlist with ``FullTextIngestor``.
+    """
+
+    def __init__(
+        self,
+        encoder,
+        index,
+        batch_size: int = 512,
+        metadata=None,
+    ):
+        """Initialize abstract indexer.
+
+        Args:
+            encoder: EmbeddingEncoder (or anything with ``encode(texts)``)
+            index: Vector index with ``add(vectors, ids)``, or a store with
+                ``upsert(vectors, ids, payloads)`` such as QdrantStore
+            batch_size: Papers encoded per batch
+            metadata: Optional MetadataIndex kept row-aligned with ``index``
+                for filtered search. The index must start empty
+        """
+        self.encoder = encoder
+        self.index = index
+        self.batch_size = batch_size
+        self.metadata = metadata
+
+        self.indexed_ids: Set[str] = set()
+        self.papers: Dict[str, Any] = {}
+
+    def index_papers(self, papers: Iterable) -> int:
+        """Embed and index papers, skipping IDs that are already indexed.
+
+        Args:
+            papers: Paper objects; may be a generator
+
+        Returns:
+            Number of papers added
+        """
+        added = 0
+        pending: Optional[Future] = None
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            for batch in self._new_batches(papers):
+                vectors = self.encoder.encode(
+                    [paper_text(paper) for paper in batch],
+                    batch_size=self.batch_size,
+                    show_progress=False,
+                )
+                # Wait for the previous write so batches land in order
+                if pending is not None:
+                    added += pending.result()
+                pending = writer.submit(self._write, batch, np.asarray(vectors))
+            if pending is not None:
+                added += pending.result()
+
+        logger.info(f"Indexed {added} abstracts, {len(self.indexed_ids)} total")
+        return added
+
+    def _new_batches(self, papers: Iterable) -> Iterator[List]:
+        """Batches of papers not indexed yet, deduplicated by ID."""
+        batch = []
+        seen: Set[str] = set()
+        for paper in papers:
+            if paper.id in self.indexed_ids or paper.id in seen or not paper.abstract:
+                continue
+            seen.add(paper.id)
+            batch.append(paper)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _write(self, papers: List, vectors: np.ndarray) -> int:
+        ids = [paper.id for paper in papers]
+        if hasattr(self.index, "upsert"):
+            self.index.upsert(vectors, ids, [abstract_payload(paper) for paper in papers])
+        else:
+            self.index.add(vectors, ids)
+        if self.metadata is not None:
+            self.metadata.add([
+                {key: value for key, value in abstract_payload(paper).items()
+                 if key not in ("chunk_uid", "title")}
+                for paper in papers
+            ])
+
+        self.indexed_ids.update(ids)
+        for paper in papers:
+            self.papers[paper.id] = paper
+        return len(papers)
+
+    def index_query(
+        self,
+        query: str,
+        arxiv_client=None,
+        s2_client=None,
+        max_results: int = 100,
+    ) -> int:
+        """Search the given sources and index the abstracts of the results.
+
+        Args:
+            query: Search query
+            arxiv_client: ArxivClient, or None to skip arXiv
+            s2_client: SemanticScholarClient, or None to skip Semantic Scholar
+            max_results: Results requested from each source
+
+        Returns:
+            Number of papers added
+        """
+        papers = []
+        if arxiv_client is not None:
+            papers.extend(arxiv_client.search(query, max_results=max_results))
+        if s2_client is not None:
+            papers.extend(s2_client.search(query, limit=max_results))
+        return self.index_papers(papers)
+
+    def shortlist(self, query_vectors: np.ndarray, top_k: int = 10) -> List[List]:
+        """Papers closest to each query, for on-demand full-text ingestion.
+
+        Args:
+            query_vectors: Query embedding or matrix of query embeddings
+            top_k: Papers per query
+
+        Returns:
+            One list of Paper objects per query, best first
+        """
+        return [
+            [self.papers[hit.id] for hit in hits if hit.id in self.papers]
+            for hits in self.index.search(query_vectors, top_k=top_k)
+        ]
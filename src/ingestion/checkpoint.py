@@ -0,0 +1,192 @@
+"""Per-paper progress log for resumable ingestion."""
+
+import json
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+DOWNLOADED = "downloaded"
+PARSED = "parsed"
+INDEXED = "indexed"
+FAILED = "failed"
+
+STATES = (QUEUED, DOWNLOADED, PARSED, INDEXED, FAILED)
+
+
+def paper_from_dict(data: Dict[str, Any], paper_type: Callable):
+    """Rebuild a Paper from ``Paper.to_dict()`` output.
+
+    Args:
+        data: Paper dictionary
+        paper_type: Paper class
+
+    Returns:
+        Paper object
+    """
+    data = dict(data)
+    data["published"] = datetime.fromisoformat(data["published"])
+    data["updated"] = datetime.fromisoformat(data["updated"])
+    return paper_type(**data)
+
+
+class IngestionCheckpoint:
+    """Append-only JSON-lines log of each paper's ingestion state.
+
+    Every state change is one line, flushed as it is written, so a run that
+    is killed loses at most the line being written (a torn last line is
+    ignored on load). The latest line for a paper wins. The first line for
+    a paper also stores the paper itself, so a resumed run does not need to
+    repeat the search.
+    """
+
+    def __init__(self, path: Path, paper_type: Callable, max_attempts: int = 3):
+        """Open a checkpoint log, loading any existing state.
+
+        Args:
+            path: Log file (created if missing)
+            paper_type: Paper class used to rebuild logged papers
+            max_attempts: Failures after which a paper is no longer retried
+        """
+        self.path = Path(path)
+        self.paper_type = paper_type
+        self.max_attempts = max_attempts
+
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._papers: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not self.path.exists():
+            return
+
+        with open(self.path, encoding="utf-8") as f:
+            for line_num, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring unreadable line {line_num} of {self.path}")
+                    continue
+                paper = record.pop("paper", None)
+                if paper is not None:
+                    self._papers[record["id"]] = paper
+                self._states[record["id"]] = record
+
+        logger.info(f"Loaded ingestion state of {len(self._states)} papers from {self.path}")
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self._states
+
+    def _write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def add_papers(self, papers: Iterable) -> int:
+        """Queue papers that are not in the log yet.
+
+        Args:
+            papers: Paper objects
+
+        Returns:
+            Number of papers added
+        """
+        added = 0
+        with self._lock:
+            for paper in papers:
+                if paper.id in self._states:
+                    continue
+                record = {"id": paper.id, "state": QUEUED, "reached": QUEUED, "attempts": 0}
+                self._states[paper.id] = record
+                self._papers[paper.id] = paper.to_dict()
+                self._write({**record, "paper": paper.to_dict()})
+                added += 1
+        return added
+
+    def record(self, paper_id: str, state: str, **fields):
+        """Record a paper's new state.
+
+        Args:
+            paper_id: Paper ID
+            state: One of STATES
+            **fields: Extra details to store, e.g. ``chunks`` or ``error``
+        """
+        if state not in STATES:
+            raise ValueError(f"Unknown state {state!r}, expected one of {STATES}")
+
+        with self._lock:
+            previous = self._states.get(paper_id, {})
+            attempts = previous.get("attempts", 0)
+            # A failure keeps the last stage that succeeded, so a retry resumes there
+            reached = previous.get("reached", QUEUED)
+            if state == FAILED:
+                attempts += 1
+            else:
+                reached = state
+            record = {
+                "id": paper_id,
+                "state": state,
+                "reached": reached,
+                "attempts": attempts,
+                **fields,
+            }
+            self._states[paper_id] = record
+            self._write(record)
+
+    def state(self, paper_id: str) -> Optional[str]:
+        """Latest state of a paper, or None if it is not in the log."""
+        record = self._states.get(paper_id)
+        return None if record is None else record["state"]
+
+    def reached(self, paper_id: str) -> Optional[str]:
+        """Last state other than FAILED that a paper reached."""
+        record = self._states.get(paper_id)
+        return None if record is None else record["reached"]
+
+    def pending(self) -> List:
+        """Papers still to ingest, in the order they were queued.
+
+        Indexed papers and papers that failed ``max_attempts`` times are
+        left out.
+
+        Returns:
+            Paper objects
+        """
+        with self._lock:
+            return [
+                paper_from_dict(self._papers[paper_id], self.paper_type)
+                for paper_id, record in self._states.items()
+                if paper_id in self._papers
+                and record["state"] != INDEXED
+                and record["attempts"] < self.max_attempts
+            ]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of papers in each state."""
+        with self._lock:
+            return dict(Counter(record["state"] for record in self._states.values()))
+
+    def failures(self) -> Dict[str, str]:
+        """Error message of every paper whose latest state is FAILED."""
+        with self._lock:
+            return {
+                paper_id: record.get("error", "")
+                for paper_id, record in self._states.items()
+                if record["state"] == FAILED
+            }
+
+    def close(self):
+        """Close the log file."""
+        with self._lock:
+            self._file.close()
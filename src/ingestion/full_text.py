@@ -0,0 +1,86 @@
+"""On-demand full-text ingestion for shortlisted papers."""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from vector_stores import chunk_uid
+
+from .manifest import chunk_metadata
+
+logger = logging.getLogger(__name__)
+
+
+class FullTextIngestor:
+    """Download, parse, chunk and embed the full text of selected papers.
+
+    This is the expensive path (PDF download and parsing take seconds per
+    paper), so it is meant for the handful of papers shortlisted from the
+    abstract index rather than for every search result. Downloads and
+    parsing run on a thread pool; all chunks are then encoded in one batch.
+    """
+
+    def __init__(
+        self,
+        arxiv_client,
+        parser,
+        chunker,
+        encoder,
+        index,
+        pdf_dir: Path = Path("./data/papers"),
+        max_workers: int = 4,
+    ):
+        """Initialize full-text ingestor.
+
+        Args:
+            arxiv_client: ArxivClient used to download PDFs
+            parser: PDFParser
+            chunker: SemanticChunker
+            encoder: EmbeddingEncoder
+            index: Chunk vector index with ``add(vectors, ids)``
+            pdf_dir: Directory for downloaded PDFs
+            max_workers: Papers downloaded and parsed concurrently
+        """
+        self.arxiv_client = arxiv_client
+        self.parser = parser
+        self.chunker = chunker
+        self.encoder = encoder
+        self.index = index
+        self.pdf_dir = Path(pdf_dir)
+        self.max_workers = max_workers
+
+    def _chunk_paper(self, paper) -> List[Dict]:
+        """Download, parse and chunk one paper; empty on failure."""
+        try:
+            pdf_path = self.arxiv_client.download_pdf(paper, self.pdf_dir)
+            text = self.parser.extract_text(pdf_path)
+        except Exception as e:
+            logger.warning(f"Skipping full text of {paper.id}: {e}")
+            return []
+        return self.chunker.chunk_text(text, metadata=chunk_metadata(paper))
+
+    def ingest(self, papers: List) -> int:
+        """Ingest the full text of papers.
+
+        Only arXiv papers have downloadable PDFs; others are skipped.
+
+        Args:
+            papers: Shortlisted Paper objects
+
+        Returns:
+            Number of chunks indexed
+        """
+        papers = [paper for paper in papers if paper.source == "arxiv"]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            chunk_lists = list(executor.map(self._chunk_paper, papers))
+
+        chunks = [chunk for chunk_list in chunk_lists for chunk in chunk_list]
+        if not chunks:
+            return 0
+
+        vectors = self.encoder.encode([chunk["text"] for chunk in chunks], show_progress=False)
+        self.index.add(vectors, [chunk_uid(chunk) for chunk in chunks])
+
+        logger.info(f"Ingested {len(chunks)} chunks from {len(papers)} papers")
+        return len(chunks)
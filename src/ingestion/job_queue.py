@@ -0,0 +1,463 @@
+"""Durable job queue backed by SQLite, shared by worker processes."""
+
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stage TEXT NOT NULL,
+    paper_id TEXT NOT NULL,
+    payload TEXT NOT NULL DEFAULT '{}',
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    result TEXT,
+    error TEXT,
+    UNIQUE (stage, paper_id)
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, available_at);
+CREATE INDEX IF NOT EXISTS jobs_stage ON jobs (stage, status);
+"""
+
+
+class PermanentError(Exception):
+    """Raised by a job handler when retrying cannot help."""
+
+
+@dataclass
+class Job:
+    """A leased job."""
+
+    id: int
+    stage: str
+    paper_id: str
+    payload: Dict[str, Any]
+    priority: int
+    attempts: int
+    lease_owner: str
+    lease_expires: float
+
+
+class JobQueue:
+    """Persistent work queue with leases, retries and priorities.
+
+    Jobs live in one SQLite database in WAL mode, so any number of worker
+    processes can lease from it while readers (e.g. a status page) never
+    block writers. A job is identified by ``(stage, paper_id)``; enqueueing
+    the same pair again is a no-op, which makes re-running a producer safe.
+
+    ``lease`` hands a job to one worker for ``visibility_timeout`` seconds.
+    If the worker dies, the lease expires and the job becomes available to
+    others; long jobs extend their lease with ``heartbeat``. A failed job is
+    retried after an exponential backoff until ``max_attempts`` is reached.
+    Higher ``priority`` jobs are leased first.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 5,
+        backoff_base: float = 2.0,
+        backoff_max: float = 600.0,
+    ):
+        """Open (or create) a queue database.
+
+        Args:
+            path: SQLite database file
+            visibility_timeout: Seconds a lease lasts without a heartbeat
+            max_attempts: Leases of a job before it is marked failed
+            backoff_base: Retry delay is ``backoff_base ** attempts`` seconds
+            backoff_max: Upper bound on the retry delay
+        """
+        self.path = Path(path)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # sqlite3 connections cannot be shared between threads
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], path: Path, **kwargs) -> "JobQueue":
+        """Open a queue using the ``ingestion.queue`` section of the agent config.
+
+        Args:
+            config: Parsed configs/agent_config.yaml
+            path: SQLite database file
+            **kwargs: Overrides for other constructor arguments
+
+        Returns:
+            JobQueue
+        """
+        settings = config.get("ingestion", {}).get("queue", {})
+        params = {
+            key: settings[key]
+            for key in ("visibility_timeout", "max_attempts", "backoff_base", "backoff_max")
+            if key in settings
+        }
+        params.update(kwargs)
+        return cls(path, **params)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode; multi-statement updates use explicit transactions
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def enqueue(
+        self,
+        stage: str,
+        paper_id: str,
+        payload: Optional[Dict[str, Any]] = None,
+        priority: int = 0,
+        delay: float = 0.0,
+    ) -> bool:
+        """Add a job unless one already exists for this stage and paper.
+
+        Args:
+            stage: Stage name, e.g. "download"
+            paper_id: Paper the job works on
+            payload: JSON-serializable job data
+            priority: Higher values are leased first
+            delay: Seconds before the job becomes available
+
+        Returns:
+            True if the job was added, False if it was a duplicate
+        """
+        return self.enqueue_many([(stage, paper_id, payload)], priority, delay) == 1
+
+    def enqueue_many(
+        self,
+        jobs: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]],
+        priority: int = 0,
+        delay: float = 0.0,
+    ) -> int:
+        """Add many jobs in one transaction, skipping duplicates.
+
+        Args:
+            jobs: ``(stage, paper_id, payload)`` tuples
+            priority: Higher values are leased first
+            delay: Seconds before the jobs become available
+
+        Returns:
+            Number of jobs added
+        """
+        now = time.time()
+        rows = [
+            (stage, paper_id, json.dumps(payload or {}), priority, now + delay, now)
+            for stage, paper_id, payload in jobs
+        ]
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs "
+                "(stage, paper_id, payload, priority, available_at, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return conn.total_changes - before
+
+    def lease(
+        self,
+        worker_id: str,
+        stages: Optional[Sequence[str]] = None,
+        limit: int = 1,
+    ) -> List[Job]:
+        """Lease the highest-priority available jobs.
+
+        A job is available when it is queued and its backoff has passed, or
+        when its previous lease expired.
+
+        Args:
+            worker_id: Name of the leasing worker
+            stages: Only lease jobs of these stages; None for any stage
+            limit: Maximum jobs to lease
+
+        Returns:
+            Leased jobs, possibly empty
+        """
+        now = time.time()
+        stage_clause = ""
+        params: List[Any] = [now, now]
+        if stages:
+            stage_clause = f"AND stage IN ({', '.join('?' * len(stages))})"
+            params.extend(stages)
+        params.append(limit)
+
+        conn = self._connection()
+        with conn:
+            # IMMEDIATE takes the write lock up front, so two workers can
+            # never select the same rows
+            conn.execute("BEGIN IMMEDIATE")
+            # A job whose worker keeps dying (e.g. a PDF that crashes the
+            # parser) must not be leased forever
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', finished = ?, "
+                "error = 'lease expired after final attempt', "
+                "lease_owner = NULL, lease_expires = NULL "
+                "WHERE status = 'leased' AND lease_expires <= ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE "
+                "((status = 'queued' AND available_at <= ?) "
+                " OR (status = 'leased' AND lease_expires <= ?)) "
+                f"{stage_clause} "
+                "ORDER BY priority DESC, available_at LIMIT ?",
+                params,
+            ).fetchall()
+            if not rows:
+                return []
+
+            expires = now + self.visibility_timeout
+            ids = [row["id"] for row in rows]
+            conn.executemany(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, "
+                "lease_owner = ?, lease_expires = ?, started = ? WHERE id = ?",
+                [(worker_id, expires, now, job_id) for job_id in ids],
+            )
+            leased = conn.execute(
+                f"SELECT * FROM jobs WHERE id IN ({', '.join('?' * len(ids))}) "
+                "ORDER BY priority DESC, available_at",
+                ids,
+            ).fetchall()
+
+        return [
+            Job(
+                id=row["id"],
+                stage=row["stage"],
+                paper_id=row["paper_id"],
+                payload=json.loads(row["payload"]),
+                priority=row["priority"],
+                attempts=row["attempts"],
+                lease_owner=row["lease_owner"],
+                lease_expires=row["lease_expires"],
+            )
+            for row in leased
+        ]
+
+    def _update_leased(self, job: Job, sql: str, params: Sequence[Any]) -> bool:
+        """Run an update only if ``job`` still holds its lease."""
+        conn = self._connection()
+        cursor = conn.execute(
+            f"{sql} WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (*params, job.id, job.lease_owner),
+        )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, job: Job, extend: Optional[float] = None) -> bool:
+        """Extend a lease.
+
+        Args:
+            job: Leased job
+            extend: Seconds from now; defaults to the visibility timeout
+
+        Returns:
+            False if the lease was lost (it expired and another worker took
+            the job), in which case the caller should abandon it
+        """
+        expires = time.time() + (extend or self.visibility_timeout)
+        if self._update_leased(job, "UPDATE jobs SET lease_expires = ?", (expires,)):
+            job.lease_expires = expires
+            return True
+        return False
+
+    def complete(self, job: Job, result: Optional[Dict[str, Any]] = None) -> bool:
+        """Mark a leased job done.
+
+        Args:
+            job: Leased job
+            result: JSON-serializable result to store
+
+        Returns:
+            False if the lease was lost before completion
+        """
+        return self._update_leased(
+            job,
+            "UPDATE jobs SET status = 'done', finished = ?, result = ?, error = NULL, "
+            "lease_owner = NULL, lease_expires = NULL",
+            (time.time(), json.dumps(result or {})),
+        )
+
+    def fail(self, job: Job, error: str, retry: bool = True) -> bool:
+        """Record a failed attempt, scheduling a retry with backoff.
+
+        Args:
+            job: Leased job
+            error: Error message
+            retry: Retry unless ``max_attempts`` is reached; False fails the
+                job permanently (e.g. for input that can never succeed)
+
+        Returns:
+            False if the lease was lost
+        """
+        now = time.time()
+        if retry and job.attempts < self.max_attempts:
+            # Jitter keeps jobs that failed together from retrying together
+            delay = min(self.backoff_max, self.backoff_base ** job.attempts)
+            delay *= random.uniform(0.5, 1.0)
+            logger.info(f"Job {job.stage}/{job.paper_id} failed, retrying in {delay:.0f}s: {error}")
+            return self._update_leased(
+                job,
+                "UPDATE jobs SET status = 'queued', available_at = ?, error = ?, "
+                "lease_owner = NULL, lease_expires = NULL",
+                (now + delay, error),
+            )
+
+        logger.warning(f"Job {job.stage}/{job.paper_id} failed permanently: {error}")
+        return self._update_leased(
+            job,
+            "UPDATE jobs SET status = 'failed', finished = ?, error = ?, "
+            "lease_owner = NULL, lease_expires = NULL",
+            (now, error),
+        )
+
+    def unfinished(self) -> int:
+        """Number of jobs that are queued or leased, in any stage."""
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'leased')"
+        ).fetchone()
+        return row[0]
+
+    def retry_failed(self, stage: Optional[str] = None) -> int:
+        """Requeue permanently failed jobs with their attempts reset.
+
+        Args:
+            stage: Only requeue this stage; None for all
+
+        Returns:
+            Number of jobs requeued
+        """
+        sql = (
+            "UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, "
+            "finished = NULL WHERE status = 'failed'"
+        )
+        params: List[Any] = [time.time()]
+        if stage is not None:
+            sql += " AND stage = ?"
+            params.append(stage)
+        return self._connection().execute(sql, params).rowcount
+
+    def purge(self, older_than: float = 0.0) -> int:
+        """Delete finished (done) jobs.
+
+        Deleting a job also drops its idempotency key, so only purge stages
+        whose producers will not run again for the same papers.
+
+        Args:
+            older_than: Only delete jobs finished at least this many seconds ago
+
+        Returns:
+            Number of jobs deleted
+        """
+        cursor = self._connection().execute(
+            "DELETE FROM jobs WHERE status = 'done' AND finished <= ?",
+            (time.time() - older_than,),
+        )
+        return cursor.rowcount
+
+    def status(self, latency_window: int = 1000) -> Dict[str, Any]:
+        """Queue depth and latency per stage.
+
+        Args:
+            latency_window: Most recent finished jobs per stage used for the
+                latency percentiles
+
+        Returns:
+            ``{"stages": {stage: {...}}, "total": {...}}`` where each stage
+            has counts per status, ``ready`` (queued and available now),
+            ``delayed`` (waiting for a retry), ``expired_leases``, and
+            ``run_seconds`` / ``wait_seconds`` with mean, p50 and p95 over
+            the recent done jobs. Wait time is measured from enqueueing to
+            the final lease
+        """
+        now = time.time()
+        conn = self._connection()
+        stages: Dict[str, Dict[str, Any]] = {}
+
+        for row in conn.execute(
+            "SELECT stage, status, COUNT(*) AS n, "
+            "SUM(status = 'queued' AND available_at <= ?) AS ready, "
+            "SUM(status = 'leased' AND lease_expires <= ?) AS expired "
+            "FROM jobs GROUP BY stage, status",
+            (now, now),
+        ):
+            stage = stages.setdefault(row["stage"], {
+                QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 0,
+                "ready": 0, "delayed": 0, "expired_leases": 0,
+            })
+            stage[row["status"]] = row["n"]
+            if row["status"] == QUEUED:
+                stage["ready"] = row["ready"]
+                stage["delayed"] = row["n"] - row["ready"]
+            elif row["status"] == LEASED:
+                stage["expired_leases"] = row["expired"]
+
+        for name, stage in stages.items():
+            rows = conn.execute(
+                "SELECT finished - started AS run, started - created AS wait FROM jobs "
+                "WHERE stage = ? AND status = 'done' ORDER BY finished DESC LIMIT ?",
+                (name, latency_window),
+            ).fetchall()
+            stage["run_seconds"] = _summary([row["run"] for row in rows])
+            stage["wait_seconds"] = _summary([row["wait"] for row in rows])
+
+        total = {
+            key: sum(stage[key] for stage in stages.values())
+            for key in (QUEUED, LEASED, DONE, FAILED, "ready", "delayed")
+        }
+        return {"stages": stages, "total": total}
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    values = np.asarray(values, dtype=np.float64)
+    p50, p95 = np.percentile(values, [50, 95])
+    return {
+        "count": len(values),
+        "mean": float(values.mean()),
+        "p50": float(p50),
+        "p95": float(p95),
+    }
@@ -0,0 +1,175 @@
+"""Per-paper manifests for incremental re-ingestion."""
+
+import json
+import logging
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from vector_stores import chunk_uid
+
+logger = logging.getLogger(__name__)
+
+_VERSION = re.compile(r"^(.*?)v(\d+)$")
+
+
+def split_version(paper_id: str) -> Tuple[str, Optional[int]]:
+    """Split an arXiv ID into its base ID and version.
+
+    Args:
+        paper_id: Paper ID, e.g. "2401.01234v2" or "hep-th/9901001v1"
+
+    Returns:
+        ``("2401.01234", 2)``; the version is None for IDs without one
+        (including non-arXiv IDs)
+    """
+    match = _VERSION.match(paper_id)
+    if match is None:
+        return paper_id, None
+    return match.group(1), int(match.group(2))
+
+
+def safe_name(paper_id: str) -> str:
+    """File name stem for a paper ID (old-style IDs like "hep-th/9901001" contain a slash)."""
+    return paper_id.replace("/", "_")
+
+
+def chunk_metadata(paper) -> Dict[str, str]:
+    """Metadata to chunk a paper's text with, for content-addressed IDs.
+
+    Chunks carrying it get ``chunk_uid`` IDs of the form "doc_id:content_hash".
+
+    Args:
+        paper: Paper object
+
+    Returns:
+        ``{"paper_id": ..., "doc_id": ...}``
+    """
+    return {"paper_id": paper.id, "doc_id": split_version(paper.id)[0]}
+
+
+@dataclass
+class PaperManifest:
+    """What is indexed for one paper."""
+
+    doc_id: str
+    version: Optional[int]
+    updated: str
+    chunk_ids: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ChunkDiff:
+    """Chunks to embed and index IDs to delete when re-ingesting a paper."""
+
+    added: List[Dict]
+    removed: List[str]
+    chunk_ids: List[str]
+
+    @property
+    def unchanged(self) -> int:
+        return len(self.chunk_ids) - len(self.added)
+
+    @property
+    def empty(self) -> bool:
+        return not self.added and not self.removed
+
+
+class ManifestStore:
+    """One JSON manifest per paper, keyed by the version-less paper ID.
+
+    A manifest records the arXiv version and ``Paper.updated`` timestamp
+    that were indexed, and the content-addressed IDs of the paper's chunks.
+    Re-ingesting then only needs to embed chunks whose IDs are new and
+    delete IDs that are gone, and papers whose version and timestamp are
+    unchanged can be skipped before downloading anything.
+    """
+
+    def __init__(self, directory: Path):
+        """Open a manifest directory.
+
+        Args:
+            directory: Directory holding one ``<doc_id>.json`` per paper
+                (created if missing)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, doc_id: str) -> Path:
+        return self.directory / f"{safe_name(doc_id)}.json"
+
+    def __contains__(self, paper_id: str) -> bool:
+        return self._path(split_version(paper_id)[0]).exists()
+
+    def get(self, paper_id: str) -> Optional[PaperManifest]:
+        """Manifest of a paper (any version), or None if it was never indexed."""
+        path = self._path(split_version(paper_id)[0])
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            return PaperManifest(**json.load(f))
+
+    def chunk_ids(self) -> Set[str]:
+        """IDs of the chunks of every indexed paper."""
+        ids: Set[str] = set()
+        for path in self.directory.glob("*.json"):
+            with open(path, encoding="utf-8") as f:
+                ids.update(json.load(f)["chunk_ids"])
+        return ids
+
+    def is_current(self, paper) -> bool:
+        """Whether this version of the paper is already indexed.
+
+        Args:
+            paper: Paper object
+
+        Returns:
+            True if the manifest has the same version and update time
+        """
+        manifest = self.get(paper.id)
+        return (
+            manifest is not None
+            and manifest.version == split_version(paper.id)[1]
+            and manifest.updated == paper.updated.isoformat()
+        )
+
+    def diff(self, paper, chunks: List[Dict]) -> ChunkDiff:
+        """Compare a paper's new chunks with what is indexed.
+
+        Args:
+            paper: Paper object
+            chunks: Chunks of the current text, with ``doc_id`` and
+                ``content_hash`` metadata
+
+        Returns:
+            ChunkDiff with the chunks to embed and the IDs to delete
+        """
+        manifest = self.get(paper.id)
+        indexed = set(manifest.chunk_ids) if manifest is not None else set()
+        chunk_ids = [chunk_uid(chunk) for chunk in chunks]
+        current = set(chunk_ids)
+        return ChunkDiff(
+            added=[chunk for chunk, id_ in zip(chunks, chunk_ids) if id_ not in indexed],
+            removed=sorted(indexed - current),
+            chunk_ids=chunk_ids,
+        )
+
+    def commit(self, paper, chunk_ids: List[str]):
+        """Record that a paper version is indexed with the given chunks.
+
+        Call after the index write is durable. The manifest file is replaced
+        atomically.
+
+        Args:
+            paper: Paper object
+            chunk_ids: IDs of all of the paper's chunks now in the index
+        """
+        doc_id, version = split_version(paper.id)
+        manifest = PaperManifest(doc_id, version, paper.updated.isoformat(), list(chunk_ids))
+        path = self._path(doc_id)
+        partial = path.with_name(path.name + ".part")
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(asdict(manifest), f)
+        partial.replace(path)
+
@@ -0,0 +1,431 @@
+"""Staged, resumable full-text ingestion pipeline."""
+
+import json
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from vector_stores import chunk_uid
+
+from .checkpoint import DOWNLOADED, FAILED, INDEXED, PARSED, IngestionCheckpoint
+from .manifest import ManifestStore, chunk_metadata, safe_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = {"download": 4, "parse": 4, "chunk": 2}
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+
+
+@dataclass
+class _Item:
+    """A paper on its way through the stages."""
+
+    paper: Any
+    pdf_path: Optional[Path] = None
+    text: Optional[str] = None
+    # Chunks to embed, and the IDs of all of the paper's chunks
+    chunks: List[Dict] = field(default_factory=list)
+    chunk_ids: List[str] = field(default_factory=list)
+    # IDs of chunks from a previous version that are gone
+    removed: List[str] = field(default_factory=list)
+    vectors: Optional[np.ndarray] = None
+
+
+class IngestionPipeline:
+    """Download, parse, chunk, embed and index papers in concurrent stages.
+
+    Each stage runs on its own worker threads and hands papers to the next
+    through a bounded queue, so a slow stage applies backpressure instead
+    of letting work pile up in memory. PDF parsing is CPU-bound and runs in
+    worker processes; embedding runs on one thread that batches chunks from
+    several papers per model call; a single writer adds them to the index.
+
+    Progress is recorded per paper in an IngestionCheckpoint. Downloaded
+    PDFs and extracted text are kept in ``work_dir``, so a rerun after an
+    interruption skips indexed papers and resumes the others from the last
+    stage they completed. The index must make a write durable when ``add``
+    returns (SegmentedIndex does); papers are only marked indexed after that.
+
+    With a ManifestStore, re-ingesting is incremental: papers whose version
+    and update time match their manifest are skipped, and for changed papers
+    only chunks with new content-addressed IDs are embedded, while chunks
+    that disappeared are deleted from the index (which then needs
+    ``delete(ids)``).
+    """
+
+    def __init__(
+        self,
+        arxiv_client,
+        parser,
+        chunker,
+        encoder,
+        index,
+        checkpoint: IngestionCheckpoint,
+        work_dir: Path,
+        workers: Optional[Dict[str, int]] = None,
+        embed_batch_size: int = 256,
+        queue_size: int = 64,
+        parse_in_processes: bool = True,
+        manifests: Optional[ManifestStore] = None,
+    ):
+        """Initialize ingestion pipeline.
+
+        Args:
+            arxiv_client: ArxivClient used to download PDFs
+            parser: PDFParser (must be picklable if parsing in processes)
+            chunker: SemanticChunker
+            encoder: EmbeddingEncoder
+            index: Chunk index with ``add(vectors, ids)``, e.g. SegmentedIndex
+            checkpoint: Per-paper progress log
+            work_dir: Directory for PDFs, extracted text and chunk metadata
+            workers: Workers per stage ("download", "parse", "chunk")
+            embed_batch_size: Chunks encoded per model call
+            queue_size: Capacity of the queue in front of each stage
+            parse_in_processes: Parse PDFs in a process pool rather than in
+                the parse threads
+            manifests: Per-paper manifests for incremental re-ingestion
+        """
+        self.arxiv_client = arxiv_client
+        self.parser = parser
+        self.chunker = chunker
+        self.encoder = encoder
+        self.index = index
+        self.checkpoint = checkpoint
+        self.work_dir = Path(work_dir)
+        self.workers = {**DEFAULT_WORKERS, **(workers or {})}
+        self.embed_batch_size = embed_batch_size
+        self.queue_size = queue_size
+        self.parse_in_processes = parse_in_processes
+        self.manifests = manifests
+
+        self.pdf_dir = self.work_dir / "pdfs"
+        self.text_dir = self.work_dir / "text"
+        self.chunks_path = self.work_dir / "chunks.jsonl"
+
+        self.stats = self._new_stats()
+        self._queues: Dict[str, queue.Queue] = {}
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    def _new_stats() -> Dict[str, int]:
+        # chunks: embedded and added; reused: unchanged chunks kept from an
+        # earlier version; deleted: chunks of earlier versions removed
+        return {"indexed": 0, "failed": 0, "unchanged": 0, "chunks": 0, "reused": 0, "deleted": 0}
+
+    def _text_path(self, paper) -> Path:
+        return self.text_dir / f"{safe_name(paper.id)}.txt"
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _fail(self, item: _Item, stage: str, error: Exception):
+        logger.warning(f"{stage} failed for {item.paper.id}: {error}")
+        self.checkpoint.record(item.paper.id, FAILED, stage=stage, error=str(error))
+        self._count("failed")
+
+    # Queue helpers that give up when the pipeline is stopped
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue, timeout: Optional[float] = None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._stop.is_set():
+            wait = 0.2 if deadline is None else min(0.2, deadline - time.monotonic())
+            if wait <= 0:
+                raise queue.Empty
+            try:
+                return q.get(timeout=wait)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    # Stages
+
+    def _download(self, item: _Item) -> _Item:
+        paper = item.paper
+        item.pdf_path = self.pdf_dir / f"{safe_name(paper.id)}.pdf"
+        if self.checkpoint.reached(paper.id) in (DOWNLOADED, PARSED) and (
+            item.pdf_path.exists() or self._text_path(paper).exists()
+        ):
+            return item
+
+        # A file left by an interrupted download may be truncated
+        item.pdf_path.unlink(missing_ok=True)
+        item.pdf_path = self.arxiv_client.download_pdf(paper, self.pdf_dir)
+        self.checkpoint.record(paper.id, DOWNLOADED)
+        return item
+
+    def _parse(self, item: _Item) -> _Item:
+        text_path = self._text_path(item.paper)
+        if self.checkpoint.reached(item.paper.id) == PARSED and text_path.exists():
+            item.text = text_path.read_text(encoding="utf-8")
+            return item
+
+        if self._parse_pool is not None:
+            item.text = self._parse_pool.submit(self.parser.extract_text, item.pdf_path).result()
+        else:
+            item.text = self.parser.extract_text(item.pdf_path)
+
+        # Write then rename, so a text file on disk is always complete
+        partial = text_path.with_suffix(".part")
+        partial.write_text(item.text, encoding="utf-8")
+        partial.replace(text_path)
+        self.checkpoint.record(item.paper.id, PARSED)
+        return item
+
+    def _chunk(self, item: _Item) -> Optional[_Item]:
+        chunks = self.chunker.chunk_text(item.text, metadata=chunk_metadata(item.paper))
+        item.text = None
+
+        if self.manifests is not None:
+            diff = self.manifests.diff(item.paper, chunks)
+            item.chunks, item.removed, item.chunk_ids = diff.added, diff.removed, diff.chunk_ids
+            self._count("reused", diff.unchanged)
+        else:
+            item.chunks, item.chunk_ids = chunks, [chunk_uid(chunk) for chunk in chunks]
+
+        if not item.chunks and not item.removed:
+            # Nothing to write: the text is unchanged, or has no chunks at
+            # all (e.g. a scanned PDF without a text layer)
+            if self.manifests is not None:
+                self.manifests.commit(item.paper, item.chunk_ids)
+            self.checkpoint.record(item.paper.id, INDEXED, chunks=len(item.chunk_ids))
+            self._count("indexed")
+            return None
+        return item
+
+    def _run_stage(
+        self,
+        name: str,
+        fn: Callable[[_Item], Optional[_Item]],
+        inbox: str,
+        outbox: str,
+    ):
+        """Worker loop shared by the threaded stages.
+
+        ``fn`` returns the item for the next stage, or None if the paper
+        needs nothing further.
+        """
+        while True:
+            item = self._get(self._queues[inbox])
+            if item is _DONE:
+                if not self._stop.is_set():
+                    # Let the other workers of this stage see the marker too
+                    self._queues[inbox].put(_DONE)
+                return
+            try:
+                item = fn(item)
+            except Exception as e:
+                self._fail(item, name, e)
+                continue
+            if item is not None and not self._put(self._queues[outbox], item):
+                return
+
+    def _embed(self):
+        """Encode chunks of several papers per model call."""
+        inbox = self._queues["embed"]
+        done = False
+        while not done:
+            batch: List[_Item] = []
+            num_chunks = 0
+            while num_chunks < self.embed_batch_size:
+                try:
+                    # Do not hold a partial batch while upstream is slow
+                    item = self._get(inbox, timeout=None if not batch else 0.5)
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    done = True
+                    break
+                batch.append(item)
+                num_chunks += len(item.chunks)
+
+            if not batch:
+                continue
+            texts = [chunk["text"] for item in batch for chunk in item.chunks]
+            try:
+                # A batch may only hold deletions
+                vectors = self.encoder.encode(
+                    texts, batch_size=self.embed_batch_size, show_progress=False
+                ) if texts else None
+            except Exception as e:
+                for item in batch:
+                    self._fail(item, "embed", e)
+                continue
+
+            start = 0
+            for item in batch:
+                if item.chunks:
+                    item.vectors = vectors[start:start + len(item.chunks)]
+                    start += len(item.chunks)
+            if not self._put(self._queues["index"], batch):
+                return
+        self._put(self._queues["index"], _DONE)
+
+    def _write_index(self):
+        """Single writer: add each embedded batch and mark its papers indexed."""
+        with open(self.chunks_path, "a", encoding="utf-8") as chunks_file:
+            while True:
+                batch = self._get(self._queues["index"])
+                if batch is _DONE:
+                    return
+                ids = [chunk_uid(chunk) for item in batch for chunk in item.chunks]
+                removed = [id_ for item in batch for id_ in item.removed]
+                try:
+                    if removed:
+                        self.index.delete(removed)
+                    if ids:
+                        vectors = [item.vectors for item in batch if item.chunks]
+                        self.index.add(np.concatenate(vectors), ids)
+                except Exception as e:
+                    for item in batch:
+                        self._fail(item, "index", e)
+                    continue
+
+                for item in batch:
+                    for chunk in item.chunks:
+                        chunks_file.write(json.dumps(chunk) + "\n")
+                chunks_file.flush()
+                for item in batch:
+                    if self.manifests is not None:
+                        self.manifests.commit(item.paper, item.chunk_ids)
+                    self.checkpoint.record(item.paper.id, INDEXED, chunks=len(item.chunk_ids))
+                self._count("indexed", len(batch))
+                self._count("chunks", len(ids))
+                self._count("deleted", len(removed))
+
+    def run(self, papers: List, progress: Optional[Callable[[Dict[str, int]], None]] = None) -> Dict:
+        """Ingest papers, blocking until all are indexed or failed.
+
+        Papers already indexed according to the checkpoint, or unchanged
+        according to the manifests, are skipped. On KeyboardInterrupt the
+        stages stop after their current paper and the progress made so far
+        is kept.
+
+        Args:
+            papers: Paper objects to ingest
+            progress: Called about twice a second with the counts so far
+                and current queue depths
+
+        Returns:
+            Counts of indexed, failed and unchanged papers, of embedded,
+            reused and deleted chunks, and the elapsed time in seconds
+        """
+        self.stats = self._new_stats()
+        papers = [paper for paper in papers if self.checkpoint.state(paper.id) != INDEXED]
+        if self.manifests is not None:
+            changed = []
+            for paper in papers:
+                if self.manifests.is_current(paper):
+                    self.checkpoint.record(paper.id, INDEXED, unchanged=True)
+                    self.stats["unchanged"] += 1
+                else:
+                    changed.append(paper)
+            papers = changed
+        for directory in (self.pdf_dir, self.text_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        self._stop.clear()
+        self._queues = {
+            name: queue.Queue(maxsize=self.queue_size)
+            for name in ("download", "parse", "chunk", "embed", "index")
+        }
+        if self.parse_in_processes:
+            # Spawn: forking a process that is running threads is unsafe
+            self._parse_pool = ProcessPoolExecutor(
+                max_workers=self.workers["parse"],
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        stages = [
+            ("download", self._download, "download", "parse"),
+            ("parse", self._parse, "parse", "chunk"),
+            ("chunk", self._chunk, "chunk", "embed"),
+        ]
+        groups = []
+        for name, fn, inbox, outbox in stages:
+            threads = [
+                threading.Thread(
+                    target=self._run_stage,
+                    args=(name, fn, inbox, outbox),
+                    name=f"ingest-{name}-{i}",
+                    daemon=True,
+                )
+                for i in range(self.workers[name])
+            ]
+            groups.append((threads, outbox))
+        embed = threading.Thread(target=self._embed, name="ingest-embed", daemon=True)
+        writer = threading.Thread(target=self._write_index, name="ingest-index", daemon=True)
+        feeder = threading.Thread(target=self._feed, args=(papers,), name="ingest-feed", daemon=True)
+
+        started = time.time()
+        for threads, _ in groups:
+            for thread in threads:
+                thread.start()
+        embed.start()
+        writer.start()
+        feeder.start()
+
+        try:
+            # Close each stage's outbox once all of its workers have exited
+            for threads, outbox in groups:
+                for thread in threads:
+                    while thread.is_alive():
+                        thread.join(0.5)
+                        self._report(progress)
+                self._put(self._queues[outbox], _DONE)
+            for thread in (embed, writer):
+                while thread.is_alive():
+                    thread.join(0.5)
+                    self._report(progress)
+        except KeyboardInterrupt:
+            logger.warning("Interrupted; stopping after the papers in progress")
+            self._stop.set()
+            for thread in [t for threads, _ in groups for t in threads] + [embed, writer]:
+                thread.join()
+        finally:
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown(cancel_futures=True)
+                self._parse_pool = None
+
+        self.stats["elapsed"] = time.time() - started
+        self._report(progress)
+        logger.info(
+            f"Ingested {self.stats['indexed']} papers ({self.stats['chunks']} chunks), "
+            f"{self.stats['failed']} failed, in {self.stats['elapsed']:.0f}s"
+        )
+        return dict(self.stats)
+
+    def _feed(self, papers: List):
+        for paper in papers:
+            if not self._put(self._queues["download"], _Item(paper)):
+                return
+        self._put(self._queues["download"], _DONE)
+
+    def _report(self, progress: Optional[Callable[[Dict[str, int]], None]]):
+        if progress is None:
+            return
+        with self._stats_lock:
+            snapshot = dict(self.stats)
+        snapshot["queued"] = {name: q.qsize() for name, q in self._queues.items()}
+        progress(snapshot)
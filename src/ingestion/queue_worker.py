@@ -0,0 +1,294 @@
+"""Workers that run ingestion stages from a JobQueue."""
+
+import json
+import logging
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from vector_stores import chunk_uid
+
+from .checkpoint import paper_from_dict
+from .job_queue import Job, JobQueue, PermanentError
+from .manifest import ManifestStore, chunk_metadata, safe_name
+
+logger = logging.getLogger(__name__)
+
+QUEUE_STAGES = ("download", "parse", "embed", "index")
+
+
+class QueueStages:
+    """Ingestion stages as job handlers, each enqueueing the next stage.
+
+    download -> parse -> embed (chunk and encode) -> index. Stages hand data
+    over through files in ``work_dir`` (PDFs, extracted text, chunk vectors),
+    so consecutive stages can run in different processes or on a later run.
+    Components only needed by stages a worker does not run may be None.
+
+    The index stage writes to a single-writer index such as SegmentedIndex,
+    so exactly one worker should run it.
+
+    With a ManifestStore, unchanged paper versions are skipped at download
+    and only new or changed chunks are embedded; chunks that disappeared
+    from a paper are deleted at the index stage.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        work_dir: Path,
+        paper_type: Optional[Callable] = None,
+        arxiv_client=None,
+        parser=None,
+        chunker=None,
+        encoder=None,
+        index=None,
+        manifests: Optional[ManifestStore] = None,
+    ):
+        """Initialize stages.
+
+        Args:
+            queue: Queue the next stages are enqueued on
+            work_dir: Directory for PDFs, text, vectors and chunk metadata
+            paper_type: Paper class, for "download"
+            arxiv_client: ArxivClient, for "download"
+            parser: PDFParser, for "parse"
+            chunker: SemanticChunker, for "embed"
+            encoder: EmbeddingEncoder, for "embed"
+            index: Chunk index with ``add(vectors, ids)`` (and ``delete(ids)``
+                with manifests), for "index"
+            manifests: Per-paper manifests for incremental re-ingestion
+        """
+        self.queue = queue
+        self.work_dir = Path(work_dir)
+        self.paper_type = paper_type
+        self.arxiv_client = arxiv_client
+        self.parser = parser
+        self.chunker = chunker
+        self.encoder = encoder
+        self.index = index
+        self.manifests = manifests
+
+        self.pdf_dir = self.work_dir / "pdfs"
+        self.text_dir = self.work_dir / "text"
+        self.vector_dir = self.work_dir / "vectors"
+        self.chunks_path = self.work_dir / "chunks.jsonl"
+        for directory in (self.pdf_dir, self.text_dir, self.vector_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def handlers(self) -> Dict[str, Callable[[Job], Dict[str, Any]]]:
+        """Handler for every stage, keyed by stage name."""
+        return {
+            "download": self.download,
+            "parse": self.parse,
+            "embed": self.embed,
+            "index": self.index_chunks,
+        }
+
+    def enqueue_papers(self, papers: List, priority: int = 0) -> int:
+        """Queue download jobs for papers.
+
+        Args:
+            papers: Paper objects
+            priority: Higher values are processed first
+
+        Returns:
+            Number of papers queued (already queued papers are skipped)
+        """
+        return self.queue.enqueue_many(
+            [("download", paper.id, {"paper": paper.to_dict()}) for paper in papers],
+            priority=priority,
+        )
+
+    def _next(self, job: Job, stage: str, payload: Dict[str, Any]):
+        self.queue.enqueue(stage, job.paper_id, payload, priority=job.priority)
+
+    def download(self, job: Job) -> Dict[str, Any]:
+        paper = paper_from_dict(job.payload["paper"], self.paper_type)
+        if self.manifests is not None and self.manifests.is_current(paper):
+            return {"unchanged": True}
+
+        pdf_path = self.pdf_dir / f"{safe_name(paper.id)}.pdf"
+        # A file from an earlier, interrupted attempt may be truncated
+        if job.attempts > 1:
+            pdf_path.unlink(missing_ok=True)
+        pdf_path = self.arxiv_client.download_pdf(paper, self.pdf_dir)
+        self._next(job, "parse", {**job.payload, "pdf_path": str(pdf_path)})
+        return {"pdf_path": str(pdf_path)}
+
+    def parse(self, job: Job) -> Dict[str, Any]:
+        pdf_path = Path(job.payload["pdf_path"])
+        if not pdf_path.exists():
+            raise PermanentError(f"{pdf_path} does not exist")
+
+        text = self.parser.extract_text(pdf_path)
+        text_path = self.text_dir / f"{safe_name(job.paper_id)}.txt"
+        partial = text_path.with_suffix(".part")
+        partial.write_text(text, encoding="utf-8")
+        partial.replace(text_path)
+
+        self._next(job, "embed", {**job.payload, "text_path": str(text_path)})
+        return {"characters": len(text)}
+
+    def embed(self, job: Job) -> Dict[str, Any]:
+        paper = paper_from_dict(job.payload["paper"], self.paper_type)
+        text = Path(job.payload["text_path"]).read_text(encoding="utf-8")
+        chunks = self.chunker.chunk_text(text, metadata=chunk_metadata(paper))
+
+        if self.manifests is not None:
+            diff = self.manifests.diff(paper, chunks)
+            added, removed, chunk_ids = diff.added, diff.removed, diff.chunk_ids
+        else:
+            added, removed, chunk_ids = chunks, [], [chunk_uid(chunk) for chunk in chunks]
+        if not added and not removed:
+            if self.manifests is not None:
+                self.manifests.commit(paper, chunk_ids)
+            return {"chunks": len(chunk_ids), "embedded": 0}
+
+        if added:
+            vectors = self.encoder.encode([chunk["text"] for chunk in added], show_progress=False)
+        else:
+            vectors = np.zeros((0, 0))
+        vector_path = self.vector_dir / f"{safe_name(job.paper_id)}.npz"
+        partial = vector_path.with_suffix(".part.npz")
+        np.savez(
+            partial,
+            vectors=np.asarray(vectors, dtype=np.float32),
+            chunks=np.array(json.dumps({"added": added, "removed": removed, "ids": chunk_ids})),
+        )
+        partial.replace(vector_path)
+
+        self._next(job, "index", {**job.payload, "vector_path": str(vector_path)})
+        return {"chunks": len(chunk_ids), "embedded": len(added), "removed": len(removed)}
+
+    def index_chunks(self, job: Job) -> Dict[str, Any]:
+        paper = paper_from_dict(job.payload["paper"], self.paper_type)
+        vector_path = Path(job.payload["vector_path"])
+        if not vector_path.exists():
+            # An earlier attempt finished but was not marked done
+            if self.manifests is not None and self.manifests.is_current(paper):
+                return {"added": 0, "removed": 0}
+            raise PermanentError(f"{vector_path} does not exist")
+        with np.load(vector_path) as data:
+            vectors = data["vectors"]
+            chunks = json.loads(str(data["chunks"]))
+
+        if chunks["removed"]:
+            self.index.delete(chunks["removed"])
+        if chunks["added"]:
+            self.index.add(vectors, [chunk_uid(chunk) for chunk in chunks["added"]])
+            with open(self.chunks_path, "a", encoding="utf-8") as f:
+                for chunk in chunks["added"]:
+                    f.write(json.dumps(chunk) + "\n")
+        if self.manifests is not None:
+            self.manifests.commit(paper, chunks["ids"])
+
+        vector_path.unlink(missing_ok=True)
+        return {"added": len(chunks["added"]), "removed": len(chunks["removed"])}
+
+
+class QueueWorker:
+    """Lease jobs from a JobQueue and run the matching handler.
+
+    While a handler runs, a heartbeat thread keeps extending the job's
+    lease, so ``visibility_timeout`` only has to cover the time to notice
+    a dead worker, not the longest job. Exceptions fail the job (retried
+    with backoff); PermanentError fails it without retrying.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, Callable[[Job], Optional[Dict[str, Any]]]],
+        worker_id: Optional[str] = None,
+        poll_interval: float = 1.0,
+    ):
+        """Initialize worker.
+
+        Args:
+            queue: Job queue
+            handlers: Handler per stage; the worker only leases these stages
+            worker_id: Name recorded on leases; defaults to host:pid
+            poll_interval: Seconds to sleep when no job is available
+        """
+        self.queue = queue
+        self.handlers = handlers
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval
+
+        self.stats = {"done": 0, "failed": 0, "lost": 0}
+
+    def _heartbeat(self, job: Job, done: threading.Event):
+        interval = self.queue.visibility_timeout / 3
+        try:
+            while not done.wait(interval):
+                if not self.queue.heartbeat(job):
+                    logger.warning(f"Lost lease on {job.stage}/{job.paper_id}")
+                    return
+        finally:
+            # This thread's own database connection
+            self.queue.close()
+
+    def run_job(self, job: Job):
+        """Run one leased job and record its outcome."""
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, done), daemon=True)
+        heartbeat.start()
+        try:
+            result = self.handlers[job.stage](job)
+        except PermanentError as e:
+            recorded = self.queue.fail(job, str(e), retry=False)
+            self.stats["failed"] += 1
+        except Exception as e:
+            recorded = self.queue.fail(job, f"{type(e).__name__}: {e}")
+            self.stats["failed"] += 1
+        else:
+            recorded = self.queue.complete(job, result)
+            self.stats["done"] += 1
+        finally:
+            done.set()
+            heartbeat.join()
+
+        if not recorded:
+            # Another worker took the job after our lease expired; its
+            # outcome wins
+            self.stats["lost"] += 1
+
+    def run(
+        self,
+        stop: Optional[threading.Event] = None,
+        max_jobs: Optional[int] = None,
+        exit_when_idle: bool = False,
+    ) -> Dict[str, int]:
+        """Process jobs until stopped.
+
+        Args:
+            stop: Event that ends the loop after the current job
+            max_jobs: Stop after this many jobs
+            exit_when_idle: Stop once no job in any stage is queued or
+                leased
+
+        Returns:
+            Counts of done, failed and lost jobs
+        """
+        stop = stop or threading.Event()
+        stages = list(self.handlers)
+        processed = 0
+        logger.info(f"Worker {self.worker_id} running stages {stages}")
+
+        while not stop.is_set() and (max_jobs is None or processed < max_jobs):
+            jobs = self.queue.lease(self.worker_id, stages)
+            if not jobs:
+                # Jobs of other stages may still produce work for this one
+                if exit_when_idle and self.queue.unfinished() == 0:
+                    break
+                stop.wait(self.poll_interval)
+                continue
+            self.run_job(jobs[0])
+            processed += 1
+
+        return dict(self.stats)
@@ -0,0 +1,127 @@
+"""Hash partitioning of papers into shards built on separate nodes."""
+
+import hashlib
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import Container, Dict, Iterable, List, Optional
+
+from vector_stores import chunk_uid
+
+from .manifest import split_version
+
+logger = logging.getLogger(__name__)
+
+
+def shard_of(paper_id: str, num_shards: int) -> int:
+    """Shard a paper belongs to.
+
+    The version-less ID is hashed, so every version of a paper lands on the
+    same shard (and its manifest), and the assignment is the same on every
+    node and Python process.
+
+    Args:
+        paper_id: Paper ID
+        num_shards: Number of shards
+
+    Returns:
+        Shard number in ``[0, num_shards)``
+    """
+    if num_shards < 1:
+        raise ValueError("num_shards must be positive")
+    digest = hashlib.blake2b(split_version(paper_id)[0].encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % num_shards
+
+
+def partition(papers: Iterable, num_shards: int) -> Dict[int, List]:
+    """Group papers by shard.
+
+    Args:
+        papers: Paper objects
+        num_shards: Number of shards
+
+    Returns:
+        Papers of every shard, keyed by shard number
+    """
+    shards: Dict[int, List] = {shard: [] for shard in range(num_shards)}
+    for paper in papers:
+        shards[shard_of(paper.id, num_shards)].append(paper)
+    return shards
+
+
+def shard_name(shard: int, num_shards: int) -> str:
+    """Directory name of a shard, e.g. "shard-002-of-008"."""
+    if not 0 <= shard < num_shards:
+        raise ValueError(f"shard must be in [0, {num_shards}), got {shard}")
+    return f"shard-{shard:03d}-of-{num_shards:03d}"
+
+
+def read_chunks(chunks_path: Path, live: Optional[Container[str]] = None) -> Dict[str, Dict]:
+    """Chunks recorded in a work directory's chunk log.
+
+    The log is append-only, so it also holds chunks that were deleted from
+    the index on re-ingestion; pass the index as ``live`` to drop them.
+
+    Args:
+        chunks_path: ``chunks.jsonl`` of an ingestion work directory
+        live: IDs to keep, e.g. the chunk index (anything supporting ``in``)
+
+    Returns:
+        Chunks keyed by ``chunk_uid``, in log order
+    """
+    chunks: Dict[str, Dict] = {}
+    if not Path(chunks_path).exists():
+        return chunks
+    with open(chunks_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            chunk = json.loads(line)
+            key = chunk_uid(chunk)
+            if live is None or key in live:
+                chunks[key] = chunk
+    return chunks
+
+
+def build_lexical_index(chunks: Dict[str, Dict], index, text_key: str = "text"):
+    """Add chunk texts to a lexical index under their chunk keys.
+
+    Args:
+        chunks: Chunks keyed by ``chunk_uid`` (see ``read_chunks``)
+        index: Empty index with ``add(texts, ids)``, e.g. BM25Index
+        text_key: Key containing text in chunk dict
+
+    Returns:
+        The index
+    """
+    index.add([chunk[text_key] for chunk in chunks.values()], list(chunks))
+    return index
+
+
+def merge_work_dirs(shard_dirs: List[Path], output_dir: Path, live: Container[str]) -> int:
+    """Combine the chunk logs and manifests of shard work directories.
+
+    Args:
+        shard_dirs: Shard work directories
+        output_dir: Work directory of the merged corpus
+        live: Chunk IDs of the merged index; other logged chunks are dropped
+
+    Returns:
+        Number of chunks written
+    """
+    output_dir = Path(output_dir)
+    (output_dir / "manifests").mkdir(parents=True, exist_ok=True)
+    written = 0
+    partial = output_dir / "chunks.jsonl.part"
+    with open(partial, "w", encoding="utf-8") as out:
+        for shard_dir in shard_dirs:
+            for chunk in read_chunks(Path(shard_dir) / "chunks.jsonl", live).values():
+                out.write(json.dumps(chunk) + "\n")
+                written += 1
+            # Papers are partitioned, so manifest files never collide
+            for manifest in (Path(shard_dir) / "manifests").glob("*.json"):
+                shutil.copy2(manifest, output_dir / "manifests" / manifest.name)
+    partial.replace(output_dir / "chunks.jsonl")
+    logger.info(f"Merged {len(shard_dirs)} shard work directories into {output_dir}")
+    return written
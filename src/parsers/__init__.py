@@ -1,6 +1,6 @@
 """PDF parsing and text extraction."""
 
 from .pdf_parser import PDFParser
-from .chunker import SemanticChunker
+from .chunker import SemanticChunker, content_hash, normalize_text
 
-__all__ = ["PDFParser", "SemanticChunker"]
+__all__ = ["PDFParser", "SemanticChunker", "content_hash", "normalize_text"]
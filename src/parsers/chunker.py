@@ -1,11 +1,41 @@
 """Text chunking strategies for document processing."""
 
+import hashlib
 import logging
 from typing import List, Dict
 import re
 
 logger = logging.getLogger(__name__)
 
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of chunk text for hashing.
+
+    Whitespace differences (re-flowed lines, PDF extraction noise) and case
+    do not change the content hash.
+
+    Args:
+        text: Chunk text
+
+    Returns:
+        Lowercased text with runs of whitespace collapsed
+    """
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def content_hash(text: str) -> str:
+    """Stable 16-hex-digit hash of normalized text.
+
+    Args:
+        text: Chunk text
+
+    Returns:
+        Hash string
+    """
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=8).hexdigest()
+
 
 class SemanticChunker:
     """Chunk text semantically for better embedding quality."""
@@ -47,6 +77,8 @@ class SemanticChunker:
         chunks = []
         current_chunk = ""
         chunk_id = 0
+        # Occurrences of each content hash, to keep repeated text unique
+        seen: Dict[str, int] = {}
 
         # Split by paragraphs first
         paragraphs = re.split(r'\n\n+', text)
@@ -63,7 +95,8 @@ class SemanticChunker:
                     chunks.append(self._create_chunk(
                         sub_chunk,
                         chunk_id,
-                        metadata
+                        metadata,
+                        seen,
                     ))
                     chunk_id += 1
             else:
@@ -76,7 +109,8 @@ class SemanticChunker:
                         chunks.append(self._create_chunk(
                             current_chunk,
                             chunk_id,
-                            metadata
+                            metadata,
+                            seen,
                         ))
                         chunk_id += 1
 
@@ -87,7 +121,8 @@ class SemanticChunker:
             chunks.append(self._create_chunk(
                 current_chunk,
                 chunk_id,
-                metadata
+                metadata,
+                seen,
             ))
 
         logger.info(f"Created {len(chunks)} chunks")
@@ -139,20 +174,32 @@ class SemanticChunker:
         self,
         text: str,
         chunk_id: int,
-        metadata: Dict = None
+        metadata: Dict = None,
+        seen: Dict[str, int] = None,
     ) -> Dict:
         """Create chunk dictionary.
 
         Args:
             text: Chunk text
-            chunk_id: Chunk identifier
+            chunk_id: Position of the chunk in the document
             metadata: Additional metadata
+            seen: Content hashes already used in this document, with counts
 
         Returns:
-            Chunk dictionary
+            Chunk dictionary. ``content_hash`` identifies the chunk by its
+            text, so it survives edits elsewhere in the document; a repeat of
+            the same text within a document gets a ``-N`` suffix
         """
+        digest = content_hash(text)
+        if seen is not None:
+            count = seen.get(digest, 0)
+            seen[digest] = count + 1
+            if count:
+                digest = f"{digest}-{count}"
+
         chunk = {
             "chunk_id": chunk_id,
+            "content_hash": digest,
             "text": text,
             "char_count": len(text),
             "word_count": len(text.split()),
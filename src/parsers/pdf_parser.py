@@ -3,12 +3,18 @@
 import logging
 from pathlib import Path
 from typing import Optional, Dict, List
-import fitz  # PyMuPDF
 import re
 
 logger = logging.getLogger(__name__)
 
 
+def _open_pdf(pdf_path: Path):
+    """Open a PDF, importing PyMuPDF on first use to keep startup fast."""
+    import fitz  # PyMuPDF
+
+    return fitz.open(pdf_path)
+
+
 class PDFParser:
     """Parse and extract text from PDF files."""
 
@@ -28,7 +34,7 @@ class PDFParser:
         logger.info(f"Extracting text from: {pdf_path}")
 
         try:
-            doc = fitz.open(pdf_path)
+            doc = _open_pdf(pdf_path)
             text = ""
 
             for page_num in range(len(doc)):
@@ -61,7 +67,7 @@ class PDFParser:
         logger.info(f"Extracting text and metadata from: {pdf_path}")
 
         try:
-            doc = fitz.open(pdf_path)
+            doc = _open_pdf(pdf_path)
 
             # Extract metadata
             metadata = doc.metadata
@@ -163,7 +169,7 @@ class PDFParser:
             Number of pages
         """
         try:
-            doc = fitz.open(pdf_path)
+            doc = _open_pdf(pdf_path)
             count = len(doc)
             doc.close()
             return count
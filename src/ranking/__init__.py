@@ -0,0 +1,5 @@
+"""Ranking of candidate papers."""
+
+from .ranker import PaperRanker, paper_text
+
+__all__ = ["PaperRanker", "paper_text"]
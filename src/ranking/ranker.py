@@ -0,0 +1,214 @@
+"""Blend semantic relevance, citations and recency into one paper ranking."""
+
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400.0
+
+
+def paper_text(paper) -> str:
+    """Text embedded for a paper: title and abstract.
+
+    Args:
+        paper: Paper object
+
+    Returns:
+        "title. abstract"
+    """
+    return f"{paper.title}. {paper.abstract}"
+
+
+class PaperRanker:
+    """Rank candidate papers for a query.
+
+    The query and every candidate are embedded in one batch and relevance is
+    a single matrix-vector product. Citations (log-scaled to [0, 1]) and
+    recency (exponential decay with a half-life) are computed as arrays over
+    the whole candidate set, so apart from encoding the cost is a few NumPy
+    passes. Paper embeddings are kept in an LRU cache by paper ID, so
+    re-ranking overlapping result sets only encodes new papers.
+    """
+
+    def __init__(
+        self,
+        encoder,
+        relevance_weight: float = 0.7,
+        citation_weight: float = 0.2,
+        recency_weight: float = 0.1,
+        recency_half_life_days: float = 730.0,
+        cache_size: int = 50000,
+    ):
+        """Initialize ranker.
+
+        Args:
+            encoder: EmbeddingEncoder (or anything with ``encode(texts)``)
+            relevance_weight: Weight of query-paper cosine similarity
+            citation_weight: Weight of log-scaled citation count
+            recency_weight: Weight of publication recency
+            recency_half_life_days: Age at which the recency score halves
+            cache_size: Paper embeddings kept in memory (0 disables the cache)
+        """
+        self.encoder = encoder
+        self.relevance_weight = relevance_weight
+        self.citation_weight = citation_weight
+        self.recency_weight = recency_weight
+        self.recency_half_life_days = recency_half_life_days
+        self.cache_size = cache_size
+
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # The ranker is shared across sessions and the API's CPU threads
+        self._cache_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], encoder, **kwargs) -> "PaperRanker":
+        """Create a ranker from the ``ranking`` section of the agent config.
+
+        Args:
+            config: Parsed configs/agent_config.yaml
+            encoder: EmbeddingEncoder
+            **kwargs: Overrides for other constructor arguments
+
+        Returns:
+            PaperRanker
+        """
+        ranking = config.get("ranking", {})
+        params = {
+            "relevance_weight": ranking.get("relevance_weight", 0.7),
+            "citation_weight": ranking.get("citation_weight", 0.2),
+            "recency_weight": ranking.get("recency_weight", 0.1),
+            "recency_half_life_days": ranking.get("recency_half_life_days", 730.0),
+            "cache_size": ranking.get("cache_size", 50000),
+        }
+        params.update(kwargs)
+        return cls(encoder, **params)
+
+    def _embed(self, query: str, papers: List) -> Tuple[np.ndarray, np.ndarray]:
+        """Embed the query and papers in one batch, reusing cached papers."""
+        # Take the cached vectors under the lock so other threads cannot
+        # evict them between the lookup and the read
+        cached: Dict[str, np.ndarray] = {}
+        with self._cache_lock:
+            for paper in papers:
+                vector = self._cache.get(paper.id)
+                if vector is not None:
+                    self._cache.move_to_end(paper.id)
+                    cached[paper.id] = vector
+
+        missing = [i for i, paper in enumerate(papers) if paper.id not in cached]
+        texts = [query] + [paper_text(papers[i]) for i in missing]
+        embeddings = np.asarray(
+            self.encoder.encode(texts, show_progress=False, normalize=True), dtype=np.float32
+        )
+
+        new = dict(zip((papers[i].id for i in missing), embeddings[1:]))
+        matrix = np.empty((len(papers), embeddings.shape[1]), dtype=np.float32)
+        for row, paper in enumerate(papers):
+            vector = new.get(paper.id)
+            matrix[row] = cached[paper.id] if vector is None else vector
+
+        if self.cache_size:
+            with self._cache_lock:
+                self._cache.update(new)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return embeddings[0], matrix
+
+    def score(
+        self,
+        query: str,
+        papers: List,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Score every candidate.
+
+        Args:
+            query: Query text
+            papers: Candidate Paper objects
+            now: Reference time for recency. Current time if None
+
+        Returns:
+            Dictionary of arrays (len(papers),): relevance, citations,
+            recency and the weighted total under "score"
+        """
+        if not papers:
+            empty = np.empty(0, dtype=np.float32)
+            return {"relevance": empty, "citations": empty, "recency": empty, "score": empty}
+
+        query_vector, paper_vectors = self._embed(query, papers)
+        relevance = paper_vectors @ query_vector
+
+        counts = np.fromiter(
+            (max(paper.citation_count or 0, 0) for paper in papers),
+            dtype=np.float32,
+            count=len(papers),
+        )
+        log_counts = np.log1p(counts)
+        top = log_counts.max()
+        citations = log_counts / top if top > 0 else np.zeros_like(log_counts)
+
+        now = (now or datetime.now(timezone.utc)).timestamp()
+        # Naive datetimes (Semantic Scholar) are read as local time by timestamp()
+        published = np.fromiter(
+            (paper.published.timestamp() for paper in papers),
+            dtype=np.float64,
+            count=len(papers),
+        )
+        age_days = np.maximum(now - published, 0) / SECONDS_PER_DAY
+        recency = np.exp2(-age_days / self.recency_half_life_days).astype(np.float32)
+
+        score = (
+            self.relevance_weight * relevance
+            + self.citation_weight * citations
+            + self.recency_weight * recency
+        )
+        return {
+            "relevance": relevance,
+            "citations": citations,
+            "recency": recency,
+            "score": score,
+        }
+
+    def rank(
+        self,
+        query: str,
+        papers: List,
+        top_k: Optional[int] = None,
+        now: Optional[datetime] = None,
+    ) -> List[Tuple[Any, float]]:
+        """Sort candidates by blended score.
+
+        Args:
+            query: Query text
+            papers: Candidate Paper objects
+            top_k: Number of papers to return. All if None
+            now: Reference time for recency. Current time if None
+
+        Returns:
+            (paper, score) pairs, best first
+        """
+        scores = self.score(query, papers, now)["score"]
+        k = len(papers) if top_k is None else min(top_k, len(papers))
+        if k == 0:
+            return []
+
+        if k < len(papers):
+            # Partial selection is O(n); only the top k are sorted
+            selected = np.argpartition(-scores, k - 1)[:k]
+            order = selected[np.argsort(-scores[selected], kind="stable")]
+        else:
+            order = np.argsort(-scores, kind="stable")
+
+        return [(papers[i], float(scores[i])) for i in order]
+
+    def clear_cache(self):
+        """Drop cached paper embeddings."""
+        with self._cache_lock:
+            self._cache.clear()
@@ -0,0 +1,45 @@
+"""Vector indexes for similarity search over embeddings."""
+
+from .base import SearchHit, chunk_uid
+from .flat_index import FlatIndex
+from .hnsw_index import HNSWIndex
+from .ivfpq_index import IVFPQIndex
+from .segmented_index import SegmentedIndex
+from .qdrant_store import QdrantStore, to_qdrant_filter
+from .wal import WriteAheadLog
+from .bm25 import BM25Index, tokenize
+from .hybrid import HybridRetriever, reciprocal_rank_fusion, weighted_score_fusion
+from .evaluation import recall_at_k, recall_latency_curve
+from .filters import And, Eq, Filter, In, MetadataIndex, Not, Or, Range, paper_record
+from .sharding import ShardRouter, merge_hits, merge_indexes
+
+__all__ = [
+    "SearchHit",
+    "FlatIndex",
+    "HNSWIndex",
+    "IVFPQIndex",
+    "SegmentedIndex",
+    "WriteAheadLog",
+    "QdrantStore",
+    "BM25Index",
+    "HybridRetriever",
+    "chunk_uid",
+    "tokenize",
+    "reciprocal_rank_fusion",
+    "weighted_score_fusion",
+    "recall_at_k",
+    "recall_latency_curve",
+    "MetadataIndex",
+    "Filter",
+    "Eq",
+    "In",
+    "Range",
+    "And",
+    "Or",
+    "Not",
+    "paper_record",
+    "to_qdrant_filter",
+    "ShardRouter",
+    "merge_hits",
+    "merge_indexes",
+]
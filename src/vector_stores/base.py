@@ -0,0 +1,107 @@
+"""Shared types and helpers for vector indexes."""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+METRICS = ("cosine", "dot")
+
+
+@dataclass
+class SearchHit:
+    """A single search result."""
+
+    id: str
+    score: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {"id": self.id, "score": self.score}
+
+
+def prepare_vectors(vectors: np.ndarray, metric: str) -> np.ndarray:
+    """Convert vectors to contiguous float32, unit-normalized for cosine.
+
+    Args:
+        vectors: Single vector or matrix of vectors
+        metric: "cosine" or "dot"
+
+    Returns:
+        Float32 matrix (n, dim)
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    if metric == "cosine":
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+    return np.ascontiguousarray(vectors)
+
+
+def top_k_rows(scores: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Select the top-k columns of each row of a score matrix, best first.
+
+    Args:
+        scores: Score matrix (q, n)
+        top_k: Number of results per row
+
+    Returns:
+        Tuple of (scores, column indices), each (q, min(top_k, n))
+    """
+    k = min(top_k, scores.shape[1])
+    if k == 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.float32), empty.astype(np.int64)
+
+    # argpartition is O(n); only the k survivors get fully sorted
+    columns = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    selected = np.take_along_axis(scores, columns, axis=1)
+    order = np.argsort(-selected, axis=1, kind="stable")
+    return (
+        np.take_along_axis(selected, order, axis=1),
+        np.take_along_axis(columns, order, axis=1),
+    )
+
+
+def to_hits(
+    scores: np.ndarray,
+    rows: np.ndarray,
+    ids: List[str],
+) -> List[List[SearchHit]]:
+    """Convert (scores, rows) arrays to hits, dropping -1 padding.
+
+    Args:
+        scores: Score matrix (q, k)
+        rows: Row indices (q, k), -1 where there is no result
+        ids: External ID for every row
+
+    Returns:
+        One list of hits per query
+    """
+    return [
+        [
+            SearchHit(id=ids[row], score=float(score))
+            for score, row in zip(query_scores, query_rows)
+            if row >= 0
+        ]
+        for query_scores, query_rows in zip(scores, rows)
+    ]
+
+
+def chunk_uid(chunk: Dict[str, Any]) -> str:
+    """Corpus-wide ID of a chunk from SemanticChunker.
+
+    Chunks are identified by their ``content_hash``, so an unchanged chunk
+    keeps its ID when text elsewhere in the paper changes. The hash is only
+    unique within a document, so it is prefixed with the ``doc_id`` metadata
+    (the version-less paper ID), or ``paper_id`` if there is no ``doc_id``.
+    Chunks without a content hash fall back to their position, ``chunk_id``.
+
+    Args:
+        chunk: Chunk dictionary
+
+    Returns:
+        Chunk ID string
+    """
+    key = chunk["content_hash"] if "content_hash" in chunk else chunk["chunk_id"]
+    doc_id = chunk.get("doc_id") or chunk.get("paper_id")
+    return f"{doc_id}:{key}" if doc_id else str(key)
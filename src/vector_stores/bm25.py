@@ -0,0 +1,308 @@
+"""Array-backed BM25 lexical index over chunk text."""
+
+import json
+import logging
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .base import SearchHit, chunk_uid, top_k_rows
+
+logger = logging.getLogger(__name__)
+
+# Keeps technical terms such as "gpt-4", "resnet-50" or "v2.0" as one token
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into terms.
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of terms
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """BM25 index with postings stored as CSR arrays.
+
+    Postings are grouped by term into one int32 document-ID array with a
+    per-term offset array. Because BM25 term weights do not depend on the
+    query, each posting's full weight (IDF times saturated, length-normalized
+    term frequency) is precomputed, and a query is a sum of posting weights
+    accumulated with ``np.bincount``.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """Initialize BM25 index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+
+        self.ids: List[str] = []
+        self.vocabulary: Dict[str, int] = {}
+        self._doc_lengths: List[int] = []
+        # (term IDs, term frequencies) of documents added since the last build
+        self._pending: List[Tuple[np.ndarray, np.ndarray]] = []
+
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._docs = np.empty(0, dtype=np.int32)
+        self._tfs = np.empty(0, dtype=np.float32)
+        self._weights = np.empty(0, dtype=np.float32)
+        self.idf = np.empty(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, texts: List[str], ids: List[str]):
+        """Add documents.
+
+        Args:
+            texts: Document texts
+            ids: External ID for every document
+        """
+        if len(texts) != len(ids):
+            raise ValueError(f"Got {len(texts)} texts but {len(ids)} ids")
+
+        vocabulary = self.vocabulary
+        for text, id_ in zip(texts, ids):
+            terms = tokenize(text)
+            counts = Counter(terms)
+            term_ids = np.fromiter(
+                (vocabulary.setdefault(term, len(vocabulary)) for term in counts),
+                dtype=np.int64,
+                count=len(counts),
+            )
+            tfs = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            self._pending.append((term_ids, tfs))
+            self._doc_lengths.append(len(terms))
+            self.ids.append(id_)
+
+        logger.info(f"Added {len(texts)} documents, index size {len(self.ids)}")
+
+    def add_chunks(self, chunks: List[Dict[str, Any]], text_key: str = "text"):
+        """Add SemanticChunker output, keyed by ``chunk_uid``.
+
+        Args:
+            chunks: Chunk dictionaries
+            text_key: Key containing text in chunk dict
+        """
+        self.add([chunk[text_key] for chunk in chunks], [chunk_uid(c) for c in chunks])
+
+    def _build(self):
+        """Merge pending documents into the CSR postings and recompute weights."""
+        first_doc = len(self.ids) - len(self._pending)
+        lengths = [len(term_ids) for term_ids, _ in self._pending]
+        term_ids = np.concatenate([np.empty(0, np.int64)] + [t for t, _ in self._pending])
+        tfs = np.concatenate([np.empty(0, np.float32)] + [f for _, f in self._pending])
+        doc_ids = np.repeat(
+            np.arange(first_doc, len(self.ids), dtype=np.int32), lengths
+        )
+        self._pending = []
+
+        # Decompress existing postings to (term, doc, tf) triplets and merge
+        old_terms = np.repeat(
+            np.arange(len(self._offsets) - 1, dtype=np.int64), np.diff(self._offsets)
+        )
+        self._set_postings(
+            np.concatenate([old_terms, term_ids]),
+            np.concatenate([self._docs, doc_ids]),
+            np.concatenate([self._tfs, tfs]),
+        )
+
+    def _set_postings(self, all_terms: np.ndarray, all_docs: np.ndarray, all_tfs: np.ndarray):
+        """Store (term, doc, tf) triplets as CSR postings and compute weights."""
+        order = np.argsort(all_terms, kind="stable")
+        self._docs = all_docs[order]
+        self._tfs = all_tfs[order]
+
+        num_terms = len(self.vocabulary)
+        df = np.bincount(all_terms, minlength=num_terms)
+        self._offsets = np.zeros(num_terms + 1, dtype=np.int64)
+        np.cumsum(df, out=self._offsets[1:])
+
+        n = len(self.ids)
+        self.idf = np.log(1 + (n - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        doc_lengths = np.asarray(self._doc_lengths, dtype=np.float32)
+        avg_length = max(float(doc_lengths.mean()), 1.0)
+        norm = self.k1 * (1 - self.b + self.b * doc_lengths[self._docs] / avg_length)
+        term_of_posting = np.repeat(np.arange(num_terms), df)
+        self._weights = (
+            self.idf[term_of_posting] * self._tfs * (self.k1 + 1) / (self._tfs + norm)
+        ).astype(np.float32)
+
+        logger.info(f"Built BM25 postings: {num_terms} terms, {len(self._docs)} postings")
+
+    @classmethod
+    def merge(cls, indexes: List["BM25Index"]) -> "BM25Index":
+        """Combine indexes over disjoint documents, e.g. per-shard indexes.
+
+        Postings are remapped to a combined vocabulary without re-tokenizing,
+        and IDF and length normalization are recomputed over all documents,
+        so scores match an index built over everything at once.
+
+        Args:
+            indexes: Indexes to combine; the first one's k1 and b are used
+
+        Returns:
+            Merged BM25Index
+        """
+        if not indexes:
+            raise ValueError("No indexes to merge")
+
+        merged = cls(k1=indexes[0].k1, b=indexes[0].b)
+        terms, docs, tfs = [], [], []
+        for index in indexes:
+            if index._pending:
+                index._build()
+            remap = np.empty(len(index.vocabulary), dtype=np.int64)
+            for term, term_id in index.vocabulary.items():
+                remap[term_id] = merged.vocabulary.setdefault(term, len(merged.vocabulary))
+            counts = np.diff(index._offsets)
+            terms.append(remap[np.repeat(np.arange(len(counts)), counts)])
+            docs.append(index._docs.astype(np.int32) + len(merged.ids))
+            tfs.append(index._tfs)
+            merged.ids.extend(index.ids)
+            merged._doc_lengths.extend(list(index._doc_lengths))
+
+        if len(set(merged.ids)) != len(merged.ids):
+            raise ValueError("Indexes to merge share document IDs")
+        merged._set_postings(np.concatenate(terms), np.concatenate(docs), np.concatenate(tfs))
+        logger.info(f"Merged {len(indexes)} BM25 indexes into {len(merged.ids)} documents")
+        return merged
+
+    def score(self, query: str, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """BM25 score of every document for a query.
+
+        Args:
+            query: Query text
+            mask: Optional boolean array; documents where it is False score 0
+
+        Returns:
+            Scores (n,)
+        """
+        if self._pending:
+            self._build()
+
+        term_counts = Counter(
+            self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary
+        )
+        n = len(self.ids)
+        if not term_counts:
+            return np.zeros(n, dtype=np.float32)
+
+        docs = [self._docs[self._offsets[t]:self._offsets[t + 1]] for t in term_counts]
+        weights = [
+            self._weights[self._offsets[t]:self._offsets[t + 1]] * count
+            for t, count in term_counts.items()
+        ]
+        scores = np.bincount(
+            np.concatenate(docs), weights=np.concatenate(weights), minlength=n
+        ).astype(np.float32)
+
+        if mask is not None:
+            scores[~mask] = 0
+        return scores
+
+    def search(
+        self,
+        queries: Union[str, List[str]],
+        top_k: int = 10,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[List[SearchHit]]:
+        """Rank documents by BM25 for each query.
+
+        Args:
+            queries: Query text or list of query texts
+            top_k: Results per query
+            mask: Optional boolean array restricting which documents match
+
+        Returns:
+            One list of hits per query, best first. Documents without any
+            query term are not returned
+        """
+        if isinstance(queries, str):
+            queries = [queries]
+
+        results = []
+        for query in queries:
+            scores = self.score(query, mask)
+            best, rows = top_k_rows(scores[None, :], top_k)
+            results.append([
+                SearchHit(id=self.ids[row], score=float(score))
+                for score, row in zip(best[0], rows[0])
+                if score > 0
+            ])
+        return results
+
+    def save(self, directory: Path):
+        """Save the index to a directory.
+
+        Args:
+            directory: Output directory
+        """
+        if self._pending:
+            self._build()
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        np.savez(
+            directory / "postings.npz",
+            offsets=self._offsets,
+            docs=self._docs,
+            tfs=self._tfs,
+            weights=self._weights,
+            idf=self.idf,
+            doc_lengths=np.asarray(self._doc_lengths, dtype=np.int32),
+        )
+        with open(directory / "ids.json", "w") as f:
+            json.dump(self.ids, f)
+        with open(directory / "vocabulary.json", "w") as f:
+            json.dump(self.vocabulary, f)
+        with open(directory / "index.json", "w") as f:
+            json.dump({"type": "bm25", "k1": self.k1, "b": self.b}, f, indent=2)
+
+        logger.info(f"Saved BM25 index with {len(self.ids)} documents to {directory}")
+
+    @classmethod
+    def load(cls, directory: Path) -> "BM25Index":
+        """Load an index saved with ``save``.
+
+        Args:
+            directory: Index directory
+
+        Returns:
+            Loaded BM25Index
+        """
+        directory = Path(directory)
+        with open(directory / "index.json") as f:
+            meta = json.load(f)
+
+        index = cls(k1=meta["k1"], b=meta["b"])
+        with open(directory / "ids.json") as f:
+            index.ids = json.load(f)
+        with open(directory / "vocabulary.json") as f:
+            index.vocabulary = json.load(f)
+
+        data = np.load(directory / "postings.npz")
+        index._offsets = data["offsets"]
+        index._docs = data["docs"]
+        index._tfs = data["tfs"]
+        index._weights = data["weights"]
+        index.idf = data["idf"]
+        index._doc_lengths = data["doc_lengths"].tolist()
+
+        logger.info(f"Loaded BM25 index with {len(index.ids)} documents from {directory}")
+        return index
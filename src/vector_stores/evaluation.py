@@ -0,0 +1,80 @@
+"""Recall and latency evaluation for approximate indexes."""
+
+import logging
+import time
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def recall_at_k(expected: List[List[str]], actual: List[List[str]], k: int) -> float:
+    """Fraction of the true top-k IDs found in the approximate top-k.
+
+    Args:
+        expected: Exact result IDs per query
+        actual: Approximate result IDs per query
+        k: Cutoff
+
+    Returns:
+        Mean recall@k over all queries
+    """
+    hits = sum(
+        len(set(e[:k]) & set(a[:k]))
+        for e, a in zip(expected, actual)
+    )
+    total = sum(min(k, len(e)) for e in expected)
+    return hits / total if total else 1.0
+
+
+def recall_latency_curve(
+    index,
+    exact_index,
+    queries: np.ndarray,
+    param: str,
+    values: Iterable[Any],
+    top_k: int = 10,
+) -> List[Dict[str, float]]:
+    """Sweep a search parameter and measure recall and per-query latency.
+
+    Args:
+        index: Approximate index with a ``search(queries, top_k)`` method
+        exact_index: Exact index (e.g. FlatIndex) over the same vectors and IDs
+        queries: Query embeddings (q, dim)
+        param: Index attribute to sweep, e.g. "ef_search" or "nprobe"
+        values: Values of the parameter to try
+        top_k: Number of neighbours compared
+
+    Returns:
+        One row per value with recall@k and mean/p50/p99 latency in ms
+    """
+    queries = np.atleast_2d(queries)
+    expected = [[hit.id for hit in hits] for hits in exact_index.search(queries, top_k=top_k)]
+    original = getattr(index, param)
+    curve = []
+
+    try:
+        for value in values:
+            setattr(index, param, value)
+            latencies = []
+            actual = []
+            for query in queries:
+                start = time.perf_counter()
+                hits = index.search(query, top_k=top_k)[0]
+                latencies.append((time.perf_counter() - start) * 1000)
+                actual.append([hit.id for hit in hits])
+
+            row = {
+                param: value,
+                f"recall@{top_k}": recall_at_k(expected, actual, top_k),
+                "mean_ms": float(np.mean(latencies)),
+                "p50_ms": float(np.percentile(latencies, 50)),
+                "p99_ms": float(np.percentile(latencies, 99)),
+            }
+            logger.info(f"{param}={value}: {row}")
+            curve.append(row)
+    finally:
+        setattr(index, param, original)
+
+    return curve
@@ -0,0 +1,226 @@
+"""Bitmap metadata filters for pre-filtered vector search."""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class Filter:
+    """Base class for filter expressions.
+
+    Expressions combine with ``&``, ``|`` and ``~``. Each one evaluates to a
+    packed bitmap (one bit per index row) so combining filters is a bytewise
+    AND/OR over n / 8 bytes.
+    """
+
+    def bitmap(self, index: "MetadataIndex") -> np.ndarray:
+        """Evaluate to a packed uint8 bitmap over the index rows."""
+        raise NotImplementedError
+
+    def __and__(self, other: "Filter") -> "Filter":
+        return And(self, other)
+
+    def __or__(self, other: "Filter") -> "Filter":
+        return Or(self, other)
+
+    def __invert__(self) -> "Filter":
+        return Not(self)
+
+
+class Eq(Filter):
+    """Rows where a field has (or, for list fields, contains) a value."""
+
+    def __init__(self, field: str, value: Any):
+        self.field = field
+        self.value = value
+
+    def bitmap(self, index: "MetadataIndex") -> np.ndarray:
+        return index.value_bitmap(self.field, self.value)
+
+
+class In(Filter):
+    """Rows where a field matches any of several values."""
+
+    def __init__(self, field: str, values: Iterable[Any]):
+        self.field = field
+        self.values = list(values)
+
+    def bitmap(self, index: "MetadataIndex") -> np.ndarray:
+        return index.union(self.field, self.values)
+
+
+class Range(Filter):
+    """Rows where a numeric field lies within [gte, lte]."""
+
+    def __init__(self, field: str, gte: Optional[float] = None, lte: Optional[float] = None):
+        self.field = field
+        self.gte = gte
+        self.lte = lte
+
+    def bitmap(self, index: "MetadataIndex") -> np.ndarray:
+        values = [
+            value for value in index.values(self.field)
+            if (self.gte is None or value >= self.gte) and (self.lte is None or value <= self.lte)
+        ]
+        return index.union(self.field, values)
+
+
+class And(Filter):
+    """Rows matching every sub-filter."""
+
+    def __init__(self, *filters: Filter):
+        self.filters = filters
+
+    def bitmap(self, index: "MetadataIndex") -> np.ndarray:
+        result = self.filters[0].bitmap(index).copy()
+        for sub in self.filters[1:]:
+            np.bitwise_and(result, sub.bitmap(index), out=result)
+        return result
+
+
+class Or(Filter):
+    """Rows matching any sub-filter."""
+
+    def __init__(self, *filters: Filter):
+        self.filters = filters
+
+    def bitmap(self, index: "MetadataIndex") -> np.ndarray:
+        result = self.filters[0].bitmap(index).copy()
+        for sub in self.filters[1:]:
+            np.bitwise_or(result, sub.bitmap(index), out=result)
+        return result
+
+
+class Not(Filter):
+    """Rows not matching a sub-filter."""
+
+    def __init__(self, inner: Filter):
+        self.inner = inner
+
+    def bitmap(self, index: "MetadataIndex") -> np.ndarray:
+        result = np.invert(self.inner.bitmap(index))
+        # Clear the padding bits past the last row
+        return np.bitwise_and(result, index.all_rows_bitmap(), out=result)
+
+
+def paper_record(paper) -> Dict[str, Any]:
+    """Filterable fields of a Paper.
+
+    Args:
+        paper: Paper object
+
+    Returns:
+        Dictionary with paper_id, year, source, primary_category and categories
+    """
+    return {
+        "paper_id": paper.id,
+        "year": paper.published.year,
+        "source": paper.source,
+        "primary_category": paper.primary_category,
+        "categories": list(paper.categories),
+    }
+
+
+class MetadataIndex:
+    """Per-field, per-value bitmaps aligned with the rows of a vector index.
+
+    Row i of this index describes row i of the vector index it filters, so
+    records must be added in the same order as vectors. ``mask()`` turns a
+    filter expression into a boolean row mask that the vector indexes apply
+    inside their scans.
+    """
+
+    def __init__(self, fields: Optional[List[str]] = None):
+        """Initialize metadata index.
+
+        Args:
+            fields: Fields to index. All fields of the first record if None
+        """
+        self.fields = fields
+        self.size = 0
+        self._rows: Dict[str, Dict[Any, List[int]]] = {}
+        self._bitmaps: Dict[str, Dict[Any, np.ndarray]] = {}
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, records: List[Dict[str, Any]]):
+        """Append metadata for the next rows.
+
+        Args:
+            records: One dictionary per row. List values (e.g. categories)
+                set the row's bit under every listed value
+        """
+        if self.fields is None and records:
+            self.fields = list(records[0].keys())
+
+        for record in records:
+            for field in self.fields:
+                value = record.get(field)
+                if value is None:
+                    continue
+                values = value if isinstance(value, (list, tuple, set)) else [value]
+                field_rows = self._rows.setdefault(field, {})
+                for v in values:
+                    field_rows.setdefault(v, []).append(self.size)
+            self.size += 1
+
+        self._dirty = True
+
+    def _build(self):
+        """Pack row lists into bitmaps."""
+        for field, value_rows in self._rows.items():
+            self._bitmaps[field] = {
+                value: self._pack(np.asarray(rows, dtype=np.int64))
+                for value, rows in value_rows.items()
+            }
+        self._dirty = False
+
+    def _pack(self, rows: np.ndarray) -> np.ndarray:
+        """Packed bitmap with the given rows set."""
+        bits = np.zeros(self.size, dtype=bool)
+        bits[rows] = True
+        return np.packbits(bits)
+
+    def all_rows_bitmap(self) -> np.ndarray:
+        """Packed bitmap with every row set."""
+        return np.packbits(np.ones(self.size, dtype=bool))
+
+    def values(self, field: str) -> List[Any]:
+        """Distinct values of a field."""
+        return list(self._rows.get(field, {}).keys())
+
+    def value_bitmap(self, field: str, value: Any) -> np.ndarray:
+        """Packed bitmap of rows where a field has a value."""
+        if self._dirty:
+            self._build()
+        empty = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        return self._bitmaps.get(field, {}).get(value, empty)
+
+    def union(self, field: str, values: Iterable[Any]) -> np.ndarray:
+        """Packed bitmap of rows where a field has any of the values."""
+        result = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        for value in values:
+            np.bitwise_or(result, self.value_bitmap(field, value), out=result)
+        return result
+
+    def mask(self, expression: Filter) -> np.ndarray:
+        """Evaluate a filter to a boolean mask over rows.
+
+        Args:
+            expression: Filter expression, e.g.
+                ``Range("year", gte=2020) & In("primary_category", ["cs.CV", "cs.LG"])``
+
+        Returns:
+            Boolean array (size,)
+        """
+        bitmap = expression.bitmap(self)
+        return np.unpackbits(bitmap, count=self.size).view(bool)
+
+    def count(self, expression: Filter) -> int:
+        """Number of rows matching a filter."""
+        return int(np.unpackbits(expression.bitmap(self), count=self.size).sum())
@@ -0,0 +1,329 @@
+"""Exact in-process vector index."""
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base import METRICS, SearchHit, prepare_vectors, to_hits, top_k_rows
+
+logger = logging.getLogger(__name__)
+
+# Below this fraction of allowed rows, filtered search gathers the allowed
+# rows and scores only those; above it, scores of excluded rows are masked
+GATHER_FRACTION = 0.25
+
+
+class FlatIndex:
+    """Brute-force vector index over a contiguous embedding matrix.
+
+    Queries are scored in row blocks with one matrix product per block, and
+    each block keeps only its top-k via ``argpartition``, so memory stays
+    bounded by ``queries x block_size`` regardless of index size. Blocks can
+    be scanned on several threads since NumPy releases the GIL in BLAS calls.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        metric: str = "cosine",
+        top_k: int = 10,
+        similarity_threshold: Optional[float] = None,
+        block_size: int = 65536,
+        num_threads: int = 1,
+    ):
+        """Initialize flat index.
+
+        Args:
+            dim: Embedding dimension
+            metric: "cosine" (vectors are normalized) or "dot"
+            top_k: Default number of results per query
+            similarity_threshold: Default minimum score for a result
+            block_size: Rows scored per matrix product
+            num_threads: Threads used to scan blocks in parallel
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+
+        self.dim = dim
+        self.metric = metric
+        self.top_k = top_k
+        self.similarity_threshold = similarity_threshold
+        self.block_size = block_size
+        self.num_threads = num_threads
+
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], dim: int, **kwargs) -> "FlatIndex":
+        """Create an index from the parsed agent config.
+
+        Reads ``retrieval.top_k``, ``retrieval.similarity_threshold`` and
+        ``vector_store.distance_metric``.
+
+        Args:
+            config: Parsed configs/agent_config.yaml
+            dim: Embedding dimension
+            **kwargs: Overrides for other constructor arguments
+
+        Returns:
+            Empty FlatIndex
+        """
+        retrieval = config.get("retrieval", {})
+        vector_store = config.get("vector_store", {})
+        return cls(
+            dim,
+            metric=vector_store.get("distance_metric", "cosine"),
+            top_k=retrieval.get("top_k", 10),
+            similarity_threshold=retrieval.get("similarity_threshold"),
+            **kwargs,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Stored vectors (n, dim)."""
+        return self._vectors[:len(self.ids)]
+
+    def add(self, vectors: np.ndarray, ids: List[str]):
+        """Add vectors, replacing any existing vector with the same ID.
+
+        An ID repeated within ``ids`` is stored once, with its last vector.
+
+        Args:
+            vectors: Embeddings (n, dim)
+            ids: External ID for every vector
+        """
+        vectors = prepare_vectors(vectors, self.metric)
+        if len(vectors) != len(ids):
+            raise ValueError(f"Got {len(vectors)} vectors but {len(ids)} ids")
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected dimension {self.dim}, got {vectors.shape[1]}")
+
+        # New ID -> position of its last occurrence in the batch
+        new_rows: Dict[str, int] = {}
+        for i, id_ in enumerate(ids):
+            row = self._rows.get(id_)
+            if row is None:
+                new_rows[id_] = i
+            else:
+                self._ensure_writable()
+                self._vectors[row] = vectors[i]
+
+        if not new_rows:
+            return
+
+        start = len(self.ids)
+        self._reserve(start + len(new_rows))
+        self._vectors[start:start + len(new_rows)] = vectors[list(new_rows.values())]
+
+        for offset, id_ in enumerate(new_rows):
+            self._rows[id_] = start + offset
+            self.ids.append(id_)
+
+        logger.info(f"Added {len(new_rows)} vectors, index size {len(self.ids)}")
+
+    def _reserve(self, size: int):
+        """Grow the vector buffer geometrically so appends are amortized O(1)."""
+        if size <= len(self._vectors) and self._vectors.flags.writeable:
+            return
+
+        capacity = max(size, 2 * len(self._vectors), 1024)
+        buffer = np.empty((capacity, self.dim), dtype=np.float32)
+        buffer[:len(self.ids)] = self.vectors
+        self._vectors = buffer
+
+    def _ensure_writable(self):
+        """Copy a read-only (memory-mapped) matrix into RAM before writing."""
+        if not self._vectors.flags.writeable:
+            self._vectors = np.array(self.vectors)
+
+    def search(
+        self,
+        queries: np.ndarray,
+        top_k: Optional[int] = None,
+        threshold: Optional[float] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[List[SearchHit]]:
+        """Find the nearest stored vectors for a batch of queries.
+
+        Args:
+            queries: Query embedding or matrix of query embeddings (q, dim)
+            top_k: Results per query. Defaults to the index's top_k
+            threshold: Minimum score. Defaults to the index's similarity_threshold
+            mask: Optional boolean array over rows (see MetadataIndex.mask);
+                only rows where it is True are returned
+
+        Returns:
+            One list of hits per query, best first
+        """
+        scores, rows = self.search_arrays(queries, top_k, threshold, mask)
+        return to_hits(scores, rows, self.ids)
+
+    def search_arrays(
+        self,
+        queries: np.ndarray,
+        top_k: Optional[int] = None,
+        threshold: Optional[float] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Search and return raw arrays instead of hits.
+
+        Args:
+            queries: Query embedding or matrix of query embeddings (q, dim)
+            top_k: Results per query. Defaults to the index's top_k
+            threshold: Minimum score. Defaults to the index's similarity_threshold
+            mask: Optional boolean array over rows restricting the results
+
+        Returns:
+            Tuple of (scores, rows), each (q, top_k). Missing results have
+            row -1 and score -inf
+        """
+        top_k = top_k or self.top_k
+        threshold = self.similarity_threshold if threshold is None else threshold
+        queries = prepare_vectors(queries, self.metric)
+
+        scores = np.full((len(queries), top_k), -np.inf, dtype=np.float32)
+        rows = np.full((len(queries), top_k), -1, dtype=np.int64)
+        if not self.ids:
+            return scores, rows
+
+        candidates = None
+        if mask is not None:
+            if len(mask) != len(self.ids):
+                raise ValueError(f"Mask has {len(mask)} rows, index has {len(self.ids)}")
+            if mask.mean() <= GATHER_FRACTION:
+                # Selective filter: only the allowed rows are ever scored
+                candidates = np.flatnonzero(mask)
+                mask = None
+                if len(candidates) == 0:
+                    return scores, rows
+
+        total = len(self.ids) if candidates is None else len(candidates)
+        starts = range(0, total, self.block_size)
+
+        def scan(start: int) -> Tuple[np.ndarray, np.ndarray]:
+            return self._scan_block(queries, start, top_k, candidates, mask)
+
+        if self.num_threads > 1 and len(starts) > 1:
+            with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+                results = list(executor.map(scan, starts))
+        else:
+            results = [scan(start) for start in starts]
+
+        block_scores = np.concatenate([r[0] for r in results], axis=1)
+        block_rows = np.concatenate([r[1] for r in results], axis=1)
+
+        best_scores, columns = top_k_rows(block_scores, top_k)
+        best_rows = np.take_along_axis(block_rows, columns, axis=1)
+
+        # Rows excluded by the mask carry -inf and must not be returned
+        below = ~np.isfinite(best_scores)
+        if threshold is not None:
+            below |= best_scores < threshold
+        best_scores[below] = -np.inf
+        best_rows[below] = -1
+
+        k = best_scores.shape[1]
+        scores[:, :k] = best_scores
+        rows[:, :k] = best_rows
+        return scores, rows
+
+    def _scan_block(
+        self,
+        queries: np.ndarray,
+        start: int,
+        top_k: int,
+        candidates: Optional[np.ndarray] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Score one block of rows and keep its top-k.
+
+        With ``candidates`` the block is a slice of those row numbers,
+        otherwise a contiguous range of rows, optionally masked.
+        """
+        if candidates is not None:
+            block_rows = candidates[start:start + self.block_size]
+            block_scores, columns = top_k_rows(queries @ self._vectors[block_rows].T, top_k)
+            return block_scores, block_rows[columns]
+
+        end = min(start + self.block_size, len(self.ids))
+        block_scores = queries @ self._vectors[start:end].T
+        if mask is not None:
+            block_scores[:, ~mask[start:end]] = -np.inf
+        block_scores, columns = top_k_rows(block_scores, top_k)
+        return block_scores, columns + start
+
+    def get_vectors(self, ids: List[str]) -> np.ndarray:
+        """Look up stored vectors by ID.
+
+        Args:
+            ids: External IDs
+
+        Returns:
+            Vectors (len(ids), dim)
+        """
+        return self.vectors[[self._rows[id_] for id_ in ids]]
+
+    def save(self, directory: Path):
+        """Save the index to a directory.
+
+        Args:
+            directory: Output directory
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        np.save(directory / "vectors.npy", self.vectors)
+        with open(directory / "ids.json", "w") as f:
+            json.dump(self.ids, f)
+        with open(directory / "index.json", "w") as f:
+            json.dump({
+                "type": "flat",
+                "dim": self.dim,
+                "metric": self.metric,
+                "top_k": self.top_k,
+                "similarity_threshold": self.similarity_threshold,
+            }, f, indent=2)
+
+        logger.info(f"Saved flat index with {len(self.ids)} vectors to {directory}")
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True, **kwargs) -> "FlatIndex":
+        """Load an index saved with ``save``.
+
+        Args:
+            directory: Index directory
+            mmap: Memory-map the vector matrix instead of reading it into RAM
+            **kwargs: Overrides for block_size, num_threads, etc.
+
+        Returns:
+            Loaded FlatIndex
+        """
+        directory = Path(directory)
+        with open(directory / "index.json") as f:
+            meta = json.load(f)
+        with open(directory / "ids.json") as f:
+            ids = json.load(f)
+
+        params = {
+            "metric": meta["metric"],
+            "top_k": meta["top_k"],
+            "similarity_threshold": meta["similarity_threshold"],
+        }
+        params.update(kwargs)
+        index = cls(meta["dim"], **params)
+
+        index._vectors = np.load(directory / "vectors.npy", mmap_mode="r" if mmap else None)
+        index.ids = ids
+        index._rows = {id_: row for row, id_ in enumerate(ids)}
+
+        logger.info(f"Loaded flat index with {len(ids)} vectors from {directory}")
+        return index
@@ -0,0 +1,499 @@
+"""HNSW approximate nearest-neighbor index."""
+
+import heapq
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base import METRICS, SearchHit, prepare_vectors, to_hits, top_k_rows
+
+logger = logging.getLogger(__name__)
+
+# Filters allowing at most this many rows are answered by an exact scan of
+# those rows; a graph walk would visit mostly excluded nodes
+EXACT_FILTER_ROWS = 20000
+
+
+class HNSWIndex:
+    """Hierarchical navigable small world graph over embeddings.
+
+    Layer 0 links are stored as one fixed-width int32 matrix (``2 * M``
+    neighbours per node) next to the contiguous vector matrix, so both can be
+    memory-mapped after loading. The sparse upper layers are kept as small
+    per-level dictionaries. Each graph hop scores all unvisited neighbours of
+    a node with a single matrix-vector product.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        metric: str = "cosine",
+        M: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        top_k: int = 10,
+        seed: int = 42,
+    ):
+        """Initialize HNSW index.
+
+        Args:
+            dim: Embedding dimension
+            metric: "cosine" (vectors are normalized) or "dot"
+            M: Links per node on upper layers (2 * M on layer 0)
+            ef_construction: Candidate list size while inserting
+            ef_search: Candidate list size while searching
+            top_k: Default number of results per query
+            seed: Seed for level assignment
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+
+        self.dim = dim
+        self.metric = metric
+        self.M = M
+        self.max_m0 = 2 * M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.top_k = top_k
+        self.seed = seed
+
+        self._level_mult = 1 / np.log(M)
+        self._rng = np.random.default_rng(seed)
+
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._links0 = np.empty((0, self.max_m0), dtype=np.int32)
+        self._degree0 = np.empty(0, dtype=np.int32)
+        self._levels = np.empty(0, dtype=np.int8)
+        self._upper: List[Dict[int, np.ndarray]] = []
+        self.entry_point = -1
+        self.max_level = -1
+
+        # Visited marks use a generation tag so they never need clearing
+        self._visited = np.empty(0, dtype=np.uint32)
+        self._visit_tag = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], dim: int, **kwargs) -> "HNSWIndex":
+        """Create an index from the parsed agent config.
+
+        Reads ``vector_store.distance_metric``, the ``vector_store.hnsw``
+        parameters and ``retrieval.top_k``.
+
+        Args:
+            config: Parsed configs/agent_config.yaml
+            dim: Embedding dimension
+            **kwargs: Overrides for other constructor arguments
+
+        Returns:
+            Empty HNSWIndex
+        """
+        vector_store = config.get("vector_store", {})
+        hnsw = vector_store.get("hnsw", {})
+        params = {
+            "metric": vector_store.get("distance_metric", "cosine"),
+            "M": hnsw.get("m", 16),
+            "ef_construction": hnsw.get("ef_construction", 200),
+            "ef_search": hnsw.get("ef_search", 64),
+            "top_k": config.get("retrieval", {}).get("top_k", 10),
+        }
+        params.update(kwargs)
+        return cls(dim, **params)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Stored vectors (n, dim)."""
+        return self._vectors[:len(self.ids)]
+
+    def add(self, vectors: np.ndarray, ids: List[str]):
+        """Insert a batch of vectors into the graph.
+
+        Args:
+            vectors: Embeddings (n, dim)
+            ids: External ID for every vector
+        """
+        vectors = prepare_vectors(vectors, self.metric)
+        if len(vectors) != len(ids):
+            raise ValueError(f"Got {len(vectors)} vectors but {len(ids)} ids")
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected dimension {self.dim}, got {vectors.shape[1]}")
+
+        duplicates = [id_ for id_ in ids if id_ in self._rows]
+        if duplicates or len(set(ids)) != len(ids):
+            raise ValueError(f"Duplicate ids cannot be inserted: {duplicates[:5]}")
+
+        start = len(self.ids)
+        with self._lock:
+            self._reserve(start + len(ids))
+            self._vectors[start:start + len(ids)] = vectors
+
+            uniform = 1.0 - self._rng.random(len(ids))
+            levels = (-np.log(uniform) * self._level_mult).astype(np.int8)
+
+            for offset, (id_, level) in enumerate(zip(ids, levels)):
+                row = start + offset
+                self.ids.append(id_)
+                self._rows[id_] = row
+                self._levels[row] = level
+                self._insert(row, int(level))
+
+                if (offset + 1) % 100000 == 0:
+                    logger.info(f"Inserted {offset + 1}/{len(ids)} vectors")
+
+        logger.info(f"Added {len(ids)} vectors, index size {len(self.ids)}")
+
+    def _reserve(self, size: int):
+        """Grow per-node arrays geometrically."""
+        if size <= len(self._vectors) and self._vectors.flags.writeable:
+            return
+
+        capacity = max(size, 2 * len(self._vectors), 1024)
+        n = len(self.ids)
+
+        vectors = np.empty((capacity, self.dim), dtype=np.float32)
+        vectors[:n] = self._vectors[:n]
+        links0 = np.full((capacity, self.max_m0), -1, dtype=np.int32)
+        links0[:n] = self._links0[:n]
+        degree0 = np.zeros(capacity, dtype=np.int32)
+        degree0[:n] = self._degree0[:n]
+        levels = np.zeros(capacity, dtype=np.int8)
+        levels[:n] = self._levels[:n]
+
+        self._vectors, self._links0, self._degree0, self._levels = vectors, links0, degree0, levels
+        self._visited = np.zeros(capacity, dtype=np.uint32)
+        self._visit_tag = 0
+
+    def _neighbors(self, node: int, level: int) -> np.ndarray:
+        """Get a node's links on a layer."""
+        if level == 0:
+            return self._links0[node, :self._degree0[node]]
+        return self._upper[level - 1][node]
+
+    def _set_neighbors(self, node: int, level: int, neighbors: np.ndarray):
+        """Replace a node's links on a layer."""
+        if level == 0:
+            self._links0[node, :len(neighbors)] = neighbors
+            self._links0[node, len(neighbors):] = -1
+            self._degree0[node] = len(neighbors)
+        else:
+            self._upper[level - 1][node] = np.asarray(neighbors, dtype=np.int32)
+
+    def _next_tag(self) -> int:
+        """Start a new visited generation."""
+        self._visit_tag += 1
+        if self._visit_tag == np.iinfo(np.uint32).max:
+            self._visited[:] = 0
+            self._visit_tag = 1
+        return self._visit_tag
+
+    def _search_layer(
+        self,
+        query: np.ndarray,
+        entry_points: List[int],
+        ef: int,
+        level: int,
+        allowed: Optional[np.ndarray] = None,
+    ) -> List[Tuple[float, int]]:
+        """Best-first search on one layer.
+
+        With ``allowed``, excluded nodes are still traversed (so the walk
+        can cross regions the filter rejects) but never enter the results.
+
+        Returns:
+            Up to ef (similarity, node) pairs, most similar first
+        """
+        tag = self._next_tag()
+        visited = self._visited
+
+        entry = np.asarray(entry_points, dtype=np.int64)
+        visited[entry] = tag
+        entry_sims = self._vectors[entry] @ query
+
+        candidates = [(-s, n) for s, n in zip(entry_sims.tolist(), entry.tolist())]
+        heapq.heapify(candidates)
+        results = [
+            (s, n) for s, n in zip(entry_sims.tolist(), entry.tolist())
+            if allowed is None or allowed[n]
+        ]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            neg_sim, node = heapq.heappop(candidates)
+            if len(results) >= ef and -neg_sim < results[0][0]:
+                break
+
+            neighbors = self._neighbors(node, level)
+            neighbors = neighbors[visited[neighbors] != tag]
+            if len(neighbors) == 0:
+                continue
+            visited[neighbors] = tag
+
+            sims = self._vectors[neighbors] @ query
+            worst = results[0][0] if results else -np.inf
+            if len(results) >= ef:
+                # Drop neighbours that cannot enter the result set in one pass
+                better = sims > worst
+                sims, neighbors = sims[better], neighbors[better]
+            keep = np.ones(len(neighbors), dtype=bool) if allowed is None else allowed[neighbors]
+
+            for sim, neighbor, ok in zip(sims.tolist(), neighbors.tolist(), keep.tolist()):
+                if len(results) < ef or sim > worst:
+                    heapq.heappush(candidates, (-sim, neighbor))
+                    if ok:
+                        heapq.heappush(results, (sim, neighbor))
+                        if len(results) > ef:
+                            heapq.heappop(results)
+                        worst = results[0][0]
+
+        return sorted(results, reverse=True)
+
+    def _select_neighbors(self, candidates: List[Tuple[float, int]], m: int) -> np.ndarray:
+        """Pick diverse links with the HNSW heuristic.
+
+        A candidate is kept only if it is closer to the base node than to any
+        already kept neighbour, which keeps links spread in all directions.
+
+        Args:
+            candidates: (similarity to base node, node) pairs, most similar first
+            m: Maximum number of links
+
+        Returns:
+            Selected node indices
+        """
+        nodes = np.fromiter((n for _, n in candidates), dtype=np.int64, count=len(candidates))
+        if len(nodes) <= m:
+            return nodes
+
+        sims = np.fromiter((s for s, _ in candidates), dtype=np.float32, count=len(candidates))
+        vectors = self._vectors[nodes]
+        pairwise = vectors @ vectors.T
+
+        # Similarity of every candidate to its closest selected neighbour
+        closest = np.full(len(nodes), -np.inf, dtype=np.float32)
+        selected: List[int] = []
+        for i in range(len(nodes)):
+            if closest[i] < sims[i]:
+                selected.append(i)
+                if len(selected) == m:
+                    break
+                np.maximum(closest, pairwise[i], out=closest)
+
+        return nodes[selected]
+
+    def _connect(self, node: int, new_node: int, level: int):
+        """Add a reverse link, pruning the node's links if it is full."""
+        links = self._neighbors(node, level)
+        capacity = self.max_m0 if level == 0 else self.M
+
+        if len(links) < capacity:
+            self._set_neighbors(node, level, np.append(links, new_node))
+            return
+
+        candidates = np.append(links, new_node).astype(np.int64)
+        sims = self._vectors[candidates] @ self._vectors[node]
+        order = np.argsort(-sims)
+        pruned = self._select_neighbors(
+            list(zip(sims[order].tolist(), candidates[order].tolist())), capacity
+        )
+        self._set_neighbors(node, level, pruned)
+
+    def _insert(self, row: int, level: int):
+        """Link a stored vector into the graph."""
+        while len(self._upper) < level:
+            self._upper.append({})
+        for upper_level in range(1, level + 1):
+            self._upper[upper_level - 1][row] = np.empty(0, dtype=np.int32)
+
+        if self.entry_point < 0:
+            self.entry_point = row
+            self.max_level = level
+            return
+
+        query = self._vectors[row]
+        entry = [self.entry_point]
+
+        # Greedy descent through layers above the new node's level
+        for current in range(self.max_level, level, -1):
+            entry = [self._search_layer(query, entry, 1, current)[0][1]]
+
+        for current in range(min(level, self.max_level), -1, -1):
+            candidates = self._search_layer(query, entry, self.ef_construction, current)
+            neighbors = self._select_neighbors(candidates, self.M)
+            self._set_neighbors(row, current, neighbors)
+            for neighbor in neighbors.tolist():
+                self._connect(neighbor, row, current)
+            entry = [n for _, n in candidates]
+
+        if level > self.max_level:
+            self.entry_point = row
+            self.max_level = level
+
+    def search(
+        self,
+        queries: np.ndarray,
+        top_k: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[List[SearchHit]]:
+        """Find approximate nearest neighbours for a batch of queries.
+
+        Args:
+            queries: Query embedding or matrix of query embeddings (q, dim)
+            top_k: Results per query. Defaults to the index's top_k
+            ef_search: Override candidate list size (higher is slower, more exact)
+            mask: Optional boolean array over rows (see MetadataIndex.mask);
+                only rows where it is True are returned
+
+        Returns:
+            One list of hits per query, best first
+        """
+        scores, rows = self.search_arrays(queries, top_k, ef_search, mask)
+        return to_hits(scores, rows, self.ids)
+
+    def search_arrays(
+        self,
+        queries: np.ndarray,
+        top_k: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Search and return raw arrays instead of hits.
+
+        Filters allowing few rows are answered exactly from those rows;
+        broader ones are applied during the layer-0 walk.
+
+        Returns:
+            Tuple of (scores, rows), each (q, top_k). Missing results have
+            row -1 and score -inf
+        """
+        top_k = top_k or self.top_k
+        ef = max(ef_search or self.ef_search, top_k)
+        queries = prepare_vectors(queries, self.metric)
+
+        scores = np.full((len(queries), top_k), -np.inf, dtype=np.float32)
+        rows = np.full((len(queries), top_k), -1, dtype=np.int64)
+        if self.entry_point < 0:
+            return scores, rows
+
+        if mask is not None:
+            if len(mask) != len(self.ids):
+                raise ValueError(f"Mask has {len(mask)} rows, index has {len(self.ids)}")
+            allowed_rows = np.flatnonzero(mask)
+            if len(allowed_rows) <= EXACT_FILTER_ROWS:
+                best, columns = top_k_rows(queries @ self._vectors[allowed_rows].T, top_k)
+                k = best.shape[1]
+                scores[:, :k] = best
+                rows[:, :k] = allowed_rows[columns]
+                return scores, rows
+
+        with self._lock:
+            for i, query in enumerate(queries):
+                entry = [self.entry_point]
+                for level in range(self.max_level, 0, -1):
+                    entry = [self._search_layer(query, entry, 1, level)[0][1]]
+
+                results = self._search_layer(query, entry, ef, 0, mask)[:top_k]
+                scores[i, :len(results)] = [s for s, _ in results]
+                rows[i, :len(results)] = [n for _, n in results]
+
+        return scores, rows
+
+    def save(self, directory: Path):
+        """Save the index to a directory of .npy files.
+
+        Args:
+            directory: Output directory
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        n = len(self.ids)
+
+        np.save(directory / "vectors.npy", self._vectors[:n])
+        np.save(directory / "links0.npy", self._links0[:n])
+        np.save(directory / "degree0.npy", self._degree0[:n])
+        np.save(directory / "levels.npy", self._levels[:n])
+
+        for level, layer in enumerate(self._upper, start=1):
+            nodes = np.fromiter(layer.keys(), dtype=np.int32, count=len(layer))
+            links = np.full((len(layer), self.M), -1, dtype=np.int32)
+            degree = np.zeros(len(layer), dtype=np.int32)
+            for i, neighbors in enumerate(layer.values()):
+                links[i, :len(neighbors)] = neighbors
+                degree[i] = len(neighbors)
+            np.savez(directory / f"layer{level}.npz", nodes=nodes, links=links, degree=degree)
+
+        with open(directory / "ids.json", "w") as f:
+            json.dump(self.ids, f)
+        with open(directory / "index.json", "w") as f:
+            json.dump({
+                "type": "hnsw",
+                "dim": self.dim,
+                "metric": self.metric,
+                "M": self.M,
+                "ef_construction": self.ef_construction,
+                "ef_search": self.ef_search,
+                "top_k": self.top_k,
+                "seed": self.seed,
+                "entry_point": self.entry_point,
+                "max_level": self.max_level,
+            }, f, indent=2)
+
+        logger.info(f"Saved HNSW index with {n} vectors to {directory}")
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True, **kwargs) -> "HNSWIndex":
+        """Load an index saved with ``save``.
+
+        Args:
+            directory: Index directory
+            mmap: Memory-map vectors and layer 0 links instead of reading them
+            **kwargs: Overrides such as ef_search
+
+        Returns:
+            Loaded HNSWIndex
+        """
+        directory = Path(directory)
+        with open(directory / "index.json") as f:
+            meta = json.load(f)
+        with open(directory / "ids.json") as f:
+            ids = json.load(f)
+
+        params = {
+            key: meta[key]
+            for key in ("metric", "M", "ef_construction", "ef_search", "top_k", "seed")
+        }
+        params.update(kwargs)
+        index = cls(meta["dim"], **params)
+
+        mmap_mode = "r" if mmap else None
+        index._vectors = np.load(directory / "vectors.npy", mmap_mode=mmap_mode)
+        index._links0 = np.load(directory / "links0.npy", mmap_mode=mmap_mode)
+        index._degree0 = np.load(directory / "degree0.npy")
+        index._levels = np.load(directory / "levels.npy")
+        index._visited = np.zeros(len(ids), dtype=np.uint32)
+
+        for level in range(1, meta["max_level"] + 1):
+            data = np.load(directory / f"layer{level}.npz")
+            index._upper.append({
+                int(node): links[:degree]
+                for node, links, degree in zip(data["nodes"], data["links"], data["degree"])
+            })
+
+        index.ids = ids
+        index._rows = {id_: row for row, id_ in enumerate(ids)}
+        index.entry_point = meta["entry_point"]
+        index.max_level = meta["max_level"]
+
+        logger.info(f"Loaded HNSW index with {len(ids)} vectors from {directory}")
+        return index
@@ -0,0 +1,168 @@
+"""Hybrid lexical + dense retrieval with rank fusion."""
+
+import logging
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from .base import SearchHit
+
+logger = logging.getLogger(__name__)
+
+FUSIONS = ("rrf", "weighted")
+
+
+def reciprocal_rank_fusion(
+    result_lists: List[List[SearchHit]],
+    k: int = 60,
+    weights: Optional[List[float]] = None,
+) -> List[SearchHit]:
+    """Fuse ranked lists by summing 1 / (k + rank) per ID.
+
+    Args:
+        result_lists: Ranked hits from each retriever
+        k: Rank offset; larger values flatten the contribution of top ranks
+        weights: Optional weight per list
+
+    Returns:
+        Fused hits, best first
+    """
+    weights = weights or [1.0] * len(result_lists)
+    fused: Dict[str, float] = {}
+    for hits, weight in zip(result_lists, weights):
+        for rank, hit in enumerate(hits, start=1):
+            fused[hit.id] = fused.get(hit.id, 0.0) + weight / (k + rank)
+
+    return sorted(
+        (SearchHit(id=id_, score=score) for id_, score in fused.items()),
+        key=lambda hit: hit.score,
+        reverse=True,
+    )
+
+
+def weighted_score_fusion(
+    result_lists: List[List[SearchHit]],
+    weights: List[float],
+) -> List[SearchHit]:
+    """Fuse lists by a weighted sum of min-max normalized scores.
+
+    Args:
+        result_lists: Scored hits from each retriever
+        weights: Weight per list
+
+    Returns:
+        Fused hits, best first
+    """
+    fused: Dict[str, float] = {}
+    for hits, weight in zip(result_lists, weights):
+        if not hits:
+            continue
+        scores = np.array([hit.score for hit in hits], dtype=np.float32)
+        spread = scores.max() - scores.min()
+        normalized = (scores - scores.min()) / spread if spread > 0 else np.ones_like(scores)
+        for hit, score in zip(hits, normalized.tolist()):
+            fused[hit.id] = fused.get(hit.id, 0.0) + weight * score
+
+    return sorted(
+        (SearchHit(id=id_, score=score) for id_, score in fused.items()),
+        key=lambda hit: hit.score,
+        reverse=True,
+    )
+
+
+class HybridRetriever:
+    """Combine BM25 over chunk text with dense vector search.
+
+    Both indexes must use the same chunk IDs (see ``chunk_uid``), and the
+    same row order when a metadata mask is passed to ``search``. Dense
+    stores without a row order (those with ``filters_by_id = True``, e.g.
+    SegmentedIndex and QdrantStore) are given the IDs of the masked rows
+    as ``allowed_ids`` instead. Each
+    retriever returns its own candidate list, and the lists are fused with
+    reciprocal rank fusion or a weighted sum of normalized scores.
+    """
+
+    def __init__(
+        self,
+        lexical_index,
+        dense_index,
+        encoder=None,
+        fusion: str = "rrf",
+        dense_weight: float = 0.5,
+        rrf_k: int = 60,
+        candidates: int = 100,
+    ):
+        """Initialize hybrid retriever.
+
+        Args:
+            lexical_index: BM25Index over chunk text
+            dense_index: Vector index with a ``search(queries, top_k, mask)``
+                method, or ``search(queries, top_k, allowed_ids)`` for stores
+                with ``filters_by_id``
+            encoder: EmbeddingEncoder for query text. Needed unless query
+                vectors are passed to ``search``
+            fusion: "rrf" or "weighted"
+            dense_weight: Weight of dense results; lexical gets 1 - dense_weight
+            rrf_k: Rank offset for reciprocal rank fusion
+            candidates: Results taken from each retriever before fusion
+        """
+        if fusion not in FUSIONS:
+            raise ValueError(f"Unknown fusion {fusion!r}, expected one of {FUSIONS}")
+
+        self.lexical_index = lexical_index
+        self.dense_index = dense_index
+        self.encoder = encoder
+        self.fusion = fusion
+        self.dense_weight = dense_weight
+        self.rrf_k = rrf_k
+        self.candidates = candidates
+
+    def search(
+        self,
+        queries: Union[str, List[str]],
+        top_k: int = 10,
+        query_vectors: Optional[np.ndarray] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[List[SearchHit]]:
+        """Retrieve chunks for each query.
+
+        Args:
+            queries: Query text or list of query texts
+            top_k: Results per query
+            query_vectors: Precomputed query embeddings. Encoded if None
+            mask: Optional boolean row mask applied by both indexes
+
+        Returns:
+            One list of fused hits per query, best first
+        """
+        if isinstance(queries, str):
+            queries = [queries]
+
+        if query_vectors is None:
+            if self.encoder is None:
+                raise ValueError("Pass query_vectors or give the retriever an encoder")
+            query_vectors = self.encoder.encode(queries, show_progress=False)
+
+        dense_filter = {}
+        if mask is not None:
+            if getattr(self.dense_index, "filters_by_id", False):
+                ids = self.lexical_index.ids
+                dense_filter["allowed_ids"] = [ids[row] for row in np.flatnonzero(mask)]
+            else:
+                dense_filter["mask"] = mask
+
+        dense_results = self.dense_index.search(
+            query_vectors, top_k=self.candidates, **dense_filter
+        )
+        lexical_results = self.lexical_index.search(queries, top_k=self.candidates, mask=mask)
+        weights = [self.dense_weight, 1 - self.dense_weight]
+
+        results = []
+        for dense_hits, lexical_hits in zip(dense_results, lexical_results):
+            if self.fusion == "rrf":
+                fused = reciprocal_rank_fusion([dense_hits, lexical_hits], self.rrf_k, weights)
+            else:
+                fused = weighted_score_fusion([dense_hits, lexical_hits], weights)
+            results.append(fused[:top_k])
+
+        return results
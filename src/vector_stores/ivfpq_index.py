@@ -0,0 +1,501 @@
+"""Inverted-file index with product quantization for corpora beyond RAM."""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base import METRICS, SearchHit, prepare_vectors, to_hits, top_k_rows
+
+logger = logging.getLogger(__name__)
+
+
+def kmeans(
+    data: np.ndarray,
+    k: int,
+    iterations: int = 20,
+    seed: int = 42,
+    batch_size: int = 65536,
+) -> np.ndarray:
+    """Lloyd's k-means with squared L2 distance.
+
+    Args:
+        data: Training vectors (n, dim)
+        k: Number of centroids
+        iterations: Number of assignment/update rounds
+        seed: Random seed for initialization
+        batch_size: Rows assigned per matrix product
+
+    Returns:
+        Centroids (k, dim)
+    """
+    data = np.asarray(data, dtype=np.float32)
+    if len(data) < k:
+        raise ValueError(f"Need at least {k} training vectors, got {len(data)}")
+
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), k, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignment = assign_nearest(data, centroids, batch_size)
+
+        counts = np.bincount(assignment, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, data)
+
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        # Re-seed empty clusters with random points so every centroid is used
+        if empty.any():
+            centroids[empty] = data[rng.choice(len(data), int(empty.sum()), replace=False)]
+
+    return centroids
+
+
+def assign_nearest(
+    data: np.ndarray,
+    centroids: np.ndarray,
+    batch_size: int = 65536,
+) -> np.ndarray:
+    """Index of the nearest centroid (squared L2) for every row.
+
+    Args:
+        data: Vectors (n, dim)
+        centroids: Centroids (k, dim)
+        batch_size: Rows assigned per matrix product
+
+    Returns:
+        Centroid index per row (n,)
+    """
+    # argmin |x - c|^2 = argmax (x . c - |c|^2 / 2)
+    half_norms = 0.5 * np.einsum("ij,ij->i", centroids, centroids)
+    assignment = np.empty(len(data), dtype=np.int64)
+    for start in range(0, len(data), batch_size):
+        block = data[start:start + batch_size]
+        assignment[start:start + len(block)] = np.argmax(block @ centroids.T - half_norms, axis=1)
+    return assignment
+
+
+class IVFPQIndex:
+    """IVF-PQ index: coarse k-means lists plus product-quantized residuals.
+
+    Every vector is stored as its coarse list and ``m`` one-byte PQ codes of
+    its residual, so an index over 768-dim embeddings takes tens of bytes per
+    vector instead of 3 KB. Queries probe the ``nprobe`` closest lists and
+    score their codes with per-query asymmetric distance tables. Optionally,
+    full vectors are appended to an on-disk file that is memory-mapped to
+    re-rank the best PQ candidates exactly.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        nlist: int = 1024,
+        m: int = 16,
+        nprobe: int = 8,
+        metric: str = "cosine",
+        top_k: int = 10,
+        rerank: int = 0,
+        vectors_path: Optional[Path] = None,
+        seed: int = 42,
+    ):
+        """Initialize IVF-PQ index.
+
+        Args:
+            dim: Embedding dimension (must be divisible by m)
+            nlist: Number of coarse lists
+            m: Number of PQ subquantizers (bytes per vector code)
+            nprobe: Lists scanned per query
+            metric: "cosine" (vectors are normalized) or "dot"
+            top_k: Default number of results per query
+            rerank: PQ candidates re-scored exactly per query. 0 disables
+                re-ranking; needs vectors_path
+            vectors_path: Raw float32 file that full vectors are appended to.
+                A new index overwrites any vectors already in the file
+            seed: Random seed for training
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+        if dim % m:
+            raise ValueError(f"dim {dim} is not divisible by m {m}")
+        if rerank and vectors_path is None:
+            raise ValueError("Re-ranking needs a vectors_path")
+
+        self.dim = dim
+        self.nlist = nlist
+        self.m = m
+        self.dsub = dim // m
+        self.ksub = 256
+        self.nprobe = nprobe
+        self.metric = metric
+        self.top_k = top_k
+        self.rerank = rerank
+        self.vectors_path = Path(vectors_path) if vectors_path else None
+        self.seed = seed
+
+        self.coarse: Optional[np.ndarray] = None
+        self.codebooks: Optional[np.ndarray] = None
+        self.trained = False
+
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._code_chunks: List[np.ndarray] = []
+        self._list_chunks: List[np.ndarray] = []
+        self._codes = np.empty((0, m), dtype=np.uint8)
+        self._lists = np.empty(0, dtype=np.int32)
+
+        # Inverted lists (CSR over rows sorted by list), rebuilt after adds
+        self._dirty = False
+        self._order = np.empty(0, dtype=np.int64)
+        self._offsets = np.zeros(nlist + 1, dtype=np.int64)
+        self._sorted_codes = np.empty((0, m), dtype=np.uint8)
+        self._full_vectors: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], dim: int, **kwargs) -> "IVFPQIndex":
+        """Create an index from the parsed agent config.
+
+        Reads ``vector_store.distance_metric``, the ``vector_store.ivf_pq``
+        parameters and ``retrieval.top_k``.
+
+        Args:
+            config: Parsed configs/agent_config.yaml
+            dim: Embedding dimension
+            **kwargs: Overrides for other constructor arguments
+
+        Returns:
+            Untrained IVFPQIndex
+        """
+        vector_store = config.get("vector_store", {})
+        ivf_pq = vector_store.get("ivf_pq", {})
+        params = {
+            "metric": vector_store.get("distance_metric", "cosine"),
+            "nlist": ivf_pq.get("nlist", 1024),
+            "m": ivf_pq.get("m", 16),
+            "nprobe": ivf_pq.get("nprobe", 8),
+            # Re-ranking only applies when a full-vector file is supplied
+            "rerank": ivf_pq.get("rerank", 0) if kwargs.get("vectors_path") else 0,
+            "top_k": config.get("retrieval", {}).get("top_k", 10),
+        }
+        params.update(kwargs)
+        return cls(dim, **params)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def bytes_per_vector(self) -> int:
+        """In-memory index size per vector, excluding IDs.
+
+        Codes are held twice, in insertion order and sorted by list, next to
+        each vector's list number and its position in the sorted order.
+        """
+        return 2 * self.m + np.dtype(np.int32).itemsize + np.dtype(np.int64).itemsize
+
+    def train(self, sample: np.ndarray, iterations: int = 20):
+        """Train the coarse quantizer and PQ codebooks on a sample.
+
+        Args:
+            sample: Representative embeddings, ideally >= 30 * nlist rows
+            iterations: k-means iterations
+        """
+        sample = prepare_vectors(sample, self.metric)
+        logger.info(f"Training IVF-PQ (nlist={self.nlist}, m={self.m}) on {len(sample)} vectors")
+
+        self.coarse = kmeans(sample, self.nlist, iterations, self.seed)
+        residuals = sample - self.coarse[assign_nearest(sample, self.coarse)]
+
+        self.codebooks = np.empty((self.m, self.ksub, self.dsub), dtype=np.float32)
+        for j in range(self.m):
+            sub = np.ascontiguousarray(residuals[:, j * self.dsub:(j + 1) * self.dsub])
+            self.codebooks[j] = kmeans(sub, self.ksub, iterations, self.seed + j)
+
+        self.trained = True
+        logger.info("IVF-PQ training complete")
+
+    def _encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Assign coarse lists and PQ-encode residuals."""
+        lists = assign_nearest(vectors, self.coarse)
+        residuals = vectors - self.coarse[lists]
+
+        codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            sub = residuals[:, j * self.dsub:(j + 1) * self.dsub]
+            codes[:, j] = assign_nearest(sub, self.codebooks[j])
+
+        return lists.astype(np.int32), codes
+
+    def add(self, vectors: np.ndarray, ids: List[str], batch_size: int = 65536):
+        """Encode and add vectors.
+
+        Args:
+            vectors: Embeddings (n, dim)
+            ids: External ID for every vector
+            batch_size: Rows encoded at a time
+        """
+        if not self.trained:
+            raise RuntimeError("Index is not trained, call train() first")
+        if len(vectors) != len(ids):
+            raise ValueError(f"Got {len(vectors)} vectors but {len(ids)} ids")
+
+        seen = set()
+        duplicates = []
+        for id_ in ids:
+            if id_ in self._rows or id_ in seen:
+                duplicates.append(id_)
+            seen.add(id_)
+        if duplicates:
+            raise ValueError(f"Duplicate ids cannot be inserted: {duplicates[:5]}")
+
+        if self.vectors_path is not None:
+            self._align_vectors_file()
+
+        for start in range(0, len(vectors), batch_size):
+            batch = prepare_vectors(vectors[start:start + batch_size], self.metric)
+            lists, codes = self._encode(batch)
+            self._list_chunks.append(lists)
+            self._code_chunks.append(codes)
+
+            if self.vectors_path is not None:
+                with open(self.vectors_path, "ab") as f:
+                    f.write(batch.tobytes())
+
+        for id_ in ids:
+            self._rows[id_] = len(self.ids)
+            self.ids.append(id_)
+
+        self._dirty = True
+        logger.info(f"Added {len(ids)} vectors, index size {len(self.ids)}")
+
+    def _build_lists(self):
+        """Sort codes by coarse list into contiguous inverted lists."""
+        if self._list_chunks:
+            self._lists = np.concatenate([self._lists] + self._list_chunks)
+            self._codes = np.concatenate([self._codes] + self._code_chunks)
+            self._list_chunks, self._code_chunks = [], []
+
+        self._order = np.argsort(self._lists, kind="stable")
+        self._offsets = np.zeros(self.nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self._lists, minlength=self.nlist), out=self._offsets[1:])
+        self._sorted_codes = self._codes[self._order]
+        self._dirty = False
+
+    def _align_vectors_file(self):
+        """Make the full-vector file end at the index's last row before appending.
+
+        Row i of the file is row i of the index, so a new index starts the
+        file over instead of appending after another index's vectors, and
+        rows written after the last save are dropped.
+        """
+        expected = len(self.ids) * self.dim * 4
+        size = self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+        if size < expected:
+            raise ValueError(
+                f"{self.vectors_path} holds {size // (self.dim * 4)} vectors, "
+                f"index has {len(self.ids)}"
+            )
+        if size > expected:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(expected)
+
+    def _open_vectors(self) -> np.ndarray:
+        """Memory-map the on-disk full vectors for re-ranking."""
+        if self._full_vectors is None or len(self._full_vectors) != len(self.ids):
+            size = self.vectors_path.stat().st_size
+            if size != len(self.ids) * self.dim * 4:
+                raise ValueError(
+                    f"{self.vectors_path} holds {size // (self.dim * 4)} vectors, "
+                    f"index has {len(self.ids)}"
+                )
+            self._full_vectors = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r", shape=(len(self.ids), self.dim)
+            )
+        return self._full_vectors
+
+    def search(
+        self,
+        queries: np.ndarray,
+        top_k: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[List[SearchHit]]:
+        """Find approximate nearest neighbours for a batch of queries.
+
+        Args:
+            queries: Query embedding or matrix of query embeddings (q, dim)
+            top_k: Results per query. Defaults to the index's top_k
+            nprobe: Override number of lists scanned
+            mask: Optional boolean array over rows (see MetadataIndex.mask);
+                only rows where it is True are returned
+
+        Returns:
+            One list of hits per query, best first
+        """
+        scores, rows = self.search_arrays(queries, top_k, nprobe, mask)
+        return to_hits(scores, rows, self.ids)
+
+    def search_arrays(
+        self,
+        queries: np.ndarray,
+        top_k: Optional[int] = None,
+        nprobe: Optional[int] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Search and return raw arrays instead of hits.
+
+        The mask is applied to each probed list before its codes are
+        scored, so excluded rows cost no table lookups.
+
+        Returns:
+            Tuple of (scores, rows), each (q, top_k). Missing results have
+            row -1 and score -inf
+        """
+        top_k = top_k or self.top_k
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        queries = prepare_vectors(queries, self.metric)
+
+        scores = np.full((len(queries), top_k), -np.inf, dtype=np.float32)
+        rows = np.full((len(queries), top_k), -1, dtype=np.int64)
+        if not self.ids:
+            return scores, rows
+        if self._dirty:
+            self._build_lists()
+        if mask is not None and len(mask) != len(self.ids):
+            raise ValueError(f"Mask has {len(mask)} rows, index has {len(self.ids)}")
+
+        # Closest lists by L2 to the centroid
+        half_norms = 0.5 * np.einsum("ij,ij->i", self.coarse, self.coarse)
+        _, probes = top_k_rows(queries @ self.coarse.T - half_norms, nprobe)
+
+        # ADC tables: query sub-vector . every codeword, (q, m, 256)
+        query_subs = queries.reshape(len(queries), self.m, self.dsub)
+        tables = np.einsum("qjd,jkd->qjk", query_subs, self.codebooks)
+        # Flattened table offset of subquantizer j is j * 256
+        table_offsets = np.arange(self.m) * self.ksub
+
+        for i, query in enumerate(queries):
+            candidate_rows, candidate_scores = self._scan_lists(
+                query, probes[i], tables[i].ravel(), table_offsets, mask
+            )
+            if len(candidate_rows) == 0:
+                continue
+
+            if self.rerank:
+                best, columns = top_k_rows(candidate_scores[None, :], self.rerank)
+                candidate_rows = candidate_rows[columns[0]]
+                # Sorted reads keep memory-mapped page access sequential
+                order = np.argsort(candidate_rows)
+                candidate_rows = candidate_rows[order]
+                candidate_scores = self._open_vectors()[candidate_rows] @ query
+
+            best, columns = top_k_rows(candidate_scores[None, :], top_k)
+            k = best.shape[1]
+            scores[i, :k] = best[0]
+            rows[i, :k] = candidate_rows[columns[0]]
+
+        return scores, rows
+
+    def _scan_lists(
+        self,
+        query: np.ndarray,
+        lists: np.ndarray,
+        table: np.ndarray,
+        table_offsets: np.ndarray,
+        mask: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Score every allowed code in the probed lists with the ADC table."""
+        row_parts, score_parts = [], []
+        coarse_scores = self.coarse[lists] @ query
+
+        for list_id, coarse_score in zip(lists.tolist(), coarse_scores.tolist()):
+            start, end = self._offsets[list_id], self._offsets[list_id + 1]
+            if start == end:
+                continue
+            list_rows = self._order[start:end]
+            codes = self._sorted_codes[start:end]
+            if mask is not None:
+                allowed = mask[list_rows]
+                list_rows, codes = list_rows[allowed], codes[allowed]
+                if len(list_rows) == 0:
+                    continue
+            # q . (c + r) ~= q . c + sum_j table[j, code_j]
+            score_parts.append(coarse_score + table[codes + table_offsets].sum(axis=1))
+            row_parts.append(list_rows)
+
+        if not row_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return np.concatenate(row_parts), np.concatenate(score_parts)
+
+    def save(self, directory: Path):
+        """Save the index to a directory.
+
+        The full-vector file, if any, stays where it is and is referenced by path.
+
+        Args:
+            directory: Output directory
+        """
+        if self._dirty:
+            self._build_lists()
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        np.save(directory / "coarse.npy", self.coarse)
+        np.save(directory / "codebooks.npy", self.codebooks)
+        np.save(directory / "codes.npy", self._codes)
+        np.save(directory / "lists.npy", self._lists)
+        with open(directory / "ids.json", "w") as f:
+            json.dump(self.ids, f)
+        with open(directory / "index.json", "w") as f:
+            json.dump({
+                "type": "ivfpq",
+                "dim": self.dim,
+                "nlist": self.nlist,
+                "m": self.m,
+                "nprobe": self.nprobe,
+                "metric": self.metric,
+                "top_k": self.top_k,
+                "rerank": self.rerank,
+                "vectors_path": str(self.vectors_path) if self.vectors_path else None,
+                "seed": self.seed,
+            }, f, indent=2)
+
+        logger.info(f"Saved IVF-PQ index with {len(self.ids)} vectors to {directory}")
+
+    @classmethod
+    def load(cls, directory: Path, **kwargs) -> "IVFPQIndex":
+        """Load an index saved with ``save``.
+
+        Args:
+            directory: Index directory
+            **kwargs: Overrides such as nprobe or rerank
+
+        Returns:
+            Loaded IVFPQIndex
+        """
+        directory = Path(directory)
+        with open(directory / "index.json") as f:
+            meta = json.load(f)
+        with open(directory / "ids.json") as f:
+            ids = json.load(f)
+
+        params: Dict[str, Any] = {
+            key: meta[key]
+            for key in ("nlist", "m", "nprobe", "metric", "top_k", "rerank", "vectors_path", "seed")
+        }
+        params.update(kwargs)
+        index = cls(meta["dim"], **params)
+
+        index.coarse = np.load(directory / "coarse.npy")
+        index.codebooks = np.load(directory / "codebooks.npy")
+        index._codes = np.load(directory / "codes.npy")
+        index._lists = np.load(directory / "lists.npy")
+        index.trained = True
+        index.ids = ids
+        index._rows = {id_: row for row, id_ in enumerate(ids)}
+        index._dirty = True
+
+        logger.info(f"Loaded IVF-PQ index with {len(ids)} vectors from {directory}")
+        return index
@@ -0,0 +1,498 @@
+"""Qdrant-backed vector store with parallel bulk upserts."""
+
+import logging
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+from tenacity import retry, stop_after_attempt, wait_exponential
+
+from .base import METRICS, SearchHit, chunk_uid, prepare_vectors
+from .filters import And, Eq, Filter, In, Not, Or, Range
+
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient, models
+
+logger = logging.getLogger(__name__)
+
+# Point IDs must be integers or UUIDs, so chunk IDs are mapped to UUIDv5
+POINT_NAMESPACE = uuid.UUID("6f1c1d8e-3b8a-5c4e-9f0a-2d7e4b6a9c31")
+
+# Payload indexes matching the fields of paper_record()
+DEFAULT_PAYLOAD_INDEXES = {
+    "paper_id": "keyword",
+    "year": "integer",
+    "source": "keyword",
+    "primary_category": "keyword",
+    "categories": "keyword",
+}
+
+# Qdrant's default indexing threshold (KB), used when a collection reports none
+DEFAULT_INDEXING_THRESHOLD = 20000
+
+# Chunk keys never copied into the payload
+EXCLUDED_PAYLOAD_KEYS = ("embedding",)
+
+
+def point_id(uid: str) -> str:
+    """Deterministic Qdrant point ID for a chunk ID.
+
+    Args:
+        uid: Chunk ID (see ``chunk_uid``)
+
+    Returns:
+        UUID string
+    """
+    return str(uuid.uuid5(POINT_NAMESPACE, uid))
+
+
+def to_qdrant_filter(expression: Filter) -> "models.Filter":
+    """Translate a filter expression into a server-side Qdrant filter.
+
+    Args:
+        expression: Filter built from Eq, In, Range, And, Or and Not
+
+    Returns:
+        qdrant_client Filter
+    """
+    from qdrant_client import models
+
+    if isinstance(expression, And):
+        return models.Filter(must=[to_qdrant_filter(f) for f in expression.filters])
+    if isinstance(expression, Or):
+        return models.Filter(should=[to_qdrant_filter(f) for f in expression.filters])
+    if isinstance(expression, Not):
+        return models.Filter(must_not=[to_qdrant_filter(expression.inner)])
+    if isinstance(expression, Eq):
+        condition = models.FieldCondition(
+            key=expression.field, match=models.MatchValue(value=expression.value)
+        )
+    elif isinstance(expression, In):
+        condition = models.FieldCondition(
+            key=expression.field, match=models.MatchAny(any=expression.values)
+        )
+    elif isinstance(expression, Range):
+        condition = models.FieldCondition(
+            key=expression.field, range=models.Range(gte=expression.gte, lte=expression.lte)
+        )
+    else:
+        raise ValueError(f"Cannot translate filter {type(expression).__name__} for Qdrant")
+    return models.Filter(must=[condition])
+
+
+class QdrantStore:
+    """Vector store on a Qdrant collection.
+
+    One client is shared by all upload threads; it pools HTTP connections
+    (or multiplexes a gRPC channel), so ``parallel`` batches are in flight at
+    once. Bulk loads switch off HNSW indexing while points stream in and
+    switch it back on at the end, so the graph is built once rather than
+    updated per batch. For tests, pass ``location=":memory:"`` or a ``path``
+    to use qdrant-client's in-process local mode.
+    """
+
+    # Points have no row order: searches are filtered with allowed_ids, not a mask
+    filters_by_id = True
+
+    def __init__(
+        self,
+        dim: int,
+        collection_name: str = "research_papers",
+        metric: str = "cosine",
+        url: Optional[str] = None,
+        location: Optional[str] = None,
+        path: Optional[str] = None,
+        prefer_grpc: bool = True,
+        api_key: Optional[str] = None,
+        batch_size: int = 1024,
+        parallel: int = 4,
+        payload_fields: Optional[List[str]] = None,
+        payload_indexes: Optional[Dict[str, str]] = None,
+        hnsw: Optional[Dict[str, int]] = None,
+        indexing_threshold: Optional[int] = None,
+        top_k: int = 10,
+        similarity_threshold: Optional[float] = None,
+    ):
+        """Initialize Qdrant store.
+
+        Args:
+            dim: Embedding dimension
+            collection_name: Qdrant collection
+            metric: "cosine" or "dot"
+            url: Qdrant server URL, e.g. "http://localhost:6333"
+            location: ":memory:" for an in-process local collection
+            path: Directory for a persistent in-process local collection
+            prefer_grpc: Use gRPC for a remote server
+            api_key: Qdrant Cloud API key
+            batch_size: Points per upsert request
+            parallel: Upsert requests in flight
+            payload_fields: Chunk keys stored as payload. All keys if None
+            payload_indexes: Payload field -> index type ("keyword",
+                "integer", ...). Defaults to the paper_record() fields
+            hnsw: HNSW parameters (m, ef_construction, ef_search)
+            indexing_threshold: Segment size (KB) at which Qdrant builds
+                HNSW after a bulk load. By default the collection's own
+                setting from before the load is restored
+            top_k: Default number of results per query
+            similarity_threshold: Default minimum score for a result
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+
+        self.dim = dim
+        self.collection_name = collection_name
+        self.metric = metric
+        self.url = url
+        self.location = location
+        self.path = path
+        self.prefer_grpc = prefer_grpc
+        self.api_key = api_key
+        self.batch_size = batch_size
+        self.parallel = parallel
+        self.payload_fields = payload_fields
+        self.payload_indexes = (
+            DEFAULT_PAYLOAD_INDEXES if payload_indexes is None else payload_indexes
+        )
+        self.hnsw = hnsw or {}
+        self.indexing_threshold = indexing_threshold
+        self.top_k = top_k
+        self.similarity_threshold = similarity_threshold
+
+        self._client: Optional["QdrantClient"] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], dim: int, **kwargs) -> "QdrantStore":
+        """Create a store from the parsed agent config.
+
+        Reads ``vector_store.collection_name``, ``vector_store.distance_metric``,
+        ``vector_store.hnsw``, the ``vector_store.qdrant`` connection settings
+        and ``retrieval.top_k`` / ``retrieval.similarity_threshold``.
+
+        Args:
+            config: Parsed configs/agent_config.yaml
+            dim: Embedding dimension
+            **kwargs: Overrides for other constructor arguments
+
+        Returns:
+            QdrantStore
+        """
+        vector_store = config.get("vector_store", {})
+        retrieval = config.get("retrieval", {})
+        qdrant = vector_store.get("qdrant", {})
+        params = {
+            "collection_name": vector_store.get("collection_name", "research_papers"),
+            "metric": vector_store.get("distance_metric", "cosine"),
+            "hnsw": vector_store.get("hnsw"),
+            "top_k": retrieval.get("top_k", 10),
+            "similarity_threshold": retrieval.get("similarity_threshold"),
+            **qdrant,
+        }
+        params.update(kwargs)
+        return cls(dim, **params)
+
+    @property
+    def client(self) -> "QdrantClient":
+        """Shared Qdrant client, created on first use."""
+        if self._client is None:
+            from qdrant_client import QdrantClient
+
+            if self.is_local:
+                self._client = QdrantClient(location=self.location, path=self.path)
+            else:
+                self._client = QdrantClient(
+                    url=self.url,
+                    prefer_grpc=self.prefer_grpc,
+                    api_key=self.api_key,
+                )
+        return self._client
+
+    def create_collection(self, recreate: bool = False):
+        """Create the collection and its payload indexes if missing.
+
+        Args:
+            recreate: Drop an existing collection first
+        """
+        from qdrant_client import models
+
+        exists = self.client.collection_exists(self.collection_name)
+        if exists and recreate:
+            self.client.delete_collection(self.collection_name)
+            exists = False
+        if exists:
+            return
+
+        distance = models.Distance.COSINE if self.metric == "cosine" else models.Distance.DOT
+        self.client.create_collection(
+            self.collection_name,
+            vectors_config=models.VectorParams(size=self.dim, distance=distance),
+            hnsw_config=models.HnswConfigDiff(
+                m=self.hnsw.get("m"), ef_construct=self.hnsw.get("ef_construction")
+            ),
+        )
+        # Local mode filters by scanning and has no payload indexes
+        payload_indexes = {} if self.is_local else self.payload_indexes
+        for field, schema in payload_indexes.items():
+            self.client.create_payload_index(
+                self.collection_name, field, field_schema=models.PayloadSchemaType(schema)
+            )
+
+        logger.info(f"Created Qdrant collection {self.collection_name} (dim={self.dim})")
+
+    def __len__(self) -> int:
+        return self.client.count(self.collection_name, exact=True).count
+
+    def _payload(self, chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Payload for a chunk, always including its ``chunk_uid``."""
+        if self.payload_fields is None:
+            payload = {k: v for k, v in chunk.items() if k not in EXCLUDED_PAYLOAD_KEYS}
+        else:
+            payload = {k: chunk[k] for k in self.payload_fields if k in chunk}
+        payload["chunk_uid"] = chunk_uid(chunk)
+        return payload
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+    )
+    def _upsert_batch(
+        self,
+        ids: List[str],
+        vectors: np.ndarray,
+        payloads: List[Dict[str, Any]],
+        wait: bool,
+    ):
+        """Send one upsert request (retried on failure)."""
+        from qdrant_client import models
+
+        self.client.upsert(
+            self.collection_name,
+            points=models.Batch(
+                ids=[point_id(id_) for id_ in ids],
+                vectors=vectors.tolist(),
+                payloads=payloads,
+            ),
+            wait=wait,
+        )
+
+    def upsert(
+        self,
+        vectors: np.ndarray,
+        ids: List[str],
+        payloads: Optional[List[Dict[str, Any]]] = None,
+    ) -> int:
+        """Insert or replace points in parallel batches.
+
+        Args:
+            vectors: Embeddings (n, dim)
+            ids: External ID for every vector
+            payloads: Payload for every vector. Just the ID if None
+
+        Returns:
+            Number of points written. Points become searchable shortly after
+            this returns
+        """
+        vectors = prepare_vectors(vectors, self.metric)
+        if len(vectors) != len(ids):
+            raise ValueError(f"Got {len(vectors)} vectors but {len(ids)} ids")
+        if payloads is None:
+            payloads = [{"chunk_uid": id_} for id_ in ids]
+
+        batches = (
+            (ids[i:i + self.batch_size], vectors[i:i + self.batch_size],
+             payloads[i:i + self.batch_size])
+            for i in range(0, len(ids), self.batch_size)
+        )
+        return self._upload(batches)
+
+    @property
+    def is_local(self) -> bool:
+        """Whether the collection lives in-process instead of on a server."""
+        return bool(self.location or self.path)
+
+    def _upload(self, batches: Iterable[tuple]) -> int:
+        """Upsert batches with at most 2 * parallel requests queued."""
+        # The in-process client is not thread-safe
+        workers = 1 if self.is_local else self.parallel
+        written = 0
+        pending: List[Future] = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for ids, vectors, payloads in batches:
+                # Backpressure: never hold more than a few batches in memory
+                while len(pending) >= 2 * workers:
+                    written += pending.pop(0).result()
+                pending.append(executor.submit(self._send, ids, vectors, payloads))
+            for future in pending:
+                written += future.result()
+        return written
+
+    def _send(self, ids: List[str], vectors: np.ndarray, payloads: List[Dict[str, Any]]) -> int:
+        # The server acknowledges once the batch is in its WAL, without
+        # waiting for the points to be applied
+        self._upsert_batch(ids, vectors, payloads, wait=False)
+        return len(ids)
+
+    def add_chunks(
+        self,
+        chunks: Iterable[Dict[str, Any]],
+        encoder,
+        text_key: str = "text",
+        bulk: bool = True,
+    ) -> int:
+        """Embed chunks and stream them into the collection.
+
+        Chunks are consumed lazily, so ``chunks`` can be a generator over a
+        whole corpus. Encoding of the next window overlaps with the upload of
+        the previous one.
+
+        Args:
+            chunks: Chunk dictionaries from SemanticChunker
+            encoder: EmbeddingEncoder (or anything with ``encode(texts)``)
+            text_key: Key containing text in chunk dict
+            bulk: Pause HNSW indexing during the load
+
+        Returns:
+            Number of points written
+        """
+        self.create_collection()
+        if bulk:
+            restore_threshold = self._pause_indexing()
+
+        def batches() -> Iterator[tuple]:
+            for window in _windows(chunks, self.batch_size):
+                vectors = encoder.encode(
+                    [chunk[text_key] for chunk in window], show_progress=False
+                )
+                yield (
+                    [chunk_uid(chunk) for chunk in window],
+                    prepare_vectors(vectors, self.metric),
+                    [self._payload(chunk) for chunk in window],
+                )
+
+        try:
+            written = self._upload(batches())
+        finally:
+            if bulk:
+                self._set_indexing_threshold(restore_threshold)
+
+        logger.info(f"Upserted {written} chunks into {self.collection_name}")
+        return written
+
+    def _pause_indexing(self) -> int:
+        """Switch off HNSW index building for a bulk load.
+
+        Returns:
+            Threshold to restore afterwards
+        """
+        if self.indexing_threshold is not None:
+            threshold = self.indexing_threshold
+        else:
+            optimizer = self.client.get_collection(self.collection_name).config.optimizer_config
+            threshold = optimizer.indexing_threshold
+            # 0 is left behind by an interrupted bulk load; None is the server default
+            if not threshold:
+                threshold = DEFAULT_INDEXING_THRESHOLD
+        # A threshold of 0 disables indexing
+        self._set_indexing_threshold(0)
+        return threshold
+
+    def _set_indexing_threshold(self, threshold: int):
+        from qdrant_client import models
+
+        self.client.update_collection(
+            self.collection_name,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=threshold),
+        )
+
+    def delete(self, ids: List[str]):
+        """Delete points by external ID.
+
+        Args:
+            ids: External IDs
+        """
+        from qdrant_client import models
+
+        self.client.delete(
+            self.collection_name,
+            points_selector=models.PointIdsList(points=[point_id(id_) for id_ in ids]),
+        )
+
+    def search(
+        self,
+        queries: np.ndarray,
+        top_k: Optional[int] = None,
+        threshold: Optional[float] = None,
+        filter: Optional[Union[Filter, "models.Filter"]] = None,
+        allowed_ids: Optional[Iterable[str]] = None,
+    ) -> List[List[SearchHit]]:
+        """Find the nearest points for a batch of queries in one request.
+
+        Args:
+            queries: Query embedding or matrix of query embeddings (q, dim)
+            top_k: Results per query. Defaults to the store's top_k
+            threshold: Minimum score. Defaults to the store's similarity_threshold
+            filter: Filter expression (or a native Qdrant filter) evaluated
+                server-side with the payload indexes
+            allowed_ids: Optional chunk IDs the results are restricted to
+                (points have no row order, so there is no boolean mask)
+
+        Returns:
+            One list of hits per query, best first
+        """
+        from qdrant_client import models
+
+        top_k = top_k or self.top_k
+        threshold = self.similarity_threshold if threshold is None else threshold
+        queries = prepare_vectors(queries, self.metric)
+        if isinstance(filter, Filter):
+            filter = to_qdrant_filter(filter)
+        if allowed_ids is not None:
+            if isinstance(allowed_ids, np.ndarray):
+                raise ValueError(
+                    "QdrantStore has no row order; pass allowed_ids as a collection of IDs"
+                )
+            has_id = models.Filter(must=[
+                models.HasIdCondition(has_id=[point_id(id_) for id_ in allowed_ids])
+            ])
+            filter = has_id if filter is None else models.Filter(must=[filter, has_id])
+
+        params = None
+        if self.hnsw.get("ef_search"):
+            params = models.SearchParams(hnsw_ef=self.hnsw["ef_search"])
+
+        responses = self.client.query_batch_points(
+            self.collection_name,
+            requests=[
+                models.QueryRequest(
+                    query=query.tolist(),
+                    filter=filter,
+                    limit=top_k,
+                    score_threshold=threshold,
+                    params=params,
+                    with_payload=["chunk_uid"],
+                )
+                for query in queries
+            ],
+        )
+        return [
+            [SearchHit(id=point.payload["chunk_uid"], score=point.score) for point in response.points]
+            for response in responses
+        ]
+
+    def close(self):
+        """Close the client and its connections."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+def _windows(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of at most ``size`` items."""
+    window = []
+    for item in items:
+        window.append(item)
+        if len(window) == size:
+            yield window
+            window = []
+    if window:
+        yield window
@@ -0,0 +1,538 @@
+"""Mutable vector index built from immutable segments and a write-ahead log."""
+
+import json
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .base import METRICS, SearchHit, prepare_vectors, top_k_rows
+from .flat_index import FlatIndex
+from .wal import OP_DELETE, OP_INSERT, WriteAheadLog
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+
+class _Segment:
+    """A FlatIndex plus a liveness bit per row (False = tombstoned)."""
+
+    def __init__(self, name: str, index: FlatIndex, live: Optional[np.ndarray] = None):
+        self.name = name
+        self.index = index
+        self.live = np.ones(len(index), dtype=bool) if live is None else live
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+class SegmentedIndex:
+    """Vector index that takes inserts and deletes without rebuilding.
+
+    Writes go to a write-ahead log and then to a small in-memory delta
+    segment. When the delta reaches ``delta_limit`` vectors it is frozen and
+    written out as an immutable, memory-mapped base segment by a background
+    thread. Deletes and replacements only clear a row's liveness bit
+    (a tombstone), which searches apply as a mask. Once there are more than
+    ``max_segments`` base segments, a background compaction merges them and
+    drops tombstoned rows.
+
+    Searches run over every segment and merge the per-segment top-k. Only
+    short critical sections take the lock, so ingest and search continue
+    while segments are being written or compacted. After a crash, opening
+    the directory loads the segments listed in the manifest and replays the
+    logs written since.
+    """
+
+    # No global row order: searches are filtered with allowed_ids, not a mask
+    filters_by_id = True
+
+    def __init__(
+        self,
+        directory: Path,
+        dim: int,
+        metric: str = "cosine",
+        top_k: int = 10,
+        similarity_threshold: Optional[float] = None,
+        delta_limit: int = 10000,
+        max_segments: int = 8,
+        sync: bool = True,
+    ):
+        """Open an index directory, recovering any logged writes.
+
+        Args:
+            directory: Index directory (created if missing)
+            dim: Embedding dimension
+            metric: "cosine" (vectors are normalized) or "dot"
+            top_k: Default number of results per query
+            similarity_threshold: Default minimum score for a result
+            delta_limit: Vectors held in the delta segment before it is flushed
+            max_segments: Base segments allowed before compaction
+            sync: fsync the write-ahead log after every write
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+
+        self.directory = Path(directory)
+        self.dim = dim
+        self.metric = metric
+        self.top_k = top_k
+        self.similarity_threshold = similarity_threshold
+        self.delta_limit = delta_limit
+        self.max_segments = max_segments
+        self.sync = sync
+
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="segments")
+        self._futures: List[Future] = []
+
+        self._segments: List[_Segment] = []
+        # Delta segments that are being written out; still searched
+        self._frozen: List[_Segment] = []
+        self._delta = self._new_delta()
+        # Live copy of every ID: (segment, row)
+        self._location: Dict[str, Tuple[_Segment, int]] = {}
+        self._next_segment = 0
+        self._wal_start = 0
+        self._wal_seq = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._recover()
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Dict[str, Any],
+        directory: Path,
+        dim: int,
+        **kwargs,
+    ) -> "SegmentedIndex":
+        """Open an index using the parsed agent config.
+
+        Reads ``vector_store.distance_metric``, the ``vector_store.segments``
+        parameters and ``retrieval.top_k`` / ``retrieval.similarity_threshold``.
+
+        Args:
+            config: Parsed configs/agent_config.yaml
+            directory: Index directory
+            dim: Embedding dimension
+            **kwargs: Overrides for other constructor arguments
+
+        Returns:
+            SegmentedIndex
+        """
+        vector_store = config.get("vector_store", {})
+        retrieval = config.get("retrieval", {})
+        segments = vector_store.get("segments", {})
+        params = {
+            "metric": vector_store.get("distance_metric", "cosine"),
+            "top_k": retrieval.get("top_k", 10),
+            "similarity_threshold": retrieval.get("similarity_threshold"),
+            "delta_limit": segments.get("delta_limit", 10000),
+            "max_segments": segments.get("max_segments", 8),
+        }
+        params.update(kwargs)
+        return cls(directory, dim, **params)
+
+    def __len__(self) -> int:
+        return len(self._location)
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self._location
+
+    def __enter__(self) -> "SegmentedIndex":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def num_segments(self) -> int:
+        """Number of base segments on disk."""
+        return len(self._segments)
+
+    def _new_delta(self) -> _Segment:
+        return _Segment("delta", FlatIndex(self.dim, self.metric))
+
+    def _wal_path(self, seq: int) -> Path:
+        return self.directory / f"wal-{seq:06d}.log"
+
+    def _recover(self):
+        """Load base segments from the manifest and replay the logs."""
+        manifest_path = self.directory / MANIFEST
+        if manifest_path.exists():
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if manifest["dim"] != self.dim or manifest["metric"] != self.metric:
+                raise ValueError(
+                    f"Index at {self.directory} has dim={manifest['dim']}, "
+                    f"metric={manifest['metric']!r}"
+                )
+            self._next_segment = manifest["next_segment"]
+            self._wal_start = manifest["wal_start"]
+
+            for entry in manifest["segments"]:
+                index = FlatIndex.load(self.directory / entry["name"], mmap=True)
+                segment = _Segment(entry["name"], index)
+                segment.live[entry["deleted"]] = False
+                self._segments.append(segment)
+                for row in np.flatnonzero(segment.live).tolist():
+                    self._location[index.ids[row]] = (segment, row)
+
+        # Segment directories not in the manifest are from an interrupted flush
+        listed = {segment.name for segment in self._segments}
+        for path in self.directory.glob("seg-*"):
+            if path.name not in listed:
+                shutil.rmtree(path, ignore_errors=True)
+
+        replayed = 0
+        seqs = sorted(int(p.stem.split("-")[1]) for p in self.directory.glob("wal-*.log"))
+        for seq in seqs:
+            if seq < self._wal_start:
+                self._wal_path(seq).unlink()
+                continue
+            for op, ids, vectors in WriteAheadLog.replay(self._wal_path(seq), self.dim):
+                if op == OP_INSERT:
+                    self._apply_insert(vectors, ids)
+                elif op == OP_DELETE:
+                    self._apply_delete(ids)
+                replayed += 1
+
+        # Continue the newest log; everything in it is now in the delta
+        self._wal_seq = max(seqs[-1] if seqs else 0, self._wal_start)
+        self._wal = WriteAheadLog(self._wal_path(self._wal_seq), self.sync)
+
+        logger.info(
+            f"Opened segmented index with {len(self)} vectors in {len(self._segments)} "
+            f"segments, replayed {replayed} log records"
+        )
+
+    def add(self, vectors: np.ndarray, ids: List[str]):
+        """Insert vectors, replacing any existing vector with the same ID.
+
+        The batch is durable once this returns.
+
+        Args:
+            vectors: Embeddings (n, dim)
+            ids: External ID for every vector
+        """
+        vectors = prepare_vectors(vectors, self.metric)
+        if len(vectors) != len(ids):
+            raise ValueError(f"Got {len(vectors)} vectors but {len(ids)} ids")
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected dimension {self.dim}, got {vectors.shape[1]}")
+
+        with self._lock:
+            self._wal.append_insert(ids, vectors)
+            self._apply_insert(vectors, ids)
+            full = len(self._delta) >= self.delta_limit
+
+        if full:
+            self.flush(wait=False)
+
+    def delete(self, ids: List[str]) -> int:
+        """Delete vectors by ID.
+
+        Args:
+            ids: External IDs; unknown IDs are ignored
+
+        Returns:
+            Number of vectors deleted
+        """
+        with self._lock:
+            present = [id_ for id_ in ids if id_ in self._location]
+            if present:
+                self._wal.append_delete(present)
+                self._apply_delete(present)
+        return len(present)
+
+    def _apply_insert(self, vectors: np.ndarray, ids: List[str]):
+        """Put vectors in the delta, tombstoning older copies elsewhere."""
+        delta = self._delta
+        for id_ in ids:
+            location = self._location.get(id_)
+            if location is not None and location[0] is not delta:
+                segment, row = location
+                segment.live[row] = False
+
+        delta.index.add(vectors, ids)
+        if len(delta.live) < len(delta.index):
+            grown = np.ones(len(delta.index), dtype=bool)
+            grown[:len(delta.live)] = delta.live
+            delta.live = grown
+
+        rows = delta.index._rows
+        for id_ in ids:
+            row = rows[id_]
+            delta.live[row] = True
+            self._location[id_] = (delta, row)
+
+    def _apply_delete(self, ids: List[str]):
+        for id_ in ids:
+            location = self._location.pop(id_, None)
+            if location is not None:
+                segment, row = location
+                segment.live[row] = False
+
+    def flush(self, wait: bool = True):
+        """Freeze the delta segment and write it out as a base segment.
+
+        Args:
+            wait: Block until the segment is written
+        """
+        with self._lock:
+            if len(self._delta):
+                frozen = self._delta
+                frozen.name = f"seg-{self._next_segment:06d}"
+                self._next_segment += 1
+                self._frozen.append(frozen)
+                self._delta = self._new_delta()
+
+                # Later writes go to a new log; the old one is dropped once
+                # the frozen segment is listed in the manifest
+                self._wal.close()
+                self._wal_seq += 1
+                self._wal = WriteAheadLog(self._wal_path(self._wal_seq), self.sync)
+                self._submit(self._write_segment, frozen, self._wal_seq)
+
+        if wait:
+            self.wait()
+
+    def compact(self, wait: bool = True):
+        """Merge all base segments into one, dropping tombstoned rows.
+
+        Args:
+            wait: Block until compaction finishes
+        """
+        self._submit(self._compact)
+        if wait:
+            self.wait()
+
+    def wait(self):
+        """Wait for background flushes and compactions, re-raising failures."""
+        while True:
+            with self._lock:
+                if not self._futures:
+                    return
+                future = self._futures.pop(0)
+            future.result()
+
+    def _submit(self, fn, *args) -> Future:
+        with self._lock:
+            future = self._executor.submit(fn, *args)
+            self._futures.append(future)
+            return future
+
+    def _write_segment(self, segment: _Segment, wal_start: int):
+        """Persist a frozen delta, then swap it for the memory-mapped copy."""
+        path = self.directory / segment.name
+        segment.index.save(path)
+        loaded = FlatIndex.load(path, mmap=True)
+
+        with self._lock:
+            segment.index = loaded
+            self._frozen.remove(segment)
+            self._segments.append(segment)
+            self._wal_start = wal_start
+            self._write_manifest()
+            needs_compaction = len(self._segments) > self.max_segments
+
+        for path in self.directory.glob("wal-*.log"):
+            if int(path.stem.split("-")[1]) < wal_start:
+                path.unlink()
+
+        logger.info(f"Wrote segment {segment.name} with {len(segment)} vectors")
+        if needs_compaction:
+            self._compact()
+
+    def _compact(self):
+        """Merge base segments into one; runs on the background thread."""
+        with self._lock:
+            sources = list(self._segments)
+            if len(sources) < 2 and all(segment.live.all() for segment in sources):
+                return
+            snapshots = [segment.live.copy() for segment in sources]
+            name = f"seg-{self._next_segment:06d}"
+            self._next_segment += 1
+
+        merged = FlatIndex(self.dim, self.metric)
+        for segment, live in zip(sources, snapshots):
+            rows = np.flatnonzero(live)
+            if len(rows):
+                merged.add(segment.index.vectors[rows], [segment.index.ids[r] for r in rows])
+
+        path = self.directory / name
+        merged.save(path)
+        result = _Segment(name, FlatIndex.load(path, mmap=True))
+
+        with self._lock:
+            # Rows deleted or replaced while merging stay tombstoned
+            for segment, live in zip(sources, snapshots):
+                for row in np.flatnonzero(live & ~segment.live).tolist():
+                    result.live[result.index._rows[segment.index.ids[row]]] = False
+            for row in np.flatnonzero(result.live).tolist():
+                self._location[result.index.ids[row]] = (result, row)
+
+            self._segments = [result] + [s for s in self._segments if s not in sources]
+            self._write_manifest()
+
+        # Searches holding the old segments keep their open memory maps
+        for segment in sources:
+            shutil.rmtree(self.directory / segment.name, ignore_errors=True)
+
+        logger.info(
+            f"Compacted {len(sources)} segments into {name} with {len(result)} vectors"
+        )
+
+    def _write_manifest(self):
+        """Atomically replace the manifest; caller holds the lock."""
+        manifest = {
+            "dim": self.dim,
+            "metric": self.metric,
+            "next_segment": self._next_segment,
+            "wal_start": self._wal_start,
+            "segments": [
+                {"name": s.name, "deleted": np.flatnonzero(~s.live).tolist()}
+                for s in self._segments
+            ],
+        }
+        tmp_path = self.directory / (MANIFEST + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.directory / MANIFEST)
+
+    def export(self) -> Iterator[Tuple[np.ndarray, List[str]]]:
+        """Live vectors and their IDs, one batch per segment.
+
+        Reflects the index when called; writes made while iterating may or
+        may not be included.
+
+        Yields:
+            ``(vectors, ids)`` batches
+        """
+        with self._lock:
+            segments = [s for s in self._segments + self._frozen if len(s)]
+            snapshots = [segment.live.copy() for segment in segments]
+            # The delta is mutated by writers, so it is copied under the lock
+            delta = self._delta
+            delta_rows = np.flatnonzero(delta.live[:len(delta.index)])
+            delta_batch = (
+                delta.index.vectors[delta_rows].copy(),
+                [delta.index.ids[row] for row in delta_rows],
+            )
+
+        for segment, live in zip(segments, snapshots):
+            rows = np.flatnonzero(live)
+            if len(rows):
+                yield segment.index.vectors[rows], [segment.index.ids[row] for row in rows]
+        if delta_batch[1]:
+            yield delta_batch
+
+    def search(
+        self,
+        queries: np.ndarray,
+        top_k: Optional[int] = None,
+        threshold: Optional[float] = None,
+        allowed_ids: Optional[Iterable[str]] = None,
+    ) -> List[List[SearchHit]]:
+        """Find the nearest live vectors across all segments.
+
+        Rows move between segments on flush and compaction, so there is no
+        boolean row mask; results are filtered by ID instead. Each segment
+        looks the allowed IDs up in its ID -> row map and combines them with
+        its tombstones, so the cost grows with the filter, not the index.
+
+        Args:
+            queries: Query embedding or matrix of query embeddings (q, dim)
+            top_k: Results per query. Defaults to the index's top_k
+            threshold: Minimum score. Defaults to the index's similarity_threshold
+            allowed_ids: Optional IDs the results are restricted to
+
+        Returns:
+            One list of hits per query, best first
+        """
+        if isinstance(allowed_ids, np.ndarray):
+            raise ValueError(
+                "SegmentedIndex has no row order; pass allowed_ids as a collection of IDs"
+            )
+        top_k = top_k or self.top_k
+        threshold = self.similarity_threshold if threshold is None else threshold
+        queries = prepare_vectors(queries, self.metric)
+        if allowed_ids is not None:
+            allowed_ids = list(allowed_ids)
+
+        with self._lock:
+            segments = [s for s in self._segments + self._frozen if len(s)]
+            lives = [s.live.copy() for s in segments]
+            # The delta is mutated by writers, so it is scanned under the lock
+            parts = []
+            delta = self._delta
+            if len(delta):
+                rows = self._row_mask(delta, delta.live, allowed_ids)
+                if rows is None or rows.any():
+                    parts.append(self._scan(delta, rows, queries, top_k, threshold))
+
+        for segment, live in zip(segments, lives):
+            rows = self._row_mask(segment, live, allowed_ids)
+            if rows is None or rows.any():
+                parts.append(self._scan(segment, rows, queries, top_k, threshold))
+
+        if not parts:
+            return [[] for _ in range(len(queries))]
+
+        scores = np.concatenate([p[0] for p in parts], axis=1)
+        ids = [[id_ for p in parts for id_ in p[1][i]] for i in range(len(queries))]
+        best, columns = top_k_rows(scores, top_k)
+
+        return [
+            [
+                SearchHit(id=ids[i][column], score=float(score))
+                for score, column in zip(best[i], columns[i])
+                if np.isfinite(score)
+            ]
+            for i in range(len(queries))
+        ]
+
+    @staticmethod
+    def _row_mask(
+        segment: _Segment, live: np.ndarray, allowed_ids: Optional[List[str]]
+    ) -> Optional[np.ndarray]:
+        """Rows of a segment to scan: live ones with an allowed ID (None for all)."""
+        if allowed_ids is None:
+            return None if live.all() else live
+        rows = segment.index._rows
+        selected = np.zeros(len(live), dtype=bool)
+        selected[[rows[id_] for id_ in allowed_ids if id_ in rows]] = True
+        return selected & live
+
+    def _scan(
+        self,
+        segment: _Segment,
+        mask: Optional[np.ndarray],
+        queries: np.ndarray,
+        top_k: int,
+        threshold: Optional[float],
+    ) -> Tuple[np.ndarray, List[List[Optional[str]]]]:
+        """Top-k of one segment as (scores, IDs per query)."""
+        scores, rows = segment.index.search_arrays(queries, top_k, threshold, mask)
+        ids = segment.index.ids
+        return scores, [[ids[r] if r >= 0 else None for r in row] for row in rows.tolist()]
+
+    def close(self):
+        """Finish background work and close the log.
+
+        The delta segment is not flushed; it is rebuilt from the log on the
+        next open.
+        """
+        self.wait()
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._wal.close()
@@ -0,0 +1,132 @@
+"""Query routing across index shards and merging of shard indexes."""
+
+import heapq
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, List, Optional
+
+from .base import SearchHit
+from .segmented_index import SegmentedIndex
+
+logger = logging.getLogger(__name__)
+
+
+def merge_hits(result_lists: List[List[SearchHit]], top_k: int) -> List[SearchHit]:
+    """Merge per-shard results for one query into a global top-k.
+
+    Each shard returns its own top-k, so the global top-k is the top-k of
+    their union. An ID returned by several shards keeps its best score.
+
+    Args:
+        result_lists: Hits from each shard, best first
+        top_k: Number of results
+
+    Returns:
+        Hits, best first
+    """
+    best = {}
+    for hit in heapq.merge(*result_lists, key=lambda hit: -hit.score):
+        if hit.id not in best:
+            best[hit.id] = hit
+            if len(best) == top_k:
+                break
+    return list(best.values())
+
+
+class ShardRouter:
+    """Fan a query out to every shard and merge the per-shard top-k.
+
+    A shard is anything with ``search(queries, top_k, ...)`` returning one
+    list of SearchHits per query: a local SegmentedIndex or BM25Index, or a
+    client for an index served by another node. Shards are queried in
+    parallel threads.
+
+    Dense scores are comparable across shards, so the merged top-k equals
+    the top-k of a single index over all shards. BM25 scores use per-shard
+    IDF; with hash-partitioned papers the statistics of large shards are
+    close, but merge the shards' BM25 indexes when exact scores matter.
+    """
+
+    def __init__(self, shards: List[Any], max_workers: Optional[int] = None):
+        """Initialize router.
+
+        Args:
+            shards: Shard indexes
+            max_workers: Concurrent shard queries (default: one per shard)
+        """
+        if not shards:
+            raise ValueError("ShardRouter needs at least one shard")
+        self.shards = list(shards)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or len(self.shards), thread_name_prefix="shard"
+        )
+
+    def __len__(self) -> int:
+        return len(self.shards)
+
+    def search(self, queries: Any, top_k: int = 10, **kwargs) -> List[List[SearchHit]]:
+        """Search every shard and merge the results.
+
+        Args:
+            queries: Queries in the form the shards accept (embedding
+                matrix for vector indexes, text for BM25)
+            top_k: Results per query
+            **kwargs: Passed on to every shard's ``search``
+
+        Returns:
+            One list of hits per query, best first
+        """
+        futures = [
+            self._executor.submit(shard.search, queries, top_k=top_k, **kwargs)
+            for shard in self.shards
+        ]
+        per_shard = [future.result() for future in futures]
+        return [
+            merge_hits([results[i] for results in per_shard], top_k)
+            for i in range(len(per_shard[0]))
+        ]
+
+    def close(self):
+        """Stop the query threads."""
+        self._executor.shutdown(wait=True)
+
+
+def merge_indexes(
+    sources: List[SegmentedIndex],
+    directory: Path,
+    **kwargs,
+) -> SegmentedIndex:
+    """Combine shard indexes into a new SegmentedIndex.
+
+    Live vectors are copied segment by segment, and the result is compacted
+    into one base segment.
+
+    Args:
+        sources: Indexes to combine; all need the same dim and metric
+        directory: Directory of the merged index (should be empty)
+        **kwargs: SegmentedIndex arguments for the merged index
+
+    Returns:
+        The merged index, open
+    """
+    if not sources:
+        raise ValueError("No indexes to merge")
+    dim, metric = sources[0].dim, sources[0].metric
+    for source in sources:
+        if (source.dim, source.metric) != (dim, metric):
+            raise ValueError(
+                f"Cannot merge dim={source.dim}, metric={source.metric!r} into "
+                f"dim={dim}, metric={metric!r}"
+            )
+
+    # The merged data can be rebuilt from the sources, so skip fsyncs
+    kwargs.setdefault("sync", False)
+    merged = SegmentedIndex(directory, dim, metric=metric, **kwargs)
+    for source in sources:
+        for vectors, ids in source.export():
+            merged.add(vectors, ids)
+    merged.flush()
+    merged.compact()
+    logger.info(f"Merged {len(sources)} indexes into {directory} with {len(merged)} vectors")
+    return merged
@@ -0,0 +1,116 @@
+"""Append-only write-ahead log for vector index updates."""
+
+import json
+import logging
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+OP_INSERT = 1
+OP_DELETE = 2
+
+# op, payload length, CRC32 of payload
+_HEADER = struct.Struct("<BII")
+_IDS_LENGTH = struct.Struct("<I")
+
+
+class WriteAheadLog:
+    """Binary log of insert and delete batches.
+
+    Each record is a fixed header (operation, payload length, CRC32) followed
+    by the payload: a JSON list of IDs and, for inserts, the raw float32
+    vectors. A record cut short by a crash fails its length or CRC check, so
+    replay stops at the last complete record and the tail is truncated.
+    """
+
+    def __init__(self, path: Path, sync: bool = True):
+        """Open (or create) a log for appending.
+
+        Args:
+            path: Log file path
+            sync: fsync after every record so acknowledged writes survive a
+                power loss, not just a process crash
+        """
+        self.path = Path(path)
+        self.sync = sync
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "ab")
+
+    def append_insert(self, ids: List[str], vectors: np.ndarray):
+        """Log an insert batch.
+
+        Args:
+            ids: External IDs
+            vectors: Float32 vectors (len(ids), dim)
+        """
+        self._append(OP_INSERT, ids, np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+
+    def append_delete(self, ids: List[str]):
+        """Log a delete batch.
+
+        Args:
+            ids: External IDs
+        """
+        self._append(OP_DELETE, ids, b"")
+
+    def _append(self, op: int, ids: List[str], data: bytes):
+        encoded_ids = json.dumps(ids).encode("utf-8")
+        payload = _IDS_LENGTH.pack(len(encoded_ids)) + encoded_ids + data
+        self._file.write(_HEADER.pack(op, len(payload), zlib.crc32(payload)) + payload)
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """Close the log file."""
+        if not self._file.closed:
+            self._file.close()
+
+    @staticmethod
+    def replay(path: Path, dim: int) -> Iterator[Tuple[int, List[str], Optional[np.ndarray]]]:
+        """Read the complete records of a log, truncating a torn tail.
+
+        Args:
+            path: Log file path
+            dim: Vector dimension of insert records
+
+        Yields:
+            (operation, ids, vectors) with vectors None for deletes
+        """
+        path = Path(path)
+        if not path.exists():
+            return
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            op, length, crc = _HEADER.unpack_from(data, offset)
+            start = offset + _HEADER.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+
+            (ids_length,) = _IDS_LENGTH.unpack_from(payload)
+            ids_end = _IDS_LENGTH.size + ids_length
+            ids = json.loads(payload[_IDS_LENGTH.size:ids_end].decode("utf-8"))
+            vectors = None
+            if op == OP_INSERT:
+                vectors = np.frombuffer(payload[ids_end:], dtype=np.float32).reshape(-1, dim)
+
+            yield op, ids, vectors
+            offset = start + length
+
+        if offset < len(data):
+            logger.warning(
+                f"Truncating {len(data) - offset} bytes of incomplete log records in {path}"
+            )
+            with open(path, "r+b") as f:
+                f.truncate(offset)